@@ -1,3 +1,4 @@
+import tool_registry
 import wx
 import wx.adv
 import wx.lib.newevent
@@ -5,37 +6,23 @@ import app_guard
 from app_guard import AppGuard, AppGuardError, IPCMsg
 import os, sys, subprocess, re, platform, shutil
 import app_vars
-from gui.settings import SettingsDialog, GeneralSettingsPanel, AISettingsPanel, load_app_config, get_settings_path
+from gui.settings import SettingsDialog, GeneralSettingsPanel, AISettingsPanel, load_app_config, get_settings_path, get_file_path
 from gui.dialogs import AccessTaskBarIcon, ContactDialog, AboutDialog
-from tools.text_utils.text_utils import TextUtilitiesApp
-from tools.text_utils.json_viewer import JsonViewer
-from tools.text_utils.xml_viewer import XMLViewer
-from tools.shutdown_control import ShutdownControl
-from tools.network_player.network_player import NetworkPlayerFrame
-from tools.network_player.settings import YoutubeSettings
-from tools.password_doctor import PasswordDoctorDialog
-from tools.task_scheduler.task_scheduler import TaskScheduler
-from tools.eleven_labs.eleven_labs import ElevenLabs
-from tools.accessible_terminal.session_viewer import SessionViewer
-from tools.speed_test import SpeedTest
-from tools.online_tts.online_tts import OnlineTTS
-from tools.file_utils.file_tools import FileTools
-from tools.gemini.chat import GeminiChat
-from tools.updater import Updater
+from tool_registry import get_tool
 from speech import speak
 import random
 import time
-import speech_recognition as sr
 import threading
 import concurrent.futures
+import multiprocessing
 import keyboard
 import winsound
 import ctypes
 from ctypes import wintypes
-import pyaudio
 import io
 import wave
-
+# Tools, speech_recognition and pyaudio are imported on first use; see tool_registry.
+tool_registry.mark_startup_step("Core imports")
 
 # Constants for IPC
 APP_GUARD_HANDLE_NAME = f"{app_vars.app_name.replace(' ', '_')}_AppGuardInstance"
@@ -92,11 +79,11 @@ class AccessHub(wx.Frame):
         ]
 
         self.child_frames = [] # List to store child frames
-        self.task_scheduler_instance = TaskScheduler(self)
+        self.task_scheduler_instance = None
         self.is_recording = False
         self.audio_frames = []
-        self.p = pyaudio.PyAudio()
-        self.recognizer = sr.Recognizer()
+        self.p = None # Created on the first recording
+        self.recognizer = None
         self.recording_thread = None
         self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
         self.config = load_app_config()
@@ -156,10 +143,35 @@ class AccessHub(wx.Frame):
         self.Centre()
         self.Show(True)
         self.start_hotkey_listener()
+        tool_registry.mark_startup_step("Main window")
+        # Scheduled tasks must run without the scheduler being opened, but loading it can wait for the window.
+        wx.CallAfter(self.start_task_scheduler)
         check_updates = self.config.get('General', {}).get('check_for_updates', 'True')
         check_updates = check_updates.lower() == 'true'
         if check_updates:
-            self.check_for_updates()
+            wx.CallAfter(self.check_for_updates)
+        wx.CallAfter(self.resume_pending_downloads)
+
+    def resume_pending_downloads(self):
+        """Resumes downloads left in the saved queue. The download manager is only imported when a queue file exists."""
+        if not os.path.exists(get_file_path("download_queue.json")):
+            return
+        try:
+            from tools.network_player.download_manager import resume_pending_downloads
+            resume_pending_downloads()
+        except ImportError as e:
+            print(f"Could not resume downloads: {e}")
+
+    def start_task_scheduler(self):
+        """Creates the hidden Task Scheduler so that saved tasks are scheduled."""
+        if self.task_scheduler_instance:
+            return
+        try:
+            TaskScheduler = get_tool("task_scheduler")
+        except ImportError as e:
+            print(f"Could not load the Task Scheduler: {e}")
+            return
+        self.task_scheduler_instance = TaskScheduler(self)
 
 
     def on_run_tool(self, event):
@@ -240,6 +252,9 @@ class AccessHub(wx.Frame):
 
     def start_recording(self):
         """Start recording audio."""
+        import pyaudio
+        if self.p is None:
+            self.p = pyaudio.PyAudio()
         self.is_recording = True
         self.audio_frames = []
         self.stream = self.p.open(
@@ -275,6 +290,10 @@ class AccessHub(wx.Frame):
 
     def process_audio(self):
         """Process the recorded audio and perform speech recognition."""
+        import pyaudio
+        import speech_recognition as sr
+        if self.recognizer is None:
+            self.recognizer = sr.Recognizer()
         # Convert audio frames into a valid WAV format
         buffer = io.BytesIO()
         with wave.open(buffer, 'wb') as wf:
@@ -386,6 +405,7 @@ class AccessHub(wx.Frame):
             except Exception as e:
                 print(f"Error removing 'updates' folder: {e}")
 
+        Updater = get_tool("updater")
         updater = Updater(server_url, app_vars.app_version)
         self.executor.submit(updater.check_for_updates, silent_no_update)
 
@@ -565,8 +585,10 @@ class AccessHub(wx.Frame):
         _, ext = os.path.splitext(filepath.lower())
         viewer_frame = None
         if ext == ".json":
+            JsonViewer = get_tool("json_viewer")
             viewer_frame = JsonViewer(self, title=f"JSON Viewer - {os.path.basename(filepath)}", filepath=filepath)
         elif ext == ".xml":
+            XMLViewer = get_tool("xml_viewer")
             viewer_frame = XMLViewer(self, title=f"XML Viewer - {os.path.basename(filepath)}", filepath=filepath)
         if viewer_frame:
             if self.launched_for_file:
@@ -591,30 +613,35 @@ class AccessHub(wx.Frame):
                           "File Error", wx.OK | wx.ICON_ERROR, parent=self)
 
     def on_text_utilities(self, event):
+        TextUtilitiesApp = get_tool("text_utilities")
         text_utils_app = TextUtilitiesApp(None, title="Text Utilities")
         self.add_child_frame(text_utils_app)
         self.manage_main_window_visibility(text_utils_app)
         text_utils_app.Show()
 
     def on_shutdown_control(self, event):
+        ShutdownControl = get_tool("shutdown_control")
         shutdown_control = ShutdownControl()
         self.add_child_frame(shutdown_control)
         self.manage_main_window_visibility(shutdown_control)
         shutdown_control.Show()
 
     def on_password_doctor(self, event):
+        PasswordDoctorDialog = get_tool("password_doctor")
         password_doctor = PasswordDoctorDialog(self)
         self.add_child_frame(password_doctor)
         self.manage_main_window_visibility(password_doctor)
         password_doctor.Show()
 
     def on_network_player(self, event):
+        NetworkPlayerFrame = get_tool("network_player")
         self.network_player = NetworkPlayerFrame(self, "Online Player")
         self.add_child_frame(self.network_player)
         self.network_player.Bind(wx.EVT_CLOSE, self.network_player.OnClose)
         self.manage_main_window_visibility(self.network_player)
 
     def on_task_scheduler(self, event):
+        TaskScheduler = get_tool("task_scheduler")
         self.task_scheduler_instance = TaskScheduler(self)
         self.task_scheduler_instance.Bind(wx.EVT_CLOSE, self.on_task_scheduler_close)
         self.add_child_frame(self.task_scheduler_instance)
@@ -628,24 +655,28 @@ class AccessHub(wx.Frame):
             event.Veto()
 
     def on_elevenlabs(self, event):
+        ElevenLabs = get_tool("elevenlabs")
         elevenlabs = ElevenLabs(self)
         self.add_child_frame(elevenlabs)
         self.manage_main_window_visibility(elevenlabs)
         elevenlabs.Show()
 
     def on_ssh_terminal(self, event):
+        SessionViewer = get_tool("ssh_terminal")
         accessible_terminal = SessionViewer(self, app_vars.app_name)
         self.add_child_frame(accessible_terminal)
         self.manage_main_window_visibility(accessible_terminal)
         accessible_terminal.Show()
 
     def on_speed_test(self, event):
+        SpeedTest = get_tool("speed_test")
         self.speed_test= SpeedTest(self, title="Internet Speed Test")
         self.add_child_frame(self.speed_test)
         self.speed_test.ShowModal()
 
     def on_online_tts(self, event):
         """Handles the Online TTS tool."""
+        OnlineTTS = get_tool("online_tts")
         online_tts_frame = OnlineTTS(self, title="Online Text to Speech")
         self.add_child_frame(online_tts_frame)
         self.manage_main_window_visibility(online_tts_frame)
@@ -653,12 +684,14 @@ class AccessHub(wx.Frame):
 
     def on_file_tools(self, event):
         """Opens the File Tools selection frame."""
+        FileTools = get_tool("file_tools")
         file_tools_frame = FileTools(self, title="File Tools")
         self.add_child_frame(file_tools_frame)
         self.manage_main_window_visibility(file_tools_frame)
         file_tools_frame.Show()
 
     def on_gemini_chat(self, event):
+        GeminiChat = get_tool("gemini_chat")
         gemini_frame = GeminiChat(self)
         self.add_child_frame(gemini_frame)
         self.manage_main_window_visibility(gemini_frame)
@@ -669,7 +702,9 @@ class AccessHub(wx.Frame):
         settings_dialog = SettingsDialog(self, self.config, config_path)
         settings_dialog.add_category(GeneralSettingsPanel)
         settings_dialog.add_category(AISettingsPanel)
-        settings_dialog.add_category(YoutubeSettings)
+        settings_dialog.add_category(get_tool("youtube_settings"))
+        settings_dialog.add_category(get_tool("media_cache_settings"))
+        settings_dialog.add_category(get_tool("file_tools_settings"))
         settings_dialog.ShowModal()
         settings_dialog.Destroy()
         # Reload Config After Settings Dialog Closes ---
@@ -796,6 +831,18 @@ class AccessHub(wx.Frame):
             except RuntimeError:
                 pass
 
+        # The download manager also starts without the Online Player, so check the modules themselves.
+        download_manager = sys.modules.get("tools.network_player.download_manager")
+        if download_manager:
+            # Running downloads are stopped here and resumed from their part files on the next start.
+            download_manager.shutdown_download_manager()
+        media_cache = sys.modules.get("tools.network_player.media_cache")
+        if media_cache:
+            media_cache.shutdown_media_cache()
+        extraction_engine = sys.modules.get("tools.network_player.extraction_engine")
+        if extraction_engine:
+            extraction_engine.shutdown_engine()
+
         self.close_all_children()
         if self.tbIcon:
             self.tbIcon.RemoveIcon()
@@ -816,6 +863,8 @@ class AccessHub(wx.Frame):
 
 
 if __name__ == "__main__":
+    # Lets worker processes, such as the Text Cleaner's, start in the packaged app.
+    multiprocessing.freeze_support()
     app = wx.App(False) 
     app.SetAppName(app_vars.app_name)
     app.SetVendorName(app_vars.developer)
@@ -895,4 +944,6 @@ if __name__ == "__main__":
         frame.Show(True)
 
     frame.Bind(wx.EVT_CLOSE, frame.OnClose)
+    tool_registry.mark_startup_step("Instance setup")
+    print(tool_registry.format_startup_report())
     app.MainLoop()
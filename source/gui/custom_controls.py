@@ -159,6 +159,15 @@ class CustomVirtualList(wx.ListCtrl):
         if len(self.data) > 0: # Refresh if data is set
             self.RefreshItems(0, len(self.data) - 1)
 
+    def AppendData(self, items):
+        """
+        Appends items to the current data source and updates the item count,
+        so rows can be added while the list is shown.
+        :param items: An iterable of data items in the same form as the data source.
+        """
+        self.data.extend(items)
+        self.SetItemCount(len(self.data))
+
     def OnGetItemText(self, item_idx, col_idx):
         """
         Called by wx.ListCtrl to get the text for a specific cell.
@@ -0,0 +1,122 @@
+import time
+import threading
+from collections import deque
+
+# How often coalesced progress is handed to the UI, in seconds.
+DEFAULT_REFRESH_INTERVAL = 0.25
+# Number of error lines kept for the failure message.
+DEFAULT_ERROR_TAIL = 10
+
+
+class ProcessOutputPump:
+    """
+    Reads the stdout and stderr of a subprocess at the same time, one thread
+    per pipe, so a process that writes a lot to one of them never blocks
+    because nobody is reading the other.
+
+    Every line is first given to parse_progress. If that returns something
+    other than None, the line is a progress update: only the latest one is
+    kept, and on_progress receives it at most once per refresh_interval, from
+    a separate dispatch thread. This keeps yt-dlp and ffmpeg, which print
+    progress many times a second, from flooding the UI with wx.CallAfter
+    calls. All other lines go to on_line(line, stream_name) as they arrive.
+
+    The last error_tail_size error lines are kept for the failure message.
+    Error lines are those for which is_error_line returns True, or every
+    stderr line when it is not given.
+
+    Callbacks run on the pump's threads; UI code has to use wx.CallAfter.
+    """
+    def __init__(self, process, parse_progress=None, on_progress=None, on_line=None,
+                 refresh_interval=DEFAULT_REFRESH_INTERVAL, error_tail_size=DEFAULT_ERROR_TAIL, is_error_line=None):
+        self.process = process
+        self.parse_progress = parse_progress
+        self.on_progress = on_progress
+        self.on_line = on_line
+        self.refresh_interval = refresh_interval
+        self.is_error_line = is_error_line
+        self._error_tail = deque(maxlen=error_tail_size)
+        self._lock = threading.Lock()
+        self._pending_progress = None
+        self._readers_done = threading.Event()
+        self._stopped = False
+        self._readers = []
+        self._dispatcher = None
+
+    def start(self):
+        streams = [('stdout', self.process.stdout), ('stderr', self.process.stderr)]
+        for name, stream in streams:
+            if stream is not None:
+                reader = threading.Thread(target=self._read, args=(stream, name), daemon=True, name=f"ProcessOutput-{name}")
+                self._readers.append(reader)
+                reader.start()
+        threading.Thread(target=self._wait_for_readers, daemon=True).start()
+        if self.on_progress:
+            self._dispatcher = threading.Thread(target=self._dispatch, daemon=True, name="ProcessOutput-progress")
+            self._dispatcher.start()
+        return self
+
+    def _read(self, stream, name):
+        try:
+            for line in stream:
+                line = line.strip()
+                if not line:
+                    continue
+                if self.is_error_line(line) if self.is_error_line else name == 'stderr':
+                    with self._lock:
+                        self._error_tail.append(line)
+                progress = self.parse_progress(line) if self.parse_progress else None
+                if progress is not None:
+                    with self._lock:
+                        self._pending_progress = progress
+                elif self.on_line and not self._stopped:
+                    self.on_line(line, name)
+        except (OSError, ValueError) as e:
+            # The pipe was closed under us, normally because the process was stopped.
+            if not self._stopped:
+                print(f"Error reading process {name}: {e}")
+        finally:
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+    def _wait_for_readers(self):
+        for reader in self._readers:
+            reader.join()
+        self._readers_done.set()
+
+    def _dispatch(self):
+        while not self._readers_done.wait(self.refresh_interval):
+            self._flush_progress()
+        # The last update, usually 100%, must not be lost.
+        self._flush_progress()
+
+    def _flush_progress(self):
+        with self._lock:
+            progress, self._pending_progress = self._pending_progress, None
+        if progress is not None and not self._stopped:
+            try:
+                self.on_progress(progress)
+            except Exception as e:
+                print(f"Error in progress callback: {e}")
+
+    def wait(self, timeout=None):
+        """Waits until both pipes are drained and the last progress is delivered. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not self._readers_done.wait(timeout):
+            return False
+        if self._dispatcher:
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            self._dispatcher.join(remaining)
+            return not self._dispatcher.is_alive()
+        return True
+
+    def stop(self):
+        """Stops delivering callbacks, for example when the user cancels. The pipes are still drained."""
+        self._stopped = True
+
+    @property
+    def error_lines(self):
+        with self._lock:
+            return list(self._error_tail)
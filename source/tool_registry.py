@@ -0,0 +1,99 @@
+"""
+Lazy loading of the Access Hub tools.
+
+Every tool lives in its own module, and many of them pull in heavy
+dependencies (VLC, paramiko, pydub, google-genai, speech_recognition and so
+on). Instead of importing all of them before the main window appears, the hub
+asks this registry for a tool's class the first time the user opens it.
+
+The registry also keeps a small startup report: how long each startup step
+took and how long each tool took to import, compared against a time budget.
+"""
+import time
+import importlib
+import threading
+
+# Target time in seconds from process start until the hub window is shown.
+STARTUP_BUDGET = 1.0
+
+# Maps a tool key to the module and attribute that implement it.
+TOOLS = {
+    "text_utilities": ("tools.text_utils.text_utils", "TextUtilitiesApp"),
+    "json_viewer": ("tools.text_utils.json_viewer", "JsonViewer"),
+    "xml_viewer": ("tools.text_utils.xml_viewer", "XMLViewer"),
+    "shutdown_control": ("tools.shutdown_control", "ShutdownControl"),
+    "network_player": ("tools.network_player.network_player", "NetworkPlayerFrame"),
+    "youtube_settings": ("tools.network_player.settings", "YoutubeSettings"),
+    "media_cache_settings": ("tools.network_player.settings", "MediaCacheSettings"),
+    "password_doctor": ("tools.password_doctor", "PasswordDoctorDialog"),
+    "task_scheduler": ("tools.task_scheduler.task_scheduler", "TaskScheduler"),
+    "elevenlabs": ("tools.eleven_labs.eleven_labs", "ElevenLabs"),
+    "ssh_terminal": ("tools.accessible_terminal.session_viewer", "SessionViewer"),
+    "speed_test": ("tools.speed_test", "SpeedTest"),
+    "online_tts": ("tools.online_tts.online_tts", "OnlineTTS"),
+    "file_tools": ("tools.file_utils.file_tools", "FileTools"),
+    "file_tools_settings": ("tools.file_utils.settings", "FileToolsSettings"),
+    "gemini_chat": ("tools.gemini.chat", "GeminiChat"),
+    "updater": ("tools.updater", "Updater"),
+}
+
+_lock = threading.Lock()
+_loaded = {}
+_process_start = time.perf_counter()
+_startup_steps = []
+_tool_import_times = {}
+
+
+def get_tool(key):
+    """
+    Returns the class registered under key, importing its module on first use.
+
+    Raises:
+        KeyError: If no tool is registered under key.
+        ImportError: If the tool's module or one of its dependencies cannot be imported.
+    """
+    with _lock:
+        if key in _loaded:
+            return _loaded[key]
+        module_name, attribute = TOOLS[key]
+        started = time.perf_counter()
+        module = importlib.import_module(module_name)
+        _tool_import_times[key] = time.perf_counter() - started
+        _loaded[key] = getattr(module, attribute)
+        return _loaded[key]
+
+def is_loaded(key):
+    with _lock:
+        return key in _loaded
+
+def get_tool_import_time(key):
+    """Returns how long the tool's first import took in seconds, or None if it is not loaded yet."""
+    with _lock:
+        return _tool_import_times.get(key)
+
+def mark_startup_step(name):
+    """Records that a startup step finished, timed from the end of the previous step."""
+    now = time.perf_counter()
+    previous = _startup_steps[-1][2] if _startup_steps else _process_start
+    _startup_steps.append((name, now - previous, now))
+
+def get_startup_time():
+    """Returns the seconds between process start and the last recorded startup step."""
+    if not _startup_steps:
+        return 0.0
+    return _startup_steps[-1][2] - _process_start
+
+def format_startup_report(budget=STARTUP_BUDGET):
+    """Returns the startup time breakdown and tool import times as text."""
+    total = get_startup_time()
+    status = "within" if total <= budget else "over"
+    lines = [f"Startup took {total * 1000:.0f} ms ({status} the {budget * 1000:.0f} ms budget)."]
+    for name, duration, _ in _startup_steps:
+        lines.append(f"  {name}: {duration * 1000:.0f} ms")
+    with _lock:
+        tool_times = sorted(_tool_import_times.items(), key=lambda item: item[1], reverse=True)
+    if tool_times:
+        lines.append("Tools imported on demand:")
+        for key, duration in tool_times:
+            lines.append(f"  {key}: {duration * 1000:.0f} ms")
+    return "\n".join(lines)
@@ -1,5 +1,6 @@
 import wx
 import vlc
+from vlc_engine import get_vlc_engine
 import requests
 import concurrent.futures, threading
 import os, re, tempfile
@@ -28,7 +29,7 @@ class SimplePlayer(wx.Dialog):
         self.audio_base64 = audio_base64
         self.media_type = media_type
         self.dialog_title = title
-        self._vlc_instance = None
+        self._vlc_engine = None
         self._media_player = None
         self._event_manager = None
         self._playback_started = False
@@ -123,9 +124,8 @@ class SimplePlayer(wx.Dialog):
             return
 
         try:
-            vlc_opts = ["--no-video", "--quiet"]
-            self._vlc_instance = vlc.Instance(vlc_opts)
-            self._media_player = self._vlc_instance.media_player_new()
+            self._vlc_engine = get_vlc_engine()
+            self._media_player = self._vlc_engine.new_player()
             self._event_manager = self._media_player.event_manager()
             self._media_player.audio_set_volume(100)
 
@@ -153,9 +153,9 @@ class SimplePlayer(wx.Dialog):
             return
         try:
             if self.temp_audio_file:
-                 media = self._vlc_instance.media_new_path(self.temp_audio_file)
+                 media = self._vlc_engine.new_media_path(self.temp_audio_file, 'no-video')
             else:
-                 media = self._vlc_instance.media_new(self.audio_url)
+                 media = self._vlc_engine.new_media(self.audio_url, 'no-video')
 
             media.add_option('network-caching=1000') # Still useful for URLs
             self._media_player.set_media(media)
@@ -385,12 +385,7 @@ class SimplePlayer(wx.Dialog):
             except Exception: pass
             self._media_player = None
 
-        # Release VLC Instance ---
-        # Releasing instance might affect other players if shared, often not needed per-dialog
-        # if self._vlc_instance:
-        #      try: self._vlc_instance.release()
-        #      except Exception: pass
-        #      self._vlc_instance = None
+        # The VLC instance is shared by the whole app and is never released here.
 
         # Delete Temporary File ---
         if self.temp_audio_file:
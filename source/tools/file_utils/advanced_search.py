@@ -1,6 +1,8 @@
 import wx
+import wx.adv
 from gui.custom_controls import CustomVirtualList
-from .search_utils import SearchWorkerThread, EVT_SEARCH_PROGRESS, EVT_SEARCH_DONE
+from gui.settings import get_file_path
+from .search_utils import SearchWorkerThread, IndexSearchWorkerThread, SearchFilters, MAX_CONTENT_SIZE, DEFAULT_EXCLUDED_DIRS, EVT_SEARCH_PROGRESS, EVT_SEARCH_RESULTS, EVT_SEARCH_DONE
 from speech import speak
 import subprocess
 import os
@@ -11,16 +13,19 @@ class AdvancedSearchDialog(wx.Dialog):
     """
     A dialog for configuring and starting an advanced file search.
     Allows searching by filename/pattern (optionally regex) within
-    specified drives or the entire device.
+    specified drives or the entire device, either from the persistent
+    file index or with a live walk of the file system. Optionally only
+    reports files whose contents contain a given text or pattern, and
+    narrows results by extension, size, modification date and excluded folders.
     """
     def __init__(self, parent):
-        super(AdvancedSearchDialog, self).__init__(parent, title="Advanced File Search", size=(500, 280))
+        super(AdvancedSearchDialog, self).__init__(parent, title="Advanced File Search", size=(550, 650))
         self.panel = wx.Panel(self)
         self.search_thread = None
-        self.progress_dialog = None
+        self.results_dialog = None
 
         main_sizer = wx.BoxSizer(wx.VERTICAL)
-        params_fgs = wx.FlexGridSizer(3, 2, 5, 5)
+        params_fgs = wx.FlexGridSizer(8, 2, 5, 5)
         params_fgs.AddGrowableCol(1, 1)
 
         params_fgs.Add(wx.StaticText(self.panel, label="File Name/Pattern:"), 0, wx.ALIGN_CENTER_VERTICAL | wx.ALIGN_RIGHT)
@@ -31,15 +36,70 @@ class AdvancedSearchDialog(wx.Dialog):
         self.use_regex_cb = wx.CheckBox(self.panel, label="Use Regular Expression")
         params_fgs.Add(self.use_regex_cb, 1, wx.EXPAND)
 
+        params_fgs.Add(wx.StaticText(self.panel, label="Containing Text:"), 0, wx.ALIGN_CENTER_VERTICAL | wx.ALIGN_RIGHT)
+        self.content_text = wx.TextCtrl(self.panel)
+        params_fgs.Add(self.content_text, 1, wx.EXPAND)
+
+        params_fgs.AddSpacer(0)
+        self.content_regex_cb = wx.CheckBox(self.panel, label="Containing text is a regular expression")
+        params_fgs.Add(self.content_regex_cb, 1, wx.EXPAND)
+
+        params_fgs.Add(wx.StaticText(self.panel, label="Skip files larger than (MB):"), 0, wx.ALIGN_CENTER_VERTICAL | wx.ALIGN_RIGHT)
+        self.max_content_size_spin = wx.SpinCtrl(self.panel, min=1, max=4096, initial=MAX_CONTENT_SIZE // (1024 * 1024))
+        params_fgs.Add(self.max_content_size_spin, 1, wx.EXPAND)
+
         params_fgs.Add(wx.StaticText(self.panel, label="Look In:"), 0, wx.ALIGN_CENTER_VERTICAL | wx.ALIGN_RIGHT)        
         partitions = ["Entire Device"]
         partitions.extend(self.get_drives())
         
         self.look_in_combo = wx.ComboBox(self.panel, choices=partitions, style=wx.CB_READONLY)
         self.look_in_combo.SetValue("Entire Device")
-        params_fgs.Add(self.look_in_combo, 1, wx.EXPAND)        
+        params_fgs.Add(self.look_in_combo, 1, wx.EXPAND)
+
+        params_fgs.AddSpacer(0)
+        self.use_index_cb = wx.CheckBox(self.panel, label="Search using the file index (faster, uncheck for a live search)")
+        self.use_index_cb.SetValue(True)
+        params_fgs.Add(self.use_index_cb, 1, wx.EXPAND)
+
+        params_fgs.AddSpacer(0)
+        self.refresh_index_cb = wx.CheckBox(self.panel, label="Update the file index before searching")
+        params_fgs.Add(self.refresh_index_cb, 1, wx.EXPAND)
         main_sizer.Add(params_fgs, 0, wx.EXPAND | wx.ALL, 10)
 
+        filters_box = wx.StaticBox(self.panel, label="Filters")
+        filters_sizer = wx.StaticBoxSizer(filters_box, wx.VERTICAL)
+        filters_fgs = wx.FlexGridSizer(0, 2, 5, 5)
+        filters_fgs.AddGrowableCol(1, 1)
+
+        filters_fgs.Add(wx.StaticText(self.panel, label="Extensions (e.g. .txt, .pdf):"), 0, wx.ALIGN_CENTER_VERTICAL | wx.ALIGN_RIGHT)
+        self.extensions_text = wx.TextCtrl(self.panel)
+        filters_fgs.Add(self.extensions_text, 1, wx.EXPAND)
+
+        filters_fgs.Add(wx.StaticText(self.panel, label="Minimum size (KB, 0 for none):"), 0, wx.ALIGN_CENTER_VERTICAL | wx.ALIGN_RIGHT)
+        self.min_size_spin = wx.SpinCtrl(self.panel, min=0, max=2**31 - 1, initial=0)
+        filters_fgs.Add(self.min_size_spin, 1, wx.EXPAND)
+
+        filters_fgs.Add(wx.StaticText(self.panel, label="Maximum size (KB, 0 for none):"), 0, wx.ALIGN_CENTER_VERTICAL | wx.ALIGN_RIGHT)
+        self.max_size_spin = wx.SpinCtrl(self.panel, min=0, max=2**31 - 1, initial=0)
+        filters_fgs.Add(self.max_size_spin, 1, wx.EXPAND)
+
+        filters_fgs.Add(wx.StaticText(self.panel, label="Modified after:"), 0, wx.ALIGN_CENTER_VERTICAL | wx.ALIGN_RIGHT)
+        self.modified_after_picker = wx.adv.DatePickerCtrl(self.panel, style=wx.adv.DP_DROPDOWN | wx.adv.DP_SHOWCENTURY | wx.adv.DP_ALLOWNONE)
+        self.modified_after_picker.SetValue(wx.DefaultDateTime)
+        filters_fgs.Add(self.modified_after_picker, 1, wx.EXPAND)
+
+        filters_fgs.Add(wx.StaticText(self.panel, label="Modified before:"), 0, wx.ALIGN_CENTER_VERTICAL | wx.ALIGN_RIGHT)
+        self.modified_before_picker = wx.adv.DatePickerCtrl(self.panel, style=wx.adv.DP_DROPDOWN | wx.adv.DP_SHOWCENTURY | wx.adv.DP_ALLOWNONE)
+        self.modified_before_picker.SetValue(wx.DefaultDateTime)
+        filters_fgs.Add(self.modified_before_picker, 1, wx.EXPAND)
+
+        filters_fgs.Add(wx.StaticText(self.panel, label="Exclude folders:"), 0, wx.ALIGN_CENTER_VERTICAL | wx.ALIGN_RIGHT)
+        self.excluded_dirs_text = wx.TextCtrl(self.panel, value=", ".join(DEFAULT_EXCLUDED_DIRS))
+        filters_fgs.Add(self.excluded_dirs_text, 1, wx.EXPAND)
+
+        filters_sizer.Add(filters_fgs, 1, wx.EXPAND | wx.ALL, 5)
+        main_sizer.Add(filters_sizer, 0, wx.EXPAND | wx.LEFT | wx.RIGHT, 10)
+
         btn_sizer = wx.StdDialogButtonSizer()
         self.start_search_btn = wx.Button(self.panel, wx.ID_OK, label="Start Searching")
         self.start_search_btn.SetDefault()
@@ -50,11 +110,13 @@ class AdvancedSearchDialog(wx.Dialog):
         main_sizer.Add(btn_sizer, 0, wx.ALIGN_CENTER | wx.ALL, 10)
 
         self.start_search_btn.Bind(wx.EVT_BUTTON, self.on_start_search)
+        self.use_index_cb.Bind(wx.EVT_CHECKBOX, self.on_use_index_toggled)
         self.panel.SetSizer(main_sizer)
         self.Layout()
         self.Centre()
 
         self.Bind(EVT_SEARCH_PROGRESS, self.on_search_progress)
+        self.Bind(EVT_SEARCH_RESULTS, self.on_search_results)
         self.Bind(EVT_SEARCH_DONE, self.on_search_done)
         self.Bind(wx.EVT_CLOSE, self.on_dialog_close)
 
@@ -71,11 +133,38 @@ class AdvancedSearchDialog(wx.Dialog):
             return []
         return drives
 
+    def on_use_index_toggled(self, event):
+        """Enables the index refresh option only when searching from the index."""
+        self.refresh_index_cb.Enable(self.use_index_cb.IsChecked())
+
+    def _get_filters(self):
+        """Builds SearchFilters from the filter controls."""
+        min_kb = self.min_size_spin.GetValue()
+        max_kb = self.max_size_spin.GetValue()
+        modified_after = None
+        after_date = self.modified_after_picker.GetValue()
+        if after_date.IsValid():
+            modified_after = after_date.GetTicks()
+        modified_before = None
+        before_date = self.modified_before_picker.GetValue()
+        if before_date.IsValid():
+            # Include the whole selected day.
+            modified_before = before_date.GetTicks() + 24 * 60 * 60
+        return SearchFilters(
+            min_size=min_kb * 1024 if min_kb else None,
+            max_size=max_kb * 1024 if max_kb else None,
+            modified_after=modified_after,
+            modified_before=modified_before,
+            extensions=SearchFilters.parse_list(self.extensions_text.GetValue()),
+            excluded_dirs=SearchFilters.parse_list(self.excluded_dirs_text.GetValue())
+        )
+
     def on_start_search(self, event):
         """Handles the Start Searching button click."""
         search_term = self.search_term_text.GetValue()
-        if not search_term:
-            wx.MessageBox("Please enter a search term.", "Input Error", wx.OK | wx.ICON_ERROR)
+        content_term = self.content_text.GetValue()
+        if not search_term and not content_term and not self.extensions_text.GetValue().strip():
+            wx.MessageBox("Please enter a file name, extensions, or the text to search for inside files.", "Input Error", wx.OK | wx.ICON_ERROR)
             return
 
         selected_loc = self.look_in_combo.GetValue()
@@ -90,74 +179,72 @@ class AdvancedSearchDialog(wx.Dialog):
             return
 
         use_regex = self.use_regex_cb.IsChecked()
-        self.progress_dialog = wx.ProgressDialog(
-            "Searching Files", "Initializing search...", maximum=100, parent=self,
-            style=wx.PD_APP_MODAL | wx.PD_AUTO_HIDE | wx.PD_ELAPSED_TIME | wx.PD_CAN_ABORT | wx.PD_SMOOTH
-        )
-        self.progress_dialog.Show()
-        self.progress_dialog.Bind(wx.EVT_UPDATE_UI, lambda evt: None)
-        self.progress_dialog.Bind(wx.EVT_CLOSE, self.on_cancel_search_progress_external)
-
-        self.search_thread = SearchWorkerThread(self, search_term, search_roots, use_regex)
+        content_options = {
+            "content_term": content_term or None,
+            "content_regex": self.content_regex_cb.IsChecked(),
+            "max_content_size": self.max_content_size_spin.GetValue() * 1024 * 1024,
+            "filters": self._get_filters(),
+        }
+        if self.use_index_cb.IsChecked():
+            self.search_thread = IndexSearchWorkerThread(
+                self, search_term, search_roots, use_regex,
+                index_path=get_file_path("file_index.db"),
+                refresh_index=self.refresh_index_cb.IsChecked(),
+                **content_options
+            )
+        else:
+            self.search_thread = SearchWorkerThread(self, search_term, search_roots, use_regex, **content_options)
         if self.search_thread.error_message:
             wx.MessageBox(self.search_thread.error_message, "Regex Error", wx.OK | wx.ICON_ERROR)
-            self.on_search_cancelled_or_failed()
+            self.search_thread = None
             return
+
+        # Results are streamed into the dialog while the search is running.
+        self.results_dialog = SearchResultsDialog(self, "Search Results", [], stop_callback=self.stop_search)
         self.search_thread.start()
+        self.results_dialog.ShowModal()
+        self.stop_search()
+        self.results_dialog.Destroy()
+        self.results_dialog = None
 
-    def on_search_progress(self, event):
-        """Updates the progress dialog during the search."""
-        if self.progress_dialog:
-            msg = f"Files Searched: {event.files_searched}, Matches Found: {event.matches_found}"
-            keep_going, _ = self.progress_dialog.Pulse(msg)
-            if not keep_going:
-                self.on_cancel_search_progress_internal()
-
-    def on_cancel_search_progress_external(self, event):
-        """Called when user closes progress dialog directly."""
-        self.on_cancel_search_progress_internal()
-        if self.progress_dialog: self.progress_dialog.Destroy()
-        self.progress_dialog = None
-        event.Skip()
-
-    def on_cancel_search_progress_internal(self):
-        """Internal logic for cancelling search."""
+    def stop_search(self):
+        """Asks the running search thread, if any, to stop."""
         if self.search_thread and self.search_thread.is_alive():
             self.search_thread.stop()
-        self.on_search_cancelled_or_failed()
 
-    def on_search_cancelled_or_failed(self):
-        """Common cleanup for cancellation or failure before results."""
-        if self.progress_dialog:
-            self.progress_dialog.Destroy()
-            self.progress_dialog = None
+    def _is_current_search(self, event):
+        """
+        False for events from an earlier search that was stopped but is still
+        winding down, so they never reach the results of the current one.
+        """
+        return event.thread is self.search_thread
+
+    def on_search_progress(self, event):
+        """Updates the live status of the results dialog during the search."""
+        if self.results_dialog and self._is_current_search(event):
+            self.results_dialog.update_progress(event.files_searched, event.matches_found)
+
+    def on_search_results(self, event):
+        """Appends a batch of streamed matches to the results dialog."""
+        if self.results_dialog and self._is_current_search(event):
+            self.results_dialog.add_results(event.results)
 
     def on_search_done(self, event):
         """Handles the completion of the search thread."""
-        if self.progress_dialog:
-            self.progress_dialog.Destroy()
-            self.progress_dialog = None
-
-        if event.error == "Cancelled": return
-        if event.error:
-            wx.MessageBox(f"Search failed: {event.error}", "Search Error", wx.OK | wx.ICON_ERROR)
+        if not self._is_current_search(event):
+            return
+        self.search_thread = None
+        if not self.results_dialog:
             return
 
-        results = event.results
-        if not results:
-            wx.MessageBox("No files found matching your criteria.", "Search Complete", wx.OK | wx.ICON_INFORMATION)
-        else:
-            results_dialog = SearchResultsDialog(self, "Search Results", results)
-            results_dialog.ShowModal()
-            results_dialog.Destroy()
+        cancelled = event.error == "Cancelled"
+        self.results_dialog.search_finished(cancelled)
+        if event.error and not cancelled:
+            wx.MessageBox(f"Search failed: {event.error}", "Search Error", wx.OK | wx.ICON_ERROR)
 
     def on_dialog_close(self, event):
         """Handles closing the AdvancedSearchDialog itself."""
-        if self.search_thread and self.search_thread.is_alive():
-            self.search_thread.stop()
-        if self.progress_dialog:
-            self.progress_dialog.Destroy()
-            self.progress_dialog = None
+        self.stop_search()
         self.EndModal(wx.ID_CANCEL)
 
 
@@ -165,8 +252,10 @@ class SearchResultsDialog(wx.Dialog):
     """
     A dialog to display the results of a file search.
     Allows copying file paths or showing files in the file explorer.
+    Results can be appended while the search is still running, so early
+    hits are usable before the search finishes.
     """
-    def __init__(self, parent, title, results_data):
+    def __init__(self, parent, title, results_data, stop_callback=None):
         """
         Initializes the SearchResultsDialog.
 
@@ -174,18 +263,22 @@ class SearchResultsDialog(wx.Dialog):
             parent: The parent wx.Window.
             title (str): The dialog title.
             results_data (list): A list of tuples (filename, filepath, size) of search results.
+            stop_callback (callable, optional): Called when the user stops a running search.
+                When given, the dialog starts in the searching state.
         """
         super(SearchResultsDialog, self).__init__(parent, title=title, size=(700, 400))
         self.results_data = results_data
+        self.stop_callback = stop_callback
+        self.searching = stop_callback is not None
 
         panel = wx.Panel(self)
         main_sizer = wx.BoxSizer(wx.VERTICAL)
 
-        results_label = wx.StaticText(panel, label=f"Found {len(self.results_data)} items:")
-        font = results_label.GetFont()
+        self.results_label = wx.StaticText(panel, label=f"Found {len(self.results_data)} items:")
+        font = self.results_label.GetFont()
         font.SetWeight(wx.FONTWEIGHT_BOLD)
-        results_label.SetFont(font)
-        main_sizer.Add(results_label, 0, wx.ALL | wx.ALIGN_LEFT, 10)
+        self.results_label.SetFont(font)
+        main_sizer.Add(self.results_label, 0, wx.ALL | wx.ALIGN_LEFT, 10)
 
         list_style = wx.LC_REPORT | wx.LC_SINGLE_SEL | wx.LC_VRULES | wx.LC_VIRTUAL
         self.results_list_ctrl = CustomVirtualList(panel, style=list_style)
@@ -198,22 +291,58 @@ class SearchResultsDialog(wx.Dialog):
         btn_sizer = wx.BoxSizer(wx.HORIZONTAL)
         copy_path_btn = wx.Button(panel, label="Copy Path")
         show_in_folder_btn = wx.Button(panel, label="Show in Folder")
+        self.stop_search_btn = wx.Button(panel, label="Stop Search")
         close_btn = wx.Button(panel, wx.ID_OK, label="Close")
 
         btn_sizer.Add(copy_path_btn, 0, wx.ALL, 5)
         btn_sizer.Add(show_in_folder_btn, 0, wx.ALL, 5)
+        btn_sizer.Add(self.stop_search_btn, 0, wx.ALL, 5)
         btn_sizer.AddStretchSpacer(1)
         btn_sizer.Add(close_btn, 0, wx.ALL, 5)
         main_sizer.Add(btn_sizer, 0, wx.EXPAND | wx.ALL, 5)
 
         copy_path_btn.Bind(wx.EVT_BUTTON, self.on_copy_path)
         show_in_folder_btn.Bind(wx.EVT_BUTTON, self.on_show_in_folder)
+        self.stop_search_btn.Bind(wx.EVT_BUTTON, self.on_stop_search)
         close_btn.Bind(wx.EVT_BUTTON, lambda event: self.EndModal(wx.ID_OK))
 
+        if self.searching:
+            self.results_label.SetLabel("Searching...")
+        else:
+            self.stop_search_btn.Hide()
+
         panel.SetSizer(main_sizer)
         self.Layout()
         self.Centre()
 
+    def add_results(self, results):
+        """Appends a batch of (filename, filepath, size) tuples to the list."""
+        self.results_list_ctrl.AppendData(results)
+
+    def update_progress(self, files_searched, matches_found):
+        """Updates the status label while the search is running."""
+        if self.searching:
+            self.results_label.SetLabel(f"Searching... Files searched: {files_searched}, found {len(self.results_data)} items:")
+
+    def search_finished(self, cancelled=False):
+        """Switches the dialog out of the searching state."""
+        self.searching = False
+        self.stop_search_btn.Disable()
+        count = len(self.results_data)
+        if count == 0:
+            label = "No files found matching your criteria."
+        elif cancelled:
+            label = f"Search stopped. Found {count} items:"
+        else:
+            label = f"Found {count} items:"
+        self.results_label.SetLabel(label)
+        speak(label)
+
+    def on_stop_search(self, event):
+        """Stops the running search, keeping the results found so far."""
+        if self.stop_callback:
+            self.stop_callback()
+
     def _get_display_text_for_item(self, item_idx, col_idx):
         """
         Retriever function passed to VirtualListCtrl.
@@ -0,0 +1,277 @@
+"""
+Throughput benchmark for the Media Converter.
+
+Generates synthetic audio and video inputs locally with ffmpeg's lavfi sources,
+runs them through ConversionWorkerThread at different concurrency levels,
+output formats and encoder presets, and writes files per second, real-time
+factor and, on Windows, peak memory per run to a JSON report.
+
+Run from the source directory:
+    python -m tools.file_utils.converter_benchmark --concurrency 1,2,4,8 --formats mp3,opus
+"""
+import wx
+import os
+import sys
+import json
+import time
+import shutil
+import ctypes
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from .media_converter import ConversionWorkerThread, CODECS, VIDEO_RESOLUTIONS, ENCODER_PRESETS
+
+DEFAULT_CONCURRENCY = "1,2,4"
+DEFAULT_FORMATS = "mp3,m4a,opus,flac"
+DEFAULT_PRESETS = "ultrafast,medium"
+
+
+def find_executable(name, explicit_path=None):
+    """Finds ffmpeg or ffprobe the same way the app does: bundled copy first, then PATH."""
+    if explicit_path:
+        return explicit_path
+    base_dir = os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else os.getcwd()
+    local_path = os.path.join(base_dir, f"{name}.exe")
+    if os.path.exists(local_path):
+        return local_path
+    return shutil.which(name)
+
+def get_process_peak_rss(process):
+    """Returns the peak working set of a finished child process in bytes, or None if unavailable."""
+    if sys.platform != 'win32':
+        return None
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", ctypes.c_ulong),
+            ("PageFaultCount", ctypes.c_ulong),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    try:
+        # Popen keeps the process handle open after wait(), so the counters are still readable.
+        handle = ctypes.c_void_p(int(process._handle))
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+    except (AttributeError, OSError):
+        pass
+    return None
+
+def run_ffmpeg(ffmpeg_path, args):
+    subprocess.run([ffmpeg_path, '-hide_banner', '-v', 'error', '-y'] + args, check=True)
+
+def get_ffmpeg_version(ffmpeg_path):
+    try:
+        output = subprocess.check_output([ffmpeg_path, '-version'], text=True)
+        return output.splitlines()[0]
+    except (OSError, subprocess.CalledProcessError, IndexError):
+        return "unknown"
+
+
+class SyntheticInputs:
+    """Creates the benchmark input files in a work directory."""
+    def __init__(self, ffmpeg_path, work_dir, duration, audio_count, video_count):
+        self.ffmpeg_path = ffmpeg_path
+        self.work_dir = work_dir
+        self.duration = duration
+        self.audio_files = []
+        self.video_files = []
+        self.image_path = os.path.join(work_dir, "cover.png")
+
+        for i in range(audio_count):
+            path = os.path.join(work_dir, f"audio_{i:03d}.wav")
+            # Different frequencies so no two inputs are identical.
+            run_ffmpeg(ffmpeg_path, [
+                '-f', 'lavfi', '-i', f"sine=frequency={220 + i * 20}:sample_rate=44100:duration={duration}",
+                '-ac', '2', '-c:a', 'pcm_s16le', path
+            ])
+            self.audio_files.append(path)
+
+        for i in range(video_count):
+            path = os.path.join(work_dir, f"video_{i:03d}.mp4")
+            run_ffmpeg(ffmpeg_path, [
+                '-f', 'lavfi', '-i', f"testsrc2=size=1280x720:rate=30:duration={duration}",
+                '-f', 'lavfi', '-i', f"sine=frequency={330 + i * 20}:sample_rate=48000:duration={duration}",
+                '-shortest', '-c:v', 'libx264', '-preset', 'ultrafast', '-c:a', 'aac', '-b:a', '128k', path
+            ])
+            self.video_files.append(path)
+
+        run_ffmpeg(ffmpeg_path, ['-f', 'lavfi', '-i', 'testsrc2=size=1920x1080', '-frames:v', '1', self.image_path])
+
+
+class ConverterBenchmark:
+    """Runs ConversionWorkerThread over a matrix of settings and collects the measurements."""
+    def __init__(self, ffmpeg_path, ffprobe_path, inputs, output_dir, allow_stream_copy=False):
+        self.ffmpeg_path = ffmpeg_path
+        self.ffprobe_path = ffprobe_path
+        self.inputs = inputs
+        self.output_dir = output_dir
+        self.allow_stream_copy = allow_stream_copy
+        self.handler = wx.EvtHandler()
+        self.results = []
+
+    def _run_job(self, files, settings, concurrency):
+        peaks = []
+        peaks_lock = threading.Lock()
+
+        def observe(original_path, process):
+            peak = get_process_peak_rss(process)
+            if peak is not None:
+                with peaks_lock:
+                    peaks.append(peak)
+
+        job_files = [(path, os.path.basename(path)) for path in files]
+        thread = ConversionWorkerThread(self.handler, job_files, settings, self.ffmpeg_path, self.ffprobe_path,
+                                        max_workers=concurrency, process_observer=observe)
+        start = time.perf_counter()
+        thread.start()
+        thread.join()
+        elapsed = time.perf_counter() - start
+
+        # Only measured on Windows; the converter itself only runs there.
+        peak_rss = max(peaks) if peaks else None
+        media_seconds = self.inputs.duration * len(files)
+        return {
+            'files': len(files),
+            'converted': thread.converted_count,
+            'failed': len(thread.errors),
+            'stream_copied': len(thread.stream_copied),
+            'wall_seconds': round(elapsed, 3),
+            'files_per_second': round(len(files) / elapsed, 3) if elapsed else None,
+            'realtime_factor': round(media_seconds / elapsed, 2) if elapsed else None,
+            'peak_rss_bytes': peak_rss,
+            'errors': thread.errors[:5],
+        }
+
+    def run_audio_suite(self, formats, concurrency_levels):
+        files = self.inputs.audio_files + self.inputs.video_files
+        for output_format in formats:
+            for concurrency in concurrency_levels:
+                run_dir = os.path.join(self.output_dir, f"{output_format}_x{concurrency}")
+                os.makedirs(run_dir, exist_ok=True)
+                settings = {
+                    'format': output_format,
+                    'codec': CODECS[output_format],
+                    'bitrate': '128k',
+                    'sample_rate': '48000',
+                    'channels': '2',
+                    'overwrite': True,
+                    'copy_metadata': True,
+                    'allow_stream_copy': self.allow_stream_copy,
+                    'output_dir': run_dir,
+                }
+                print(f"Audio: {output_format}, concurrency {concurrency}...", flush=True)
+                result = self._run_job(files, settings, concurrency)
+                result.update({'suite': 'audio', 'format': output_format, 'concurrency': concurrency})
+                self.results.append(result)
+                shutil.rmtree(run_dir, ignore_errors=True)
+
+    def run_video_suite(self, formats, presets):
+        source = self.inputs.audio_files[:1]
+        if not source:
+            return
+        for output_format in formats:
+            for preset in presets:
+                output_path = os.path.join(self.output_dir, f"video_{preset}.{output_format}")
+                settings = {
+                    'format': output_format,
+                    'codec': CODECS[output_format],
+                    'bitrate': '128k',
+                    'sample_rate': '48000',
+                    'channels': '2',
+                    'overwrite': True,
+                    'copy_metadata': True,
+                    'allow_stream_copy': False,
+                    'output_filepath': output_path,
+                    'image_path': self.inputs.image_path,
+                    'resolution': VIDEO_RESOLUTIONS["1080p (1920x1080)"],
+                    'fps': '30',
+                    'encoder_preset': preset,
+                }
+                print(f"Video: {output_format}, preset {preset}...", flush=True)
+                result = self._run_job(source, settings, 1)
+                result.update({'suite': 'video', 'format': output_format, 'preset': preset, 'concurrency': 1})
+                self.results.append(result)
+                try:
+                    os.remove(output_path)
+                except OSError:
+                    pass
+
+
+def parse_list(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Media Converter with synthetic inputs.")
+    parser.add_argument("--ffmpeg", help="Path to ffmpeg (defaults to the bundled copy or PATH).")
+    parser.add_argument("--ffprobe", help="Path to ffprobe (defaults to the bundled copy or PATH).")
+    parser.add_argument("--audio-files", type=int, default=8, help="Number of synthetic audio inputs.")
+    parser.add_argument("--video-files", type=int, default=2, help="Number of synthetic video inputs.")
+    parser.add_argument("--duration", type=int, default=30, help="Length of each input in seconds.")
+    parser.add_argument("--concurrency", default=DEFAULT_CONCURRENCY, help="Comma separated concurrency levels.")
+    parser.add_argument("--formats", default=DEFAULT_FORMATS, help="Comma separated audio output formats.")
+    parser.add_argument("--video-formats", default="mp4", help="Comma separated video output formats, empty to skip.")
+    parser.add_argument("--presets", default=DEFAULT_PRESETS, help="Comma separated x264 presets for the video suite.")
+    parser.add_argument("--allow-stream-copy", action="store_true", help="Let matching inputs take the stream copy fast path.")
+    parser.add_argument("--work-dir", help="Directory for inputs and outputs (a temporary one by default).")
+    parser.add_argument("--output", default="converter_benchmark.json", help="Where to write the JSON report.")
+    args = parser.parse_args(argv)
+
+    ffmpeg_path = find_executable("ffmpeg", args.ffmpeg)
+    ffprobe_path = find_executable("ffprobe", args.ffprobe)
+    if not ffmpeg_path or not ffprobe_path:
+        parser.error("ffmpeg and ffprobe are required.")
+
+    formats = parse_list(args.formats)
+    video_formats = parse_list(args.video_formats)
+    presets = parse_list(args.presets)
+    unknown = [f for f in formats + video_formats if f not in CODECS]
+    unknown += [p for p in presets if p not in ENCODER_PRESETS.values()]
+    if unknown:
+        parser.error(f"Unknown formats or presets: {', '.join(unknown)}")
+    concurrency_levels = [int(c) for c in parse_list(args.concurrency)]
+
+    # ConversionWorkerThread reports through wx.CallAfter, which needs an App.
+    app = wx.App(False)
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="converter_benchmark_")
+    os.makedirs(work_dir, exist_ok=True)
+    try:
+        print("Generating synthetic inputs...", flush=True)
+        inputs = SyntheticInputs(ffmpeg_path, work_dir, args.duration, args.audio_files, args.video_files)
+        output_dir = os.path.join(work_dir, "output")
+        os.makedirs(output_dir, exist_ok=True)
+
+        benchmark = ConverterBenchmark(ffmpeg_path, ffprobe_path, inputs, output_dir, args.allow_stream_copy)
+        benchmark.run_audio_suite(formats, concurrency_levels)
+        benchmark.run_video_suite(video_formats, presets)
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'ffmpeg_version': get_ffmpeg_version(ffmpeg_path),
+        'input_duration_seconds': args.duration,
+        'results': benchmark.results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+    del app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+import sqlite3
+import os
+import re
+import time
+
+# Rows are written in batches of this many directories before committing.
+COMMIT_INTERVAL = 500
+# Bumped when the tables change; older index files are rebuilt from scratch.
+SCHEMA_VERSION = 2
+
+
+class FilenameIndex:
+    """
+    A persistent SQLite index of file names used by the Advanced File Search.
+
+    Every indexed directory is stored together with its modification time, so
+    later refreshes only re-list directories whose contents actually changed.
+    Unchanged directories are skipped with a single stat call, and their
+    subdirectories are taken from the index instead of the disk.
+
+    When the SQLite build supports the FTS5 trigram tokenizer, file names are
+    also stored in a full text table so substring queries do not need a full
+    table scan. File sizes are recorded at the time a directory is listed and
+    may be out of date until its directory changes again.
+
+    Directories are shared by every root that contains them, so indexing a
+    folder and then one of its parents, or the other way round, reuses the
+    same rows. Searches select directories by path prefix, not by the root
+    that first indexed them.
+
+    A FilenameIndex holds an SQLite connection and must only be used from the
+    thread that created it.
+    """
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.has_trigram = False
+        self._create_schema()
+
+    def _create_schema(self):
+        cur = self.conn.cursor()
+        if cur.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            # The index is only a cache of the disk, so old layouts are simply dropped.
+            cur.executescript("""
+                DROP TRIGGER IF EXISTS files_ai;
+                DROP TRIGGER IF EXISTS files_ad;
+                DROP TABLE IF EXISTS files_fts;
+                DROP TABLE IF EXISTS files;
+                DROP TABLE IF EXISTS dirs;
+                DROP TABLE IF EXISTS roots;
+            """)
+            cur.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        cur.executescript("""
+            CREATE TABLE IF NOT EXISTS roots (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                indexed_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS dirs (
+                id INTEGER PRIMARY KEY,
+                parent_id INTEGER,
+                path TEXT UNIQUE NOT NULL,
+                mtime REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_dirs_parent ON dirs(parent_id);
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY,
+                dir_id INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                size INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_files_dir ON files(dir_id);
+        """)
+        try:
+            cur.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(
+                    name, content='files', content_rowid='id', tokenize='trigram'
+                );
+                CREATE TRIGGER IF NOT EXISTS files_ai AFTER INSERT ON files BEGIN
+                    INSERT INTO files_fts(rowid, name) VALUES (new.id, new.name);
+                END;
+                CREATE TRIGGER IF NOT EXISTS files_ad AFTER DELETE ON files BEGIN
+                    INSERT INTO files_fts(files_fts, rowid, name) VALUES ('delete', old.id, old.name);
+                END;
+            """)
+            self.has_trigram = True
+        except sqlite3.OperationalError:
+            # Older SQLite builds have no trigram tokenizer; fall back to LIKE scans.
+            self.has_trigram = False
+        self.conn.commit()
+
+    def close(self):
+        try:
+            self.conn.close()
+        except sqlite3.Error:
+            pass
+
+    @staticmethod
+    def normalize_root(root):
+        return os.path.normcase(os.path.abspath(root))
+
+    @staticmethod
+    def _is_under_root(norm_dir_path, norm_root):
+        return norm_dir_path == norm_root or norm_dir_path.startswith(norm_root.rstrip(os.sep) + os.sep)
+
+    def _get_root_id(self, root):
+        row = self.conn.execute("SELECT id FROM roots WHERE path = ?", (self.normalize_root(root),)).fetchone()
+        return row[0] if row else None
+
+    def is_indexed(self, root):
+        """Returns True if the given root has been fully indexed at least once."""
+        row = self.conn.execute("SELECT indexed_at FROM roots WHERE path = ?", (self.normalize_root(root),)).fetchone()
+        return bool(row and row[0])
+
+    def refresh(self, root, progress_callback=None, is_cancelled=None):
+        """
+        Builds or incrementally updates the index for a search root.
+
+        Args:
+            root (str): The directory or drive to index.
+            progress_callback (callable, optional): Called as f(dirs_checked, files_indexed).
+            is_cancelled (callable, optional): Returns True when the refresh should stop.
+
+        Returns:
+            bool: True if the refresh finished, False if it was cancelled.
+        """
+        norm_root = self.normalize_root(root)
+        cur = self.conn.cursor()
+        cur.execute("INSERT OR IGNORE INTO roots(path) VALUES (?)", (norm_root,))
+        root_id = self._get_root_id(root)
+
+        dirs_checked = 0
+        files_indexed = 0
+        pending = 0
+        stack = [(os.path.abspath(root), None)]
+        while stack:
+            if is_cancelled and is_cancelled():
+                self.conn.commit()
+                return False
+            path, parent_id = stack.pop()
+            dirs_checked += 1
+
+            row = cur.execute("SELECT id, mtime FROM dirs WHERE path = ?", (path,)).fetchone()
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                if row:
+                    self._remove_dir_tree(row[0])
+                continue
+
+            if row and row[1] == mtime:
+                # Unchanged directory: reuse its known subdirectories.
+                for child_path, child_id in cur.execute("SELECT path, id FROM dirs WHERE parent_id = ?", (row[0],)).fetchall():
+                    stack.append((child_path, row[0]))
+                continue
+
+            if row:
+                dir_id = row[0]
+            else:
+                cur.execute("INSERT INTO dirs(parent_id, path, mtime) VALUES (?, ?, NULL)", (parent_id, path))
+                dir_id = cur.lastrowid
+
+            file_rows = []
+            subdirs = []
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                subdirs.append(entry.path)
+                            else:
+                                try:
+                                    size = entry.stat(follow_symlinks=False).st_size
+                                except OSError:
+                                    size = -1
+                                file_rows.append((dir_id, entry.name, size))
+                        except OSError:
+                            continue
+            except OSError:
+                # Keep the directory listed without contents; retry on the next refresh.
+                continue
+
+            cur.execute("DELETE FROM files WHERE dir_id = ?", (dir_id,))
+            cur.executemany("INSERT INTO files(dir_id, name, size) VALUES (?, ?, ?)", file_rows)
+            files_indexed += len(file_rows)
+
+            known_children = dict(cur.execute("SELECT path, id FROM dirs WHERE parent_id = ?", (dir_id,)).fetchall())
+            subdir_set = set(subdirs)
+            for child_path, child_id in known_children.items():
+                if child_path not in subdir_set:
+                    self._remove_dir_tree(child_id)
+            for child_path in subdirs:
+                if child_path not in known_children:
+                    # Placeholder rows (mtime NULL) make sure a cancelled refresh revisits them.
+                    cur.execute("INSERT OR IGNORE INTO dirs(parent_id, path, mtime) VALUES (?, ?, NULL)", (dir_id, child_path))
+                    # A folder indexed earlier as a root of its own now hangs under this one.
+                    cur.execute("UPDATE dirs SET parent_id = ? WHERE path = ? AND parent_id IS NOT ?", (dir_id, child_path, dir_id))
+                stack.append((child_path, dir_id))
+
+            cur.execute("UPDATE dirs SET mtime = ? WHERE id = ?", (mtime, dir_id))
+            pending += 1
+            if pending >= COMMIT_INTERVAL:
+                self.conn.commit()
+                pending = 0
+                if progress_callback:
+                    progress_callback(dirs_checked, files_indexed)
+
+        cur.execute("UPDATE roots SET indexed_at = ? WHERE id = ?", (time.time(), root_id))
+        self.conn.commit()
+        if progress_callback:
+            progress_callback(dirs_checked, files_indexed)
+        return True
+
+    def _remove_dir_tree(self, dir_id):
+        """Removes a directory, its files and all of its indexed subdirectories."""
+        cur = self.conn.cursor()
+        pending = [dir_id]
+        while pending:
+            current = pending.pop()
+            pending.extend(r[0] for r in cur.execute("SELECT id FROM dirs WHERE parent_id = ?", (current,)).fetchall())
+            cur.execute("DELETE FROM files WHERE dir_id = ?", (current,))
+            cur.execute("DELETE FROM dirs WHERE id = ?", (current,))
+
+    def search(self, search_term, roots, use_regex=False, is_cancelled=None):
+        """
+        Queries the index for file names under the given roots.
+
+        Args:
+            search_term (str): A substring or regular expression to match against file names.
+            roots (list): Search roots; only roots present in the index are searched.
+            use_regex (bool): Treat search_term as a case-insensitive regular expression.
+            is_cancelled (callable, optional): Returns True when the query should stop.
+
+        Returns:
+            list: A list of tuples (filename, filepath, size), like SearchWorkerThread.
+        """
+        results = []
+        for batch in self.iter_search(search_term, roots, use_regex, is_cancelled=is_cancelled):
+            results.extend(batch)
+        return results
+
+    def iter_search(self, search_term, roots, use_regex=False, batch_size=1000, is_cancelled=None):
+        """
+        Same as search(), but yields the matches in lists of up to batch_size
+        tuples as SQLite produces them.
+        """
+        norm_roots = [self.normalize_root(r) for r in roots if self._get_root_id(r) is not None]
+        if not norm_roots:
+            return
+        # LIKE narrows the directories down by path prefix, ignoring ASCII case
+        # like Windows paths do; _is_under_root() then confirms each one.
+        root_conditions = []
+        root_params = []
+        for norm_root in norm_roots:
+            escaped_root = norm_root.rstrip(os.sep).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            escaped_sep = os.sep.replace("\\", "\\\\")
+            root_conditions.append("dirs.path LIKE ? ESCAPE '\\' OR dirs.path LIKE ? ESCAPE '\\'")
+            root_params.extend([escaped_root, escaped_root + escaped_sep + "%"])
+        base_sql = (
+            "SELECT files.name, dirs.path, files.size FROM files "
+            "JOIN dirs ON dirs.id = files.dir_id "
+            f"WHERE ({' OR '.join(root_conditions)}) AND "
+        )
+
+        if use_regex:
+            regex = re.compile(search_term, re.IGNORECASE)
+            self.conn.create_function("REGEXP", 2, lambda _pattern, value: value is not None and regex.search(value) is not None, deterministic=True)
+            sql = base_sql + "files.name REGEXP ?"
+            params = root_params + [search_term]
+        elif self.has_trigram and len(search_term) >= 3:
+            sql = base_sql + "files.id IN (SELECT rowid FROM files_fts WHERE files_fts MATCH ?)"
+            params = root_params + ['"' + search_term.replace('"', '""') + '"']
+        else:
+            escaped = search_term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            sql = base_sql + "files.name LIKE ? ESCAPE '\\'"
+            params = root_params + [f"%{escaped}%"]
+
+        term_lower = search_term.lower()
+        cursor = self.conn.execute(sql, params)
+        while True:
+            if is_cancelled and is_cancelled():
+                break
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            batch = []
+            for name, dir_path, size in rows:
+                norm_dir_path = os.path.normcase(dir_path)
+                if not any(self._is_under_root(norm_dir_path, norm_root) for norm_root in norm_roots):
+                    continue
+                # SQLite only folds ASCII case, so confirm non-regex matches the same way a live walk does.
+                if not use_regex and term_lower not in name.lower():
+                    continue
+                batch.append((name, os.path.join(dir_path, name), size if size is not None else -1))
+            if batch:
+                yield batch
@@ -7,6 +7,10 @@ import re
 import threading
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from gui.settings import load_app_config, get_file_path
+from process_pump import ProcessOutputPump
+from .probe_cache import MediaProbeCache, format_duration
 
 # Constants
 MEDIA_EXTENSIONS = [
@@ -47,6 +51,21 @@ CODECS = {
     "mov": ("libx264", "aac")
 }
 
+# Codec names reported by ffprobe that can be copied as-is into each audio output format.
+STREAM_COPY_CODECS = {
+    "mp3": ("mp3",),
+    "wav": ("pcm_s16le",),
+    "flac": ("flac",),
+    "ogg": ("vorbis",),
+    "m4a": ("aac",),
+    "aac": ("aac",),
+    "opus": ("opus",),
+}
+# Formats whose bitrate is not chosen by the user, so any source bitrate is accepted.
+BITRATE_INDEPENDENT_FORMATS = ("wav", "flac", "opus")
+# Allowed relative difference between the source and the requested bitrate.
+BITRATE_TOLERANCE = 0.1
+
 VIDEO_RESOLUTIONS = {
     "480p (854x480)": "854:480",
     "720p (1280x720)": "1280:720",
@@ -76,16 +95,62 @@ CHANNELS = {"Stereo": "2", "Mono": "1"}
 ConversionUpdateEvent, EVT_CONVERSION_UPDATE = wx.lib.newevent.NewEvent()
 ConversionDoneEvent, EVT_CONVERSION_DONE = wx.lib.newevent.NewEvent()
 
+def get_default_parallel_conversions():
+    """Number of simultaneous conversions used when the setting is 0 (automatic)."""
+    return max(1, os.cpu_count() or 1)
+
+def get_parallel_conversions_setting():
+    """Reads the configured number of simultaneous conversions, falling back to the CPU count."""
+    try:
+        value = int(load_app_config().get('FileTools', {}).get('max_parallel_conversions', 0))
+    except (ValueError, TypeError):
+        value = 0
+    return value if value > 0 else get_default_parallel_conversions()
+
+def parse_bitrate(value):
+    """Converts a bitrate such as '128k' to bits per second."""
+    value = (value or "").strip().lower()
+    try:
+        if value.endswith("k"):
+            return int(float(value[:-1]) * 1000)
+        return int(value)
+    except ValueError:
+        return None
+
+def can_stream_copy(info, settings):
+    """
+    Checks whether an audio conversion can copy the source stream instead of re-encoding it.
+    The source codec must match the output format, and its sample rate, channels and
+    (for lossy formats with a chosen bitrate) bitrate must match the requested settings.
+    """
+    if not info or not settings.get('allow_stream_copy') or 'output_filepath' in settings:
+        return False
+    audio = info.get('audio')
+    output_format = settings['format']
+    if not audio or audio.get('codec') not in STREAM_COPY_CODECS.get(output_format, ()):
+        return False
+    if str(audio.get('sample_rate')) != str(settings['sample_rate']):
+        return False
+    if str(audio.get('channels')) != str(settings['channels']):
+        return False
+    if output_format not in BITRATE_INDEPENDENT_FORMATS:
+        target = parse_bitrate(settings['bitrate'])
+        source = audio.get('bit_rate') or info.get('bit_rate')
+        if not target or not source or abs(source - target) > target * BITRATE_TOLERANCE:
+            return False
+    return True
+
 def is_video_file(filepath):
     """Checks if a file has a video extension."""
     return os.path.splitext(filepath)[1].lower() in VIDEO_EXTENSIONS
 
 class ConversionProgressDialog(wx.Dialog):
-    def __init__(self, parent, title="Converting..."):
+    def __init__(self, parent, title="Converting...", cancel_callback=None):
         super(ConversionProgressDialog, self).__init__(parent, title=title, style=wx.DEFAULT_DIALOG_STYLE)
         self.panel = wx.Panel(self)
         self.SetSize((450, 250))
         self.cancelled = False
+        self.cancel_callback = cancel_callback
 
         main_sizer = wx.BoxSizer(wx.VERTICAL)
         self.info_label = wx.StaticText(self.panel, label="Initializing...")
@@ -108,9 +173,14 @@ class ConversionProgressDialog(wx.Dialog):
         self.Bind(wx.EVT_CLOSE, self.on_close)
 
     def on_cancel(self, event):
+        if self.cancelled:
+            return
         self.cancelled = True
         self.info_label.SetLabel("Cancelling, please wait...")
         self.cancel_button.Disable()
+        # Stop right away; while files are being analyzed no update event arrives to do it.
+        if self.cancel_callback:
+            self.cancel_callback()
 
     def on_close(self, event):
         self.on_cancel(event)
@@ -120,184 +190,335 @@ class ConversionProgressDialog(wx.Dialog):
         current_index = getattr(event, 'current_file_index', 0)
         file_name = getattr(event, 'current_file_name', '')
         percentage = getattr(event, 'percentage', 0)
+        completed = getattr(event, 'completed_files', None)
+        running = getattr(event, 'running_files', 0)
 
-        info_text = f"Processing file {current_index} of {total}..."
+        if completed is None:
+            info_text = f"Processing file {current_index} of {total}..."
+        else:
+            info_text = f"Completed {completed} of {total} files, {running} running..."
         self.info_label.SetLabel(info_text)
         self.file_label.SetLabel(f"Current: {file_name}")
         self.progress_gauge.SetValue(percentage)
 
 
 class ConversionWorkerThread(threading.Thread):
-    def __init__(self, parent, files, settings, ffmpeg_path, ffprobe_path):
+    """
+    Converts a batch of media files in the background.
+
+    Up to max_workers ffmpeg processes run at the same time, each driven by a
+    thread of a bounded pool. The progress of all running jobs is combined into
+    one stream of ConversionUpdateEvent, and stop() terminates every running
+    ffmpeg child so cancellation takes effect immediately.
+
+    Durations come from the MediaProbeCache when one is given; files missing
+    from it are probed in parallel before the first conversion starts. The
+    probe data also tells when an audio file already matches the requested
+    output, in which case its stream is copied instead of re-encoded.
+
+    process_observer, if given, is called as f(original_path, process) after
+    each ffmpeg child exits; the benchmark uses it to read memory usage.
+    Totals are kept in converted_count, skipped_count, errors and
+    stream_copied once run() finishes.
+    """
+    def __init__(self, parent, files, settings, ffmpeg_path, ffprobe_path, max_workers=None, probe_cache=None,
+                 process_observer=None):
         super(ConversionWorkerThread, self).__init__()
         self.parent = parent
         self.files_to_convert = files
         self.settings = settings
         self.ffmpeg_path = ffmpeg_path
         self.ffprobe_path = ffprobe_path
+        self.max_workers = max(1, min(max_workers or get_default_parallel_conversions(), len(files) or 1))
         self._running = True
         self.progress_regex = re.compile(r"out_time_us=(\d+)")
         self.duration_regex = re.compile(r"Duration: (\d{2}):(\d{2}):(\d{2})\.(\d{2})")
+        self._lock = threading.Lock()
+        self._processes = set()
+        self._file_progress = {}
+        self._active_files = {}
+        self._completed_count = 0
+        self.probe_cache = probe_cache
+        self._probe_info = {}
+        self.process_observer = process_observer
+        self.converted_count = 0
+        self.skipped_count = 0
+        self.errors = []
+        self.stream_copied = []
 
 
     def stop(self):
         self._running = False
+        with self._lock:
+            processes = list(self._processes)
+        for process in processes:
+            try:
+                process.terminate()
+            except OSError:
+                pass
 
     def run(self):
         total_files = len(self.files_to_convert)
         converted_count = 0
         skipped_count = 0
-        errors = []        
-        is_video_output = 'output_filepath' in self.settings
+        errors = []
+        stream_copied = []
+
+        if self.probe_cache:
+            wx.CallAfter(wx.PostEvent, self.parent, ConversionUpdateEvent(
+                total_files=total_files, current_file_index=0,
+                current_file_name="Analyzing files...", percentage=0,
+                completed_files=0, running_files=0
+            ))
+            paths = [original_path for original_path, _ in self.files_to_convert]
+            self._probe_info = self.probe_cache.probe_many(paths, is_cancelled=lambda: not self._running)
+
+        output_paths = self._reserve_output_paths()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="MediaConversion") as pool:
+            futures = {pool.submit(self._convert_file, i, original_path, output_paths[i]): i for i, (original_path, _) in enumerate(self.files_to_convert)}
+            for future in as_completed(futures):
+                try:
+                    status, error_message = future.result()
+                except Exception as e:
+                    status, error_message = 'failed', f"Conversion error: {e}"
+                if status in ('converted', 'copied'):
+                    converted_count += 1
+                if status == 'copied':
+                    stream_copied.append(os.path.basename(self.files_to_convert[futures[future]][0]))
+                elif status == 'skipped':
+                    skipped_count += 1
+                if error_message:
+                    errors.append(error_message)
+
+        if self.probe_cache:
+            self.probe_cache.save()
+        self.converted_count = converted_count
+        self.skipped_count = skipped_count
+        self.errors = errors
+        self.stream_copied = stream_copied
+
+        final_update_data = {
+            'total_files': total_files,
+            'current_file_index': total_files,
+            'current_file_name': "Finalizing...",
+            'percentage': 100,
+            'completed_files': self._completed_count,
+            'running_files': 0
+        }
+        wx.CallAfter(wx.PostEvent, self.parent, ConversionUpdateEvent(**final_update_data))
+        wx.CallAfter(wx.PostEvent, self.parent, ConversionDoneEvent(converted=converted_count, skipped=skipped_count, total=total_files, errors=errors, stream_copied=stream_copied))
+
+    def _post_update(self):
+        """Posts the combined progress of all files to the GUI."""
+        total_files = len(self.files_to_convert)
+        with self._lock:
+            overall = sum(self._file_progress.values()) / total_files if total_files else 100
+            active_names = list(self._active_files.values())
+            completed = self._completed_count
+        wx.CallAfter(wx.PostEvent, self.parent, ConversionUpdateEvent(
+            total_files=total_files,
+            current_file_index=min(total_files, completed + len(active_names)),
+            current_file_name=", ".join(active_names),
+            percentage=min(100, int(overall)),
+            completed_files=completed,
+            running_files=len(active_names)
+        ))
+
+    def _set_file_progress(self, index, percentage, base_name=None, finished=False):
+        with self._lock:
+            self._file_progress[index] = percentage
+            if finished:
+                self._active_files.pop(index, None)
+                self._completed_count += 1
+            elif base_name is not None:
+                self._active_files[index] = base_name
+        self._post_update()
+
+    def _reserve_output_paths(self):
+        """
+        Works out the output path of every file before any job starts, since
+        jobs run in parallel. Files from different folders with the same name
+        would write the same output at once, so later ones get a numbered
+        name such as 'track (2).mp3' that no other file of the batch and no
+        existing file uses.
+        """
+        if 'output_filepath' in self.settings:
+            # The logic in on_start_conversion ensures only one file is passed for video output.
+            return [self.settings['output_filepath']] * len(self.files_to_convert)
+        output_paths = []
+        reserved = set()
+        for original_path, _ in self.files_to_convert:
+            file_name_part, _ = os.path.splitext(os.path.basename(original_path))
+            extension = self.settings['format']
+            output_path = os.path.join(self.settings['output_dir'], f"{file_name_part}.{extension}")
+            number = 2
+            # The plain name may exist already; overwrite or skip decides. Numbered names must be free.
+            while os.path.normcase(output_path) in reserved or (number > 2 and os.path.exists(output_path)):
+                output_path = os.path.join(self.settings['output_dir'], f"{file_name_part} ({number}).{extension}")
+                number += 1
+            reserved.add(os.path.normcase(output_path))
+            output_paths.append(output_path)
+        return output_paths
+
+    def _convert_file(self, index, original_path, output_path):
+        """
+        Converts one file to output_path, reserved for it by run(). Runs on a
+        pool thread. Returns a tuple (status, error_message) where status is
+        one of 'converted', 'copied' (stream copied without re-encoding),
+        'skipped', 'failed' or 'cancelled'.
+        """
+        if not self._running:
+            return 'cancelled', None
+
+        base_name = os.path.basename(original_path)
+        if os.path.exists(output_path) and not self.settings['overwrite']:
+            # For video, this check is also done in on_start_conversion, but keep for safety
+            self._set_file_progress(index, 100, finished=True) # Skipped, so 100% of this "file's progress"
+            return 'skipped', f"Skipped '{base_name}': Target file '{os.path.basename(output_path)}' already exists."
+
+        self._set_file_progress(index, 0, base_name=base_name)
+
+        duration_seconds = self._get_duration(original_path)
+        start_time = time.monotonic()
+
+        stream_copy = can_stream_copy(self._probe_info.get(original_path), self.settings)
+        command = self._build_command(original_path, output_path, stream_copy=stream_copy)
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding='utf-8', errors='replace', creationflags=subprocess.CREATE_NO_WINDOW)
+        with self._lock:
+            self._processes.add(process)
+        # stop() may have run between the check above and registering the process.
+        if not self._running:
+            process.terminate()
+
+        # -progress writes to stdout; the Duration line and errors come on stderr.
+        duration = [duration_seconds]
+
+        def parse_progress(line):
+            match = self.progress_regex.search(line)
+            return int(match.group(1)) / 1000000.0 if match else None
+
+        def on_progress(current_seconds):
+            if duration[0] > 0:
+                self._set_file_progress(index, min(100, int((current_seconds / duration[0]) * 100)))
+
+        def on_line(line, stream_name):
+            if duration[0] == 0: # Try to parse duration from ffmpeg output if ffprobe failed
+                match = self.duration_regex.search(line)
+                if match:
+                    h, m, s, cs = map(int, match.groups())
+                    duration[0] = h * 3600 + m * 60 + s + cs / 100.0
+
+        def is_error_line(line):
+            lowered = line.lower()
+            return "error" in lowered or "invalid" in lowered or "failed" in lowered
+
+        pump = ProcessOutputPump(process, parse_progress=parse_progress, on_progress=on_progress, on_line=on_line, is_error_line=is_error_line)
+        try:
+            pump.start()
+            return_code = process.wait()
+            pump.wait()
+            duration_seconds = duration[0]
 
-        for i, (original_path, _) in enumerate(self.files_to_convert):
             if not self._running:
-                break
-
-            base_name = os.path.basename(original_path)            
-            if is_video_output:
-                output_path = self.settings['output_filepath']
-                # If multiple files were passed to thread for video (should not happen due to on_start_conversion logic)
-                # this would overwrite the same output_path. The logic in on_start_conversion ensures only one file for video.
-            else: # Audio output
-                file_name_part, _ = os.path.splitext(base_name)
-                new_file_name = f"{file_name_part}.{self.settings['format']}"
-                output_path = os.path.join(self.settings['output_dir'], new_file_name)
-
-            if os.path.exists(output_path) and not self.settings['overwrite']:
-                # For video, this check is also done in on_start_conversion, but keep for safety
-                errors.append(f"Skipped '{base_name}': Target file '{os.path.basename(output_path)}' already exists.")
-                skipped_count += 1
-                wx.CallAfter(wx.PostEvent, self.parent, ConversionUpdateEvent(
-                    total_files=total_files,
-                    current_file_index=i + 1,
-                    current_file_name=base_name,
-                    percentage=100 # Skipped, so 100% of this "file's progress"
-                ))
-                continue
-
-            update_data = {
-                'total_files': total_files,
-                'current_file_index': i + 1,
-                'current_file_name': base_name,
-                'percentage': 0
-            }
-            wx.CallAfter(wx.PostEvent, self.parent, ConversionUpdateEvent(**update_data))
-
-            duration_seconds = 0
+                pump.stop()
+                if os.path.exists(output_path): # Clean up partially created file
+                    try: os.remove(output_path)
+                    except OSError: pass
+                return 'cancelled', None
+
+            if self.process_observer:
+                self.process_observer(original_path, process)
+        finally:
+            with self._lock:
+                self._processes.discard(process)
+        error_details = pump.error_lines
+
+        self._set_file_progress(index, 100, finished=True)
+        if return_code == 0:
+            if stream_copy:
+                return 'copied', None
+            if self.probe_cache and duration_seconds > 0:
+                self.probe_cache.record_speed(self.settings['format'], duration_seconds, time.monotonic() - start_time)
+            return 'converted', None
+
+        error_message = f"Failed to convert '{base_name}'."
+        if error_details:
+            relevant_errors = "\n".join(error_details[-3:])
+            error_message += f"\nDetails: {relevant_errors}"
+        else:
+            error_message += f" (ffmpeg exit code: {return_code})"
+        return 'failed', error_message
+
+    def _get_duration(self, original_path):
+        """Returns the duration of a file in seconds, or 0 if unknown."""
+        info = self._probe_info.get(original_path)
+        if info is None and not self.probe_cache:
             try:
                 ffprobe_cmd = [self.ffprobe_path, '-v', 'error', '-show_entries', 'format=duration', '-of', 'default=noprint_wrappers=1:nokey=1', original_path]
                 startupinfo = subprocess.STARTUPINFO()
                 startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
                 duration_str = subprocess.check_output(ffprobe_cmd, text=True, startupinfo=startupinfo, creationflags=subprocess.CREATE_NO_WINDOW).strip()
                 if duration_str and duration_str.lower() != 'n/a':
-                    duration_seconds = float(duration_str)
+                    return float(duration_str)
             except Exception as e:
-                print(f"Could not get duration for {base_name}: {e}")
-
-            command = [
-                self.ffmpeg_path, '-hide_banner', '-progress', 'pipe:1', '-nostats',
-            ]
-
-            if is_video_output:
-                video_codec, audio_codec_for_video = self.settings['codec']
-                command.extend([
-                    '-loop', '1', '-framerate', self.settings['fps'], '-i', self.settings['image_path'],
-                    '-i', original_path,
-                    '-c:v', video_codec,
-                    '-preset', self.settings['encoder_preset'], # Add preset
-                    '-tune', 'stillimage',
-                    '-c:a', audio_codec_for_video,
-                ])
-                if audio_codec_for_video != 'libopus' and self.settings.get('bitrate'):
-                    command.extend(['-b:a', self.settings['bitrate']])
-                command.extend([
-                    '-vf', f"scale={self.settings['resolution']}",
-                    '-pix_fmt', 'yuv420p',
-                    '-shortest'
-                ])
-            else: 
-                audio_codec, _ = self.settings['codec']
-                command.extend([
-                    '-i', original_path,
-                    '-vn', 
-                    '-c:a', audio_codec,
-                    '-ar', self.settings['sample_rate'],
-                    '-ac', self.settings['channels'],
-                ])
-                if self.settings['format'] != 'opus':
-                     command.extend(['-b:a', self.settings['bitrate']])
-
-            if self.settings['overwrite']:
-                command.append('-y')
-            else:
-                command.append('-n')
-            
-            if self.settings['copy_metadata']:
-                # For audio-to-video, metadata should come from the audio input (index 1 in ffmpeg command)
-                # For audio-to-audio, metadata comes from the audio input (index 0 in ffmpeg command)
-                input_index_for_metadata = '1' if is_video_output else '0'
-                command.extend(['-map_metadata', input_index_for_metadata, '-c:s', 'copy'])            
-            command.append(output_path)
-            
-            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, encoding='utf-8', errors='replace', creationflags=subprocess.CREATE_NO_WINDOW)
-            error_details = []
-            while self._running:
-                line = process.stdout.readline()
-                if not line:
-                    break
-                
-                if duration_seconds == 0: # Try to parse duration from ffmpeg output if ffprobe failed
-                    match = self.duration_regex.search(line)
-                    if match:
-                        h, m, s, cs = map(int, match.groups())
-                        duration_seconds = h * 3600 + m * 60 + s + cs / 100.0                
-                if duration_seconds > 0:
-                    match = self.progress_regex.search(line)
-                    if match:
-                        current_us = int(match.group(1))
-                        current_seconds = current_us / 1000000.0
-                        percentage = int((current_seconds / duration_seconds) * 100)
-                        update_data['percentage'] = min(100, percentage)
-                        wx.CallAfter(wx.PostEvent, self.parent, ConversionUpdateEvent(**update_data))
-                if "progress=end" in line:
-                    break
-
-                if "error" in line.lower() or "invalid" in line.lower() or "failed" in line.lower() :
-                    error_details.append(line.strip())
+                print(f"Could not get duration for {os.path.basename(original_path)}: {e}")
+            return 0
+        return (info or {}).get('duration') or 0
 
-            if not self._running:
-                process.terminate()
-                try:
-                    process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    process.kill()
-                process.wait()
-                if os.path.exists(output_path): # Clean up partially created file
-                    try: os.remove(output_path)
-                    except OSError: pass
-                break # Exit the loop over files
+    def _build_command(self, original_path, output_path, stream_copy=False):
+        """Builds the ffmpeg command line for one file, remuxing with -c:a copy if stream_copy is set."""
+        is_video_output = 'output_filepath' in self.settings
+        command = [
+            self.ffmpeg_path, '-hide_banner', '-progress', 'pipe:1', '-nostats',
+        ]
+
+        if is_video_output:
+            video_codec, audio_codec_for_video = self.settings['codec']
+            command.extend([
+                '-loop', '1', '-framerate', self.settings['fps'], '-i', self.settings['image_path'],
+                '-i', original_path,
+                '-c:v', video_codec,
+                '-preset', self.settings['encoder_preset'], # Add preset
+                '-tune', 'stillimage',
+                '-c:a', audio_codec_for_video,
+            ])
+            if audio_codec_for_video != 'libopus' and self.settings.get('bitrate'):
+                command.extend(['-b:a', self.settings['bitrate']])
+            command.extend([
+                '-vf', f"scale={self.settings['resolution']}",
+                '-pix_fmt', 'yuv420p',
+                '-shortest'
+            ])
+        elif stream_copy:
+            command.extend([
+                '-i', original_path,
+                '-vn',
+                '-c:a', 'copy',
+            ])
+        else:
+            audio_codec, _ = self.settings['codec']
+            command.extend([
+                '-i', original_path,
+                '-vn',
+                '-c:a', audio_codec,
+                '-ar', self.settings['sample_rate'],
+                '-ac', self.settings['channels'],
+            ])
+            if self.settings['format'] != 'opus':
+                 command.extend(['-b:a', self.settings['bitrate']])
+
+        if self.settings['overwrite']:
+            command.append('-y')
+        else:
+            command.append('-n')
 
-            return_code = process.wait()
-            if return_code == 0:
-                converted_count += 1
-            else:
-                error_message = f"Failed to convert '{base_name}'."
-                if error_details:
-                    relevant_errors = "\n".join(error_details[-3:])
-                    error_message += f"\nDetails: {relevant_errors}"
-                else:
-                    error_message += f" (ffmpeg exit code: {return_code})"
-                errors.append(error_message)
-        
-        final_update_data = {
-            'total_files': total_files,
-            'current_file_index': total_files,
-            'current_file_name': "Finalizing...",
-            'percentage': 100
-        }
-        wx.CallAfter(wx.PostEvent, self.parent, ConversionUpdateEvent(**final_update_data))
-        wx.CallAfter(wx.PostEvent, self.parent, ConversionDoneEvent(converted=converted_count, skipped=skipped_count, total=total_files, errors=errors))
+        if self.settings['copy_metadata']:
+            # For audio-to-video, metadata should come from the audio input (index 1 in ffmpeg command)
+            # For audio-to-audio, metadata comes from the audio input (index 0 in ffmpeg command)
+            input_index_for_metadata = '1' if is_video_output else '0'
+            command.extend(['-map_metadata', input_index_for_metadata, '-c:s', 'copy'])
+        command.append(output_path)
+        return command
 
 
 class MediaConverter(wx.Frame):
@@ -313,12 +534,15 @@ class MediaConverter(wx.Frame):
             wx.MessageBox("ffmpeg.exe and/or ffprobe.exe not found. This tool cannot function without them.", "Error", wx.OK | wx.ICON_ERROR)
             wx.CallAfter(self.Close)
             return
+        self.probe_cache = MediaProbeCache(get_file_path("media_probe_cache.json"), self.ffprobe_path)
 
         main_sizer = wx.BoxSizer(wx.VERTICAL)
         list_label = wx.StaticText(self.panel, label="Files to Convert:")
         main_sizer.Add(list_label, 0, wx.LEFT | wx.TOP | wx.RIGHT, 5)
         self.file_list_box = wx.ListBox(self.panel, style=wx.LB_SINGLE)
         main_sizer.Add(self.file_list_box, 1, wx.EXPAND | wx.ALL, 5)
+        self.summary_label = wx.StaticText(self.panel, label="")
+        main_sizer.Add(self.summary_label, 0, wx.LEFT | wx.RIGHT | wx.EXPAND, 5)
 
         list_btn_sizer = wx.BoxSizer(wx.HORIZONTAL)
         self.add_files_btn = wx.Button(self.panel, label="Add Files")
@@ -391,7 +615,10 @@ class MediaConverter(wx.Frame):
         self.copy_metadata_cb.SetValue(True)
         extra_options_sizer.Add(self.copy_metadata_cb, 0, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 10)
         self.overwrite_cb = wx.CheckBox(self.panel, label="Overwrite existing files")
-        extra_options_sizer.Add(self.overwrite_cb, 0, wx.ALIGN_CENTER_VERTICAL)
+        extra_options_sizer.Add(self.overwrite_cb, 0, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 10)
+        self.stream_copy_cb = wx.CheckBox(self.panel, label="Copy audio without re-encoding when it already matches")
+        self.stream_copy_cb.SetValue(True)
+        extra_options_sizer.Add(self.stream_copy_cb, 0, wx.ALIGN_CENTER_VERTICAL)
         common_fgs.Add(extra_options_sizer, 1, wx.EXPAND)
         main_sizer.Add(common_fgs, 0, wx.EXPAND | wx.ALL, 10)
 
@@ -492,19 +719,28 @@ class MediaConverter(wx.Frame):
                     self.channels_combo.SetSelection(0)
                 self.bitrate_combo.SetToolTip("")
 
+        self.update_summary()
         self.panel.Layout()
         self.Layout()
         self.Fit()
         if event:
             event.Skip()
 
+    def _get_list_label(self, filepath, basename):
+        """Returns the list label for a file, including its duration when it is known."""
+        info = self.probe_cache.get(filepath)
+        if info and info.get('duration'):
+            return f"{basename} ({format_duration(info['duration'])})"
+        return basename
+
     def _add_file_to_list(self, filepath):
+        """Adds a media file to the list. Returns True if it was added."""
         _, ext = os.path.splitext(filepath)
         if ext.lower() in MEDIA_EXTENSIONS:
             if not any(f[0] == filepath for f in self.files_to_convert):
                 basename = os.path.basename(filepath)
                 self.files_to_convert.append((filepath, basename))
-                self.file_list_box.Append(basename)
+                self.file_list_box.Append(self._get_list_label(filepath, basename))
                 if not self.output_path_text.GetValue():
                     self.output_path_text.SetValue(os.path.dirname(filepath))
 
@@ -514,6 +750,52 @@ class MediaConverter(wx.Frame):
                 if selected_format_ext and f".{selected_format_ext}" in VIDEO_EXTENSIONS:
                     name_part, _ = os.path.splitext(basename) # Use current file's name
                     self.output_filename_text.SetValue(f"{name_part}.{selected_format_ext}")
+                return True
+        return False
+
+    def _probe_files_in_background(self, paths):
+        """Probes files missing from the cache on a background thread, then refreshes the list."""
+        misses = [path for path in paths if self.probe_cache.get(path) is None]
+        if not misses:
+            self.update_summary()
+            return
+
+        def probe():
+            self.probe_cache.probe_many(misses)
+            self.probe_cache.save()
+            wx.CallAfter(self._on_background_probe_done)
+        threading.Thread(target=probe, daemon=True).start()
+        self.update_summary()
+
+    def _on_background_probe_done(self):
+        if not self:
+            return
+        for index, (filepath, basename) in enumerate(self.files_to_convert):
+            self.file_list_box.SetString(index, self._get_list_label(filepath, basename))
+        self.update_summary()
+
+    def update_summary(self):
+        """Shows the total duration of the listed files and an estimated conversion time."""
+        if not self.files_to_convert:
+            self.summary_label.SetLabel("")
+            return
+        total_seconds = 0
+        unknown = 0
+        for filepath, _ in self.files_to_convert:
+            info = self.probe_cache.get(filepath)
+            if info and info.get('duration'):
+                total_seconds += info['duration']
+            else:
+                unknown += 1
+        summary = f"{len(self.files_to_convert)} file(s), total duration {format_duration(total_seconds)}"
+        if unknown:
+            summary += f" ({unknown} not analyzed yet)"
+        format_ext = CONVERSION_FORMATS.get(self.format_combo.GetValue())
+        parallel_jobs = min(get_parallel_conversions_setting(), len(self.files_to_convert))
+        estimate = self.probe_cache.estimate_job_seconds(format_ext, total_seconds, parallel_jobs)
+        if estimate is not None:
+            summary += f". Estimated conversion time: about {format_duration(estimate)}"
+        self.summary_label.SetLabel(summary)
 
     def on_add_files(self, event):
         wildcard = "Media Files|" + ";".join("*" + ext for ext in MEDIA_EXTENSIONS) + "|All files (*.*)|*.*"
@@ -521,8 +803,8 @@ class MediaConverter(wx.Frame):
                            style=wx.FD_OPEN | wx.FD_MULTIPLE | wx.FD_FILE_MUST_EXIST) as file_dialog:
             if file_dialog.ShowModal() == wx.ID_CANCEL:
                 return
-            for path in file_dialog.GetPaths():
-                self._add_file_to_list(path)
+            added = [path for path in file_dialog.GetPaths() if self._add_file_to_list(path)]
+            self._probe_files_in_background(added)
 
     def on_add_folder(self, event):
         with wx.DirDialog(self, "Choose a folder", style=wx.DD_DEFAULT_STYLE | wx.DD_DIR_MUST_EXIST) as dir_dialog:
@@ -532,9 +814,13 @@ class MediaConverter(wx.Frame):
             if not self.output_path_text.GetValue():
                 self.output_path_text.SetValue(folder_path)
             
+            added = []
             for root, _, files in os.walk(folder_path):
                 for f_name in files:
-                    self._add_file_to_list(os.path.join(root, f_name))
+                    path = os.path.join(root, f_name)
+                    if self._add_file_to_list(path):
+                        added.append(path)
+            self._probe_files_in_background(added)
 
     def on_browse_image(self, event):
         wildcard = "Image Files (*.png;*.jpg;*.jpeg;*.bmp)|*.png;*.jpg;*.jpeg;*.bmp|All files (*.*)|*.*"
@@ -547,6 +833,7 @@ class MediaConverter(wx.Frame):
         if selected_index != wx.NOT_FOUND:
             self.file_list_box.Delete(selected_index)
             del self.files_to_convert[selected_index]
+            self.update_summary()
 
     def on_browse_output(self, event):
         with wx.DirDialog(self, "Choose an output folder", style=wx.DD_DEFAULT_STYLE | wx.DD_DIR_MUST_EXIST) as dir_dialog:
@@ -609,7 +896,8 @@ class MediaConverter(wx.Frame):
                 
                 self.files_to_convert = [(f, b) for f, b in self.files_to_convert if not is_video_file(f)]
                 self.file_list_box.Clear()
-                self.file_list_box.AppendItems([b for f,b in self.files_to_convert])
+                self.file_list_box.AppendItems([self._get_list_label(f, b) for f,b in self.files_to_convert])
+                self.update_summary()
                 files_for_thread = list(self.files_to_convert)
                 if not files_for_thread:
                     wx.MessageBox("All files were removed. There are no audio files left to convert to video.", "No Audio Files", wx.OK | wx.ICON_INFORMATION)
@@ -636,6 +924,7 @@ class MediaConverter(wx.Frame):
             'channels': CHANNELS[self.channels_combo.GetValue()],
             'overwrite': self.overwrite_cb.IsChecked(),
             'copy_metadata': self.copy_metadata_cb.IsChecked(),
+            'allow_stream_copy': self.stream_copy_cb.IsChecked(),
         }
 
         if is_video_output_format:
@@ -648,18 +937,21 @@ class MediaConverter(wx.Frame):
             settings['output_dir'] = output_dir
 
         self.Hide()
-        self.progress_dialog = ConversionProgressDialog(self)
+        self.progress_dialog = ConversionProgressDialog(self, cancel_callback=self.stop_conversion)
         self.progress_dialog.Show()
-        self.conversion_thread = ConversionWorkerThread(self, files_for_thread, settings, self.ffmpeg_path, self.ffprobe_path)
+        self.conversion_thread = ConversionWorkerThread(self, files_for_thread, settings, self.ffmpeg_path, self.ffprobe_path,
+                                                        max_workers=get_parallel_conversions_setting(),
+                                                        probe_cache=self.probe_cache)
         self.conversion_thread.start()
 
+    def stop_conversion(self):
+        """Stops the running conversion and terminates its ffmpeg children."""
+        if self.conversion_thread and self.conversion_thread.is_alive():
+            self.conversion_thread.stop()
+
     def on_conversion_update(self, event):
-        if self.progress_dialog:
-            if self.progress_dialog.cancelled:
-                if self.conversion_thread and self.conversion_thread.is_alive():
-                    self.conversion_thread.stop()
-            else:
-                self.progress_dialog.update_progress(event)
+        if self.progress_dialog and not self.progress_dialog.cancelled:
+            self.progress_dialog.update_progress(event)
 
     def on_conversion_done(self, event):
         if self.progress_dialog:
@@ -670,6 +962,11 @@ class MediaConverter(wx.Frame):
         if event.skipped > 0:
             msg += f"\nSkipped: {event.skipped} file(s)."
         
+        stream_copied = getattr(event, 'stream_copied', [])
+        if stream_copied:
+            msg += f"\nCopied without re-encoding (fast path): {len(stream_copied)} file(s)."
+            msg += "\n" + "\n".join(stream_copied)
+
         total_processed = event.converted + event.skipped
         msg += f"\nTotal processed: {total_processed}/{event.total} file(s)."        
         if event.errors:
@@ -678,6 +975,7 @@ class MediaConverter(wx.Frame):
         wx.MessageBox(msg, "Conversion Complete", wx.OK | wx.ICON_INFORMATION)
         self.files_to_convert.clear()
         self.file_list_box.Clear()
+        self.update_summary()
         self.Show()
         self.Raise()
 
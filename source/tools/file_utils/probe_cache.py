@@ -0,0 +1,240 @@
+import os
+import json
+import time
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+# ffprobe is mostly waiting on disk, so a few more workers than cores is fine.
+PROBE_WORKERS = min(16, (os.cpu_count() or 4) + 2)
+# Files remembered at most; the least recently used ones are dropped on save.
+MAX_ENTRIES = 5000
+
+
+def format_duration(seconds):
+    """Formats a number of seconds as H:MM:SS or M:SS."""
+    seconds = int(round(seconds or 0))
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes}:{secs:02d}"
+
+
+class MediaProbeCache:
+    """
+    A persistent cache of ffprobe results for the Media Converter.
+
+    Entries are keyed by the file's path and are only valid while the file's
+    size and modification time are unchanged, so a modified file is probed
+    again. Each entry stores the duration, container, overall bitrate, the
+    first audio and video stream's codec details and the container tags.
+
+    The cache also keeps the average conversion speed (media seconds per
+    wall-clock second) observed for each output format, used to estimate how
+    long a job will take. At most MAX_ENTRIES files are kept, dropping the
+    ones used least recently. All methods are thread-safe.
+    """
+    def __init__(self, cache_path, ffprobe_path):
+        self.cache_path = cache_path
+        self.ffprobe_path = ffprobe_path
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._entries = {}
+        self._speeds = {}
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._entries = data.get('entries', {})
+            self._speeds = data.get('speeds', {})
+        except (OSError, ValueError):
+            self._entries = {}
+            self._speeds = {}
+
+    def save(self):
+        """Writes the cache to disk if anything changed since the last save."""
+        # The probe and conversion threads both save; one write at a time.
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                self._evict()
+                data = {'entries': dict(self._entries), 'speeds': dict(self._speeds)}
+                self._dirty = False
+            temp_path = None
+            try:
+                fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.cache_path)), suffix=".tmp")
+                with open(fd, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                os.replace(temp_path, self.cache_path)
+            except OSError as e:
+                print(f"Could not save media probe cache: {e}")
+                if temp_path:
+                    try:
+                        os.remove(temp_path)
+                    except OSError:
+                        pass
+
+    def _evict(self):
+        """Drops the least recently used entries beyond MAX_ENTRIES. Called with the lock held."""
+        excess = len(self._entries) - MAX_ENTRIES
+        if excess <= 0:
+            return
+        oldest = sorted(self._entries, key=lambda key: self._entries[key].get('used', 0))[:excess]
+        for key in oldest:
+            del self._entries[key]
+
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    @staticmethod
+    def _file_signature(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime
+
+    def get(self, path):
+        """Returns the cached info for path, or None if it is missing or stale."""
+        signature = self._file_signature(path)
+        if signature is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(self._key(path))
+            if not entry or entry.get('size') != signature[0] or entry.get('mtime') != signature[1]:
+                return None
+            # Kept in memory only; it is written with the next change.
+            entry['used'] = time.time()
+            return entry['info']
+
+    def probe(self, path):
+        """Returns the info for path, running ffprobe on a cache miss. Returns None on failure."""
+        info = self.get(path)
+        if info is not None:
+            return info
+        signature = self._file_signature(path)
+        if signature is None:
+            return None
+        info = self._run_ffprobe(path)
+        if info is None:
+            return None
+        with self._lock:
+            self._entries[self._key(path)] = {'size': signature[0], 'mtime': signature[1], 'used': time.time(), 'info': info}
+            self._dirty = True
+        return info
+
+    def probe_many(self, paths, max_workers=PROBE_WORKERS, is_cancelled=None):
+        """
+        Returns a dict mapping each path to its info (or None). Cache hits are
+        answered immediately and misses are probed in parallel.
+        """
+        results = {}
+        misses = []
+        for path in paths:
+            info = self.get(path)
+            if info is None:
+                misses.append(path)
+            else:
+                results[path] = info
+        if not misses:
+            return results
+
+        def probe_unless_cancelled(path):
+            if is_cancelled and is_cancelled():
+                return None
+            return self.probe(path)
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(misses)), thread_name_prefix="MediaProbe") as pool:
+            for path, info in zip(misses, pool.map(probe_unless_cancelled, misses)):
+                results[path] = info
+        return results
+
+    def _run_ffprobe(self, path):
+        command = [self.ffprobe_path, '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', path]
+        try:
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            output = subprocess.check_output(command, text=True, encoding='utf-8', errors='replace',
+                                             startupinfo=startupinfo, creationflags=subprocess.CREATE_NO_WINDOW)
+            data = json.loads(output)
+        except Exception as e:
+            print(f"Could not probe {os.path.basename(path)}: {e}")
+            return None
+        return self._parse_probe_output(data)
+
+    @staticmethod
+    def _parse_probe_output(data):
+        fmt = data.get('format', {})
+        info = {
+            'duration': _to_float(fmt.get('duration')),
+            'format_name': fmt.get('format_name'),
+            'bit_rate': _to_int(fmt.get('bit_rate')),
+            'tags': fmt.get('tags', {}),
+            'audio': None,
+            'video': None,
+        }
+        for stream in data.get('streams', []):
+            codec_type = stream.get('codec_type')
+            # Cover art is reported as a video stream; it is not real video.
+            if codec_type == 'video' and stream.get('disposition', {}).get('attached_pic'):
+                continue
+            if codec_type == 'audio' and info['audio'] is None:
+                info['audio'] = {
+                    'codec': stream.get('codec_name'),
+                    'profile': stream.get('profile'),
+                    'bit_rate': _to_int(stream.get('bit_rate')),
+                    'sample_rate': _to_int(stream.get('sample_rate')),
+                    'channels': _to_int(stream.get('channels')),
+                }
+            elif codec_type == 'video' and info['video'] is None:
+                info['video'] = {
+                    'codec': stream.get('codec_name'),
+                    'width': _to_int(stream.get('width')),
+                    'height': _to_int(stream.get('height')),
+                    'bit_rate': _to_int(stream.get('bit_rate')),
+                }
+            if not info['duration']:
+                info['duration'] = _to_float(stream.get('duration'))
+        return info
+
+    def record_speed(self, output_format, media_seconds, elapsed_seconds):
+        """Folds an observed conversion into the running average speed for output_format."""
+        if media_seconds <= 0 or elapsed_seconds <= 0:
+            return
+        speed = media_seconds / elapsed_seconds
+        with self._lock:
+            previous = self._speeds.get(output_format)
+            # Exponential moving average so recent runs weigh more.
+            self._speeds[output_format] = speed if previous is None else previous * 0.7 + speed * 0.3
+            self._dirty = True
+
+    def get_speed(self, output_format):
+        with self._lock:
+            return self._speeds.get(output_format)
+
+    def estimate_job_seconds(self, output_format, total_media_seconds, parallel_jobs):
+        """Estimates the wall-clock time for a job, or None if no speed has been observed yet."""
+        speed = self.get_speed(output_format)
+        if not speed or total_media_seconds <= 0:
+            return None
+        return total_media_seconds / (speed * max(1, parallel_jobs))
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
@@ -1,27 +1,192 @@
 import wx.lib.newevent
 import threading
+import queue
+import time
 import os
 import re
+import mmap
+from concurrent.futures import ThreadPoolExecutor
+from .file_index import FilenameIndex
 
 SearchProgressEvent, EVT_SEARCH_PROGRESS = wx.lib.newevent.NewEvent()
 SearchDoneEvent, EVT_SEARCH_DONE = wx.lib.newevent.NewEvent()
+SearchResultsEvent, EVT_SEARCH_RESULTS = wx.lib.newevent.NewEvent()
+
+# Directory scanning is I/O bound, so use more threads than cores.
+SCAN_WORKERS = min(32, (os.cpu_count() or 4) + 4)
+# Minimum number of seconds between two progress events.
+PROGRESS_INTERVAL = 0.2
+# Number of threads reading file contents in content search mode.
+CONTENT_WORKERS = min(16, (os.cpu_count() or 4) * 2)
+# Content checks queued or running at once; the walk waits when this many are pending.
+MAX_PENDING_CONTENT_CHECKS = CONTENT_WORKERS * 64
+# Files larger than this are skipped by the content search unless overridden.
+MAX_CONTENT_SIZE = 50 * 1024 * 1024
+# Leading bytes checked for NUL characters to detect binary files.
+BINARY_SNIFF_SIZE = 8192
+# Directory names skipped by default; their whole subtrees are never scanned.
+DEFAULT_EXCLUDED_DIRS = ["node_modules", ".git", "$Recycle.Bin"]
+
+
+class SearchFilters:
+    """
+    Optional constraints applied by the search walker while it scans.
+
+    Excluded directories are matched by name (case-insensitively) and are
+    pruned before they are queued, so their subtrees are never listed.
+    Extensions are checked from the name alone; size and date limits use
+    the DirEntry.stat() result, which is only requested when needed.
+
+    Args:
+        min_size (int, optional): Minimum file size in bytes.
+        max_size (int, optional): Maximum file size in bytes.
+        modified_after (float, optional): Earliest modification time as a timestamp.
+        modified_before (float, optional): Latest modification time as a timestamp.
+        extensions (list, optional): Extensions such as ".txt" or "txt".
+        excluded_dirs (list, optional): Directory names to skip.
+    """
+    def __init__(self, min_size=None, max_size=None, modified_after=None, modified_before=None,
+                 extensions=None, excluded_dirs=None):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.modified_after = modified_after
+        self.modified_before = modified_before
+        normalized = []
+        for ext in extensions or []:
+            ext = ext.strip().lower()
+            if ext:
+                normalized.append(ext if ext.startswith(".") else "." + ext)
+        self.extensions = tuple(normalized)
+        self.excluded_dirs = {d.strip().lower() for d in excluded_dirs or [] if d.strip()}
+        self.needs_stat = any(v is not None for v in (min_size, max_size, modified_after, modified_before))
+
+    @staticmethod
+    def parse_list(text):
+        """Splits a comma or semicolon separated string into a list of items."""
+        return [item.strip() for item in re.split(r"[,;]", text or "") if item.strip()]
+
+    def excludes_dir(self, name):
+        return name.lower() in self.excluded_dirs
+
+    def excludes_path(self, path, roots=()):
+        """
+        Returns True if a directory component of path below its search root
+        is excluded. Like the live walk, which only prunes below the root,
+        folders above or at the root are not checked, and a path under
+        several roots is measured from the deepest one. Without roots, every
+        component is checked.
+        """
+        if not self.excluded_dirs:
+            return False
+        directory = os.path.normpath(os.path.dirname(path))
+        norm_directory = os.path.normcase(directory)
+        base = ""
+        for root in roots:
+            norm_root = os.path.normcase(os.path.normpath(os.path.abspath(root)))
+            prefix = norm_root.rstrip(os.sep) + os.sep
+            if (norm_directory == norm_root or norm_directory.startswith(prefix)) and len(norm_root) > len(base):
+                base = norm_root
+        if base:
+            directory = directory[len(base):]
+        parts = directory.split(os.sep)
+        return any(part.lower() in self.excluded_dirs for part in parts if part)
+
+    def accepts_name(self, name):
+        return not self.extensions or name.lower().endswith(self.extensions)
+
+    def accepts_stat(self, size, mtime):
+        if self.min_size is not None and size < self.min_size:
+            return False
+        if self.max_size is not None and size > self.max_size:
+            return False
+        if self.modified_after is not None and mtime < self.modified_after:
+            return False
+        if self.modified_before is not None and mtime > self.modified_before:
+            return False
+        return True
+
+
+def compile_content_pattern(text, use_regex):
+    """
+    Compiles the content search text into a case-insensitive bytes pattern,
+    so files can be matched without decoding them into a str.
+    Raises re.error for an invalid regular expression.
+    """
+    pattern = text.encode("utf-8")
+    if not use_regex:
+        pattern = re.escape(pattern)
+    return re.compile(pattern, re.IGNORECASE)
+
+def file_contains(filepath, pattern, max_size=MAX_CONTENT_SIZE):
+    """
+    Checks whether a file's contents match a compiled bytes pattern.
+    Empty, oversized and binary files (NUL bytes near the start) are skipped.
+    Files larger than the sniff buffer are memory-mapped and searched in place.
+    """
+    try:
+        with open(filepath, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0 or size > max_size:
+                return False
+            head = f.read(BINARY_SNIFF_SIZE)
+            if b"\0" in head:
+                return False
+            if size <= BINARY_SNIFF_SIZE:
+                return pattern.search(head) is not None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return pattern.search(mapped) is not None
+    except (OSError, ValueError):
+        return False
+
 
 class SearchWorkerThread(threading.Thread):
     """
     Worker thread for performing file searches in the background.
     Communicates progress and results back to the GUI via events.
+    Matches are not kept by the thread; they are streamed to the GUI in
+    batches through SearchResultsEvent while the search is still running.
+
+    Directories from all search roots share one work queue that is drained
+    by a pool of scanner threads, so every drive and every large subtree is
+    scanned concurrently. Each scanner lists a directory with os.scandir,
+    queues its subdirectories for any idle scanner to pick up, and reads
+    file sizes from the cached DirEntry.stat() result.
+
+    When content_term is given, files whose names match are handed to a
+    separate pool of content readers and only reported if their contents
+    match as well (see file_contains). At most MAX_PENDING_CONTENT_CHECKS
+    files wait for a reader; the walk pauses while the readers catch up.
+    SearchFilters are applied during the walk, pruning excluded subtrees
+    before they are queued.
     """
-    def __init__(self, wx_frame, search_term, search_roots, use_regex):
+    def __init__(self, wx_frame, search_term, search_roots, use_regex, max_workers=SCAN_WORKERS,
+                 content_term=None, content_regex=False, max_content_size=MAX_CONTENT_SIZE, filters=None):
         super().__init__()
         self.wx_frame = wx_frame
         self.search_term = search_term
         self.search_roots = search_roots
         self.use_regex = use_regex
+        self.max_workers = max_workers
         self._running = True
         self.files_searched = 0
         self.matches_found = 0
-        self.results = []
+        self._pending_results = []
         self.regex = None
+        self._lock = threading.Lock()
+        self._last_progress = 0.0
+        self.content_pattern = None
+        self.max_content_size = max_content_size
+        self._content_pool = None
+        self._content_slots = threading.BoundedSemaphore(MAX_PENDING_CONTENT_CHECKS)
+        self.filters = filters or SearchFilters()
+
+        if content_term:
+            try:
+                self.content_pattern = compile_content_pattern(content_term, content_regex)
+            except re.error as e:
+                self._running = False
+                self.error_message = f"Invalid Regular Expression: {e}"
+                return
 
         if self.use_regex:
             try:
@@ -37,49 +202,232 @@ class SearchWorkerThread(threading.Thread):
 
     def run(self):
         if not self._running:
-            wx.PostEvent(self.wx_frame, SearchDoneEvent(results=[], files_searched=0, matches_found=0, error=self.error_message))
+            wx.PostEvent(self.wx_frame, SearchDoneEvent(thread=self, files_searched=0, matches_found=0, error=self.error_message))
             return
 
+        dir_queue = queue.Queue()
         for root_dir in self.search_roots:
-            if not self._running:
-                break
+            dir_queue.put(root_dir)
+
+        self._start_content_pool()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="FileSearch") as pool:
+            for _ in range(self.max_workers):
+                pool.submit(self._scan_worker, dir_queue)
+            dir_queue.join()
+            # Every directory has been processed; release the idle scanners.
+            for _ in range(self.max_workers):
+                dir_queue.put(None)
+        self._finish_content_pool()
+
+        self._post_progress(force=True)
+        wx.PostEvent(self.wx_frame, SearchDoneEvent(thread=self, files_searched=self.files_searched, matches_found=self.matches_found, error=None if self._running else "Cancelled"))
+
+    def _scan_worker(self, dir_queue):
+        """Takes directories from the shared queue until a None sentinel arrives."""
+        while True:
+            path = dir_queue.get()
+            if path is None:
+                dir_queue.task_done()
+                return
             try:
-                for root, _, files in os.walk(root_dir, topdown=True, onerror=lambda e: None):
+                if self._running:
+                    for subdir in self._scan_directory(path):
+                        dir_queue.put(subdir)
+            except Exception:
+                pass # Skip problematic directory
+            finally:
+                dir_queue.task_done()
+
+    def _scan_directory(self, path):
+        """
+        Lists one directory, records matching files and returns its subdirectories.
+        Results and counters are merged under the lock once per directory.
+        """
+        subdirs = []
+        matches = []
+        files_seen = 0
+        filters = self.filters
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
                     if not self._running:
                         break
-                    for filename in files:
-                        if not self._running:
-                            break
-                        self.files_searched += 1
-                        match = False
-                        try:
-                            if self.use_regex:
-                                if self.regex and self.regex.search(filename):
-                                    match = True
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not filters.excludes_dir(entry.name):
+                                subdirs.append(entry.path)
+                            continue
+                    except OSError:
+                        continue
+                    files_seen += 1
+                    try:
+                        if filters.accepts_name(entry.name) and self._match_name(entry.name):
+                            try:
+                                stat = entry.stat(follow_symlinks=False)
+                                size = stat.st_size
+                                if filters.needs_stat and not filters.accepts_stat(size, stat.st_mtime):
+                                    continue
+                            except OSError:
+                                if filters.needs_stat:
+                                    continue
+                                size = -1
+                            if self.content_pattern is not None:
+                                self._submit_content_check(entry.name, entry.path, size)
                             else:
-                                if self.search_term_lower in filename.lower():
-                                    match = True
-
-                            if match:
-                                self.matches_found += 1
-                                filepath = os.path.join(root, filename)
-                                try:
-                                    size = os.path.getsize(filepath)
-                                except OSError:
-                                    size = -1
-                                self.results.append((filename, filepath, size))
-                        except Exception:
-                            continue # Skip problematic file
-
-                        if self.files_searched % 100 == 0:
-                            wx.PostEvent(self.wx_frame, SearchProgressEvent(
-                                files_searched=self.files_searched,
-                                matches_found=self.matches_found
-                            ))
-            except Exception:
-                 continue
+                                matches.append((entry.name, entry.path, size))
+                    except Exception:
+                        continue # Skip problematic file
+        except OSError:
+            return []
+
+        with self._lock:
+            self.files_searched += files_seen
+            if matches:
+                self.matches_found += len(matches)
+                self._pending_results.extend(matches)
+        self._post_progress()
+        return subdirs
+
+    def _start_content_pool(self):
+        if self.content_pattern is not None:
+            self._content_pool = ThreadPoolExecutor(max_workers=CONTENT_WORKERS, thread_name_prefix="ContentSearch")
+
+    def _finish_content_pool(self):
+        """Waits for queued content checks, dropping the ones not started yet if cancelled."""
+        if self._content_pool:
+            self._content_pool.shutdown(wait=True, cancel_futures=not self._running)
+            self._content_pool = None
+
+    def _submit_content_check(self, name, path, size):
+        # Skip files that are known to be too large before touching them.
+        if size > self.max_content_size or size == 0:
+            return
+        # Waiting for a free slot keeps a walk over millions of files from
+        # queueing them all in memory ahead of the content readers.
+        while not self._content_slots.acquire(timeout=PROGRESS_INTERVAL):
+            if not self._running:
+                return
+        try:
+            future = self._content_pool.submit(self._check_content, name, path, size)
+        except RuntimeError:
+            self._content_slots.release()
+            return
+        future.add_done_callback(lambda _future: self._content_slots.release())
 
-        wx.PostEvent(self.wx_frame, SearchDoneEvent(results=self.results, files_searched=self.files_searched, matches_found=self.matches_found, error=None if self._running else "Cancelled"))
+    def _check_content(self, name, path, size):
+        if not self._running:
+            return
+        if file_contains(path, self.content_pattern, self.max_content_size):
+            with self._lock:
+                self.matches_found += 1
+                self._pending_results.append((name, path, size))
+            self._post_progress()
+
+    def _match_name(self, filename):
+        if self.use_regex:
+            return bool(self.regex and self.regex.search(filename))
+        return self.search_term_lower in filename.lower()
+
+    def _post_progress(self, force=False):
+        """
+        Posts the matches found since the last call and a progress event,
+        throttled to once every PROGRESS_INTERVAL seconds.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_progress < PROGRESS_INTERVAL:
+                return
+            self._last_progress = now
+            files_searched = self.files_searched
+            matches_found = self.matches_found
+            batch, self._pending_results = self._pending_results, []
+        if batch:
+            wx.PostEvent(self.wx_frame, SearchResultsEvent(thread=self, results=batch))
+        wx.PostEvent(self.wx_frame, SearchProgressEvent(
+            thread=self,
+            files_searched=files_searched,
+            matches_found=matches_found
+        ))
 
     def stop(self):
         self._running = False
+
+
+class IndexSearchWorkerThread(SearchWorkerThread):
+    """
+    Worker thread that answers a file search from the persistent FilenameIndex.
+    Roots that were never indexed are built first; when refresh_index is set,
+    every root is incrementally refreshed before the query runs.
+    Posts the same progress, results and done events as SearchWorkerThread.
+    SearchFilters are applied to the rows returned by the index; the date
+    limits need a stat call per candidate since the index stores no times.
+    """
+    def __init__(self, wx_frame, search_term, search_roots, use_regex, index_path, refresh_index=False, **kwargs):
+        super().__init__(wx_frame, search_term, search_roots, use_regex, **kwargs)
+        self.index_path = index_path
+        self.refresh_index = refresh_index
+
+    def run(self):
+        if not self._running:
+            wx.PostEvent(self.wx_frame, SearchDoneEvent(thread=self, files_searched=0, matches_found=0, error=self.error_message))
+            return
+
+        index = None
+        error = None
+        try:
+            index = FilenameIndex(self.index_path)
+            for root_dir in self.search_roots:
+                if not self._running:
+                    break
+                if self.refresh_index or not index.is_indexed(root_dir):
+                    index.refresh(root_dir, progress_callback=self._on_index_progress, is_cancelled=lambda: not self._running)
+
+            if self._running:
+                self._start_content_pool()
+                for batch in index.iter_search(self.search_term, self.search_roots, self.use_regex, is_cancelled=lambda: not self._running):
+                    batch = self._filter_index_batch(batch)
+                    if self.content_pattern is not None:
+                        for name, path, size in batch:
+                            self._submit_content_check(name, path, size)
+                        continue
+                    self.matches_found += len(batch)
+                    wx.PostEvent(self.wx_frame, SearchResultsEvent(thread=self, results=batch))
+                self._finish_content_pool()
+                self._post_progress(force=True)
+        except Exception as e:
+            error = f"File index error: {e}"
+        finally:
+            self._finish_content_pool()
+            if index:
+                index.close()
+
+        if error is None and not self._running:
+            error = "Cancelled"
+        wx.PostEvent(self.wx_frame, SearchDoneEvent(thread=self, files_searched=self.files_searched, matches_found=self.matches_found, error=error))
+
+    def _filter_index_batch(self, batch):
+        filters = self.filters
+        filtered = []
+        for name, path, size in batch:
+            if not filters.accepts_name(name) or filters.excludes_path(path, self.search_roots):
+                continue
+            if filters.modified_after is not None or filters.modified_before is not None:
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                size = stat.st_size
+                if not filters.accepts_stat(size, stat.st_mtime):
+                    continue
+            elif filters.needs_stat and not filters.accepts_stat(size, 0):
+                continue
+            filtered.append((name, path, size))
+        return filtered
+
+    def _on_index_progress(self, dirs_checked, files_indexed):
+        self.files_searched = files_indexed
+        wx.PostEvent(self.wx_frame, SearchProgressEvent(
+            thread=self,
+            files_searched=self.files_searched,
+            matches_found=self.matches_found
+        ))
@@ -0,0 +1,31 @@
+import wx
+from gui.settings import SettingsPanel
+
+class FileToolsSettings(SettingsPanel):
+    category_name = "File Tools"
+
+    def create_controls(self):
+        converter_sizer = wx.BoxSizer(wx.VERTICAL)
+        parallel_label = wx.StaticText(self, label="Simultaneous media conversions (0 uses the number of CPU cores):")
+        self.parallel_conversions_spin = wx.SpinCtrl(self, min=0, max=64, initial=0)
+        converter_sizer.Add(parallel_label, 0, wx.ALL | wx.EXPAND, 5)
+        converter_sizer.Add(self.parallel_conversions_spin, 0, wx.ALL | wx.EXPAND, 5)
+        self.parallel_conversions_spin.Bind(wx.EVT_SPINCTRL, self.on_setting_change)
+
+        self.sizer.Add(converter_sizer, 0, wx.EXPAND | wx.ALL, 5)
+        self.sizer.AddStretchSpacer(1)
+
+    def load_settings(self):
+        file_tools_settings = self.config.get('FileTools', {})
+        try:
+            self.parallel_conversions_spin.SetValue(int(file_tools_settings.get('max_parallel_conversions', 0)))
+        except (ValueError, TypeError):
+            self.parallel_conversions_spin.SetValue(0)
+
+    def save_settings(self):
+        if 'FileTools' not in self.config:
+            self.config['FileTools'] = {}
+        self.config['FileTools']['max_parallel_conversions'] = self.parallel_conversions_spin.GetValue()
+
+    def on_setting_change(self, event):
+        self.save_settings()
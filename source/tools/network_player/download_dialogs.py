@@ -1,13 +1,13 @@
 import wx
-import threading
-import subprocess
 import os
 import re
 import sys
-from speech import speak
 import urllib.parse
 import uuid
+import time
+import shutil
 import app_vars
+from gui.settings import load_app_config
 
 
 def normalize_filename(filename):
@@ -40,6 +40,214 @@ def normalize_filename(filename):
         safe_name = filename
     return safe_name
 
+PROGRESS_REGEX = re.compile(
+    r"\[download\]\s+"
+    r"(?P<percent>[\d.]+)%\s+of\s+"
+    r"(?:~?\s*)?"
+    r"(?P<size>[\d.]+[KMGTP]?i?B)\s+"
+    r"at\s+"
+    r"(?P<speed>[\d.]+[KMGTP]?i?B/s)\s+"
+    r"ETA\s+"
+    r"(?P<eta>[\d:]+)"
+)
+
+def parse_progress_line(line):
+    """Returns the percent, size, speed and eta of a yt-dlp progress line, or None for any other line."""
+    match = PROGRESS_REGEX.match(line)
+    return match.groupdict() if match else None
+
+def parse_video_id(url):
+    """Extracts the YouTube video ID from various URL formats. Returns None if the URL has none."""
+    try:
+        parsed_url = urllib.parse.urlparse(url)
+        if parsed_url.hostname == 'youtu.be':
+            return parsed_url.path[1:].split('/')[0] or None
+        if parsed_url.hostname in ('www.youtube.com', 'youtube.com', 'm.youtube.com', 'music.youtube.com'):
+            if parsed_url.path == '/watch':
+                query = urllib.parse.parse_qs(parsed_url.query)
+                return query.get('v', [None])[0]
+            for prefix in ('/embed/', '/v/', '/shorts/', '/live/'):
+                if parsed_url.path.startswith(prefix):
+                    return parsed_url.path[len(prefix):].split('/')[0] or None
+    except Exception as e:
+        print(f"Error parsing video ID from URL '{url}': {e}")
+    return None
+
+def extract_video_id(url):
+    """Extracts YouTube video ID from various URL formats, or returns a random ID so downloads still get a unique name."""
+    return parse_video_id(url) or str(uuid.uuid4())
+
+SIZE_UNITS = {
+    'B': 1,
+    'KB': 1000, 'MB': 1000 ** 2, 'GB': 1000 ** 3, 'TB': 1000 ** 4, 'PB': 1000 ** 5,
+    'KiB': 1024, 'MiB': 1024 ** 2, 'GiB': 1024 ** 3, 'TiB': 1024 ** 4, 'PiB': 1024 ** 5,
+}
+SIZE_REGEX = re.compile(r"([\d.]+)\s*([KMGTP]?i?B)")
+RATE_LIMIT_REGEX = re.compile(r"^\d+(\.\d+)?[KMG]?$", re.IGNORECASE)
+
+# Download performance profiles offered in the YouTube settings. "Custom" uses the individual settings as saved.
+DOWNLOAD_PROFILES = {
+    "Default": {'concurrent_fragments': 1, 'http_chunk_size': '', 'download_rate_limit': '', 'external_downloader': 'None'},
+    "Fast connection": {'concurrent_fragments': 8, 'http_chunk_size': '10M', 'download_rate_limit': '', 'external_downloader': 'None'},
+    "Shared connection": {'concurrent_fragments': 1, 'http_chunk_size': '', 'download_rate_limit': '2M', 'external_downloader': 'None'},
+}
+CUSTOM_PROFILE = "Custom"
+
+
+def parse_size(text):
+    """Converts a yt-dlp size or speed such as '3.50MiB' or '512.0KiB/s' to bytes. Returns 0 if unreadable."""
+    match = SIZE_REGEX.search(text or '')
+    if not match:
+        return 0
+    try:
+        return float(match.group(1)) * SIZE_UNITS.get(match.group(2), 1)
+    except ValueError:
+        return 0
+
+def format_size(num_bytes):
+    """Formats a byte count the way yt-dlp does, e.g. 3.50MiB."""
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if num_bytes < 1024:
+            return f"{num_bytes:.2f}{unit}" if unit != 'B' else f"{int(num_bytes)}B"
+        num_bytes /= 1024
+    return f"{num_bytes:.2f}TiB"
+
+def get_download_performance_settings(youtube_settings):
+    """Returns the concurrent fragment, chunk size, rate limit and external downloader settings of the selected profile."""
+    profile = youtube_settings.get('download_profile', "Default")
+    if profile in DOWNLOAD_PROFILES:
+        return dict(DOWNLOAD_PROFILES[profile])
+    defaults = DOWNLOAD_PROFILES["Default"]
+    return {key: youtube_settings.get(key, default) for key, default in defaults.items()}
+
+def find_external_downloader(name):
+    """Returns the path of an external downloader such as aria2c, next to the app or on PATH, or None."""
+    if getattr(sys, 'frozen', False):
+        project_root = os.path.dirname(sys.executable)
+    else:
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    bundled = os.path.join(project_root, f"{name}.exe")
+    if os.path.exists(bundled):
+        return bundled
+    return shutil.which(name)
+
+def get_performance_args(youtube_settings=None):
+    """
+    Returns the yt-dlp arguments for the download performance profile in the
+    YouTube settings: concurrent fragments (-N), HTTP chunk size, rate limit
+    and external downloader. Invalid values are left out rather than
+    failing the download.
+    """
+    if youtube_settings is None:
+        youtube_settings = load_app_config().get('YouTube', {})
+    settings = get_download_performance_settings(youtube_settings)
+    args = []
+    try:
+        fragments = int(settings.get('concurrent_fragments', 1))
+    except (TypeError, ValueError):
+        fragments = 1
+    if fragments > 1:
+        args.extend(['--concurrent-fragments', str(fragments)])
+
+    chunk_size = str(settings.get('http_chunk_size') or '').strip()
+    if chunk_size and RATE_LIMIT_REGEX.match(chunk_size):
+        args.extend(['--http-chunk-size', chunk_size])
+
+    rate_limit = str(settings.get('download_rate_limit') or '').strip()
+    if rate_limit and RATE_LIMIT_REGEX.match(rate_limit):
+        args.extend(['--limit-rate', rate_limit])
+
+    downloader = settings.get('external_downloader', 'None')
+    if downloader and downloader != 'None':
+        downloader_path = find_external_downloader(downloader)
+        if downloader_path:
+            args.extend(['--downloader', downloader_path])
+            if downloader == 'aria2c':
+                connections = max(fragments, 1)
+                args.extend(['--downloader-args', f"aria2c:-x {connections} -s {connections} -k 1M"])
+        else:
+            print(f"External downloader {downloader} not found; using the built-in downloader.")
+    return args
+
+
+class ThroughputMeter:
+    """
+    Works out the effective throughput of a download from yt-dlp's progress
+    lines: everything downloaded so far divided by the time since it started.
+    Unlike the instantaneous speed yt-dlp prints, it includes the time spent
+    between fragments and files, so it shows what the settings really achieve.
+    A video with separate audio is downloaded as two files, each going from
+    0 to 100 percent; the finished ones are counted when the percentage drops.
+    What was already on disk at the first progress line (a resumed download)
+    is not counted.
+    """
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.finished_bytes = 0.0
+        self.current_bytes = 0.0
+        self.last_percent = 0.0
+        self.initial_bytes = None
+
+    def update(self, percent, total_size):
+        """Records a progress line and returns the effective throughput in bytes per second."""
+        total_bytes = parse_size(total_size)
+        if percent < self.last_percent:
+            self.finished_bytes += self.current_bytes
+        self.last_percent = percent
+        self.current_bytes = total_bytes * percent / 100
+        if self.initial_bytes is None:
+            self.initial_bytes = self.current_bytes
+        elapsed = time.monotonic() - self.started_at
+        downloaded = self.finished_bytes + self.current_bytes - self.initial_bytes
+        return max(downloaded, 0.0) / elapsed if elapsed > 0 else 0.0
+
+def build_download_command(download_settings, yt_dlp_exe_path, ffmpeg_dir, output_template, performance_args=None):
+    """
+    Returns the yt-dlp command for the settings chosen in DownloadSettingsDialog,
+    and the file extension the download is expected to end up with.
+    performance_args defaults to the profile from get_performance_args().
+    """
+    download_path = download_settings['directory']
+    download_type = download_settings['type']
+    video_quality = download_settings.get('video_quality')
+    audio_format = download_settings.get('audio_format')
+    audio_quality = download_settings.get('audio_quality')
+
+    cmd = [yt_dlp_exe_path]
+    cmd.extend(['--no-warnings', '--progress', '--no-playlist'])
+    cmd.extend(['--ffmpeg-location', ffmpeg_dir])
+    cmd.extend(['-P', download_path])
+    cmd.extend(['-o', os.path.normpath(output_template)])
+
+    if download_type == "Audio":
+        cmd.extend(['-f', 'bestaudio/best'])
+        cmd.extend(['-x'])
+        cmd.extend(['--audio-format', audio_format])
+        if audio_quality and audio_quality != '0 (Best VBR)':
+             cmd.extend(['--audio-quality', audio_quality])
+        elif audio_quality == '0 (Best VBR)':
+            if audio_format in ['mp3', 'opus', 'vorbis', 'aac']:
+                 cmd.extend(['--audio-quality', '0'])
+        cmd.extend(['--add-metadata'])
+        cmd.extend(['--embed-thumbnail'])
+        final_extension = f".{audio_format}"
+    else:
+        final_extension = ".mp4"
+        format_selector = 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/bestvideo+bestaudio/best'
+        if video_quality == "Low":
+            format_selector = 'worst[ext=mp4]/worstvideo[ext=mp4]/worst'
+        elif video_quality == "Medium":
+            format_selector = 'best[height<=?720][ext=mp4]/bestvideo[height<=?720][ext=mp4]/best[height<=?720]'
+        elif video_quality == "Best":
+             format_selector = 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/bestvideo+bestaudio/best'
+
+        cmd.extend(['-f', format_selector])
+        cmd.extend(['--merge-output-format', 'mp4'])
+
+    cmd.extend(get_performance_args() if performance_args is None else performance_args)
+    cmd.append(download_settings['url'])
+    return cmd, final_extension
+
 
 class DownloadSettingsDialog(wx.Dialog):
     def __init__(self, parent, title, initial_title, video_url):
@@ -199,509 +407,3 @@ class DownloadSettingsDialog(wx.Dialog):
             'audio_quality': audio_quality,
         }
         self.EndModal(wx.ID_OK)
-
-
-class DownloadDialog(wx.Dialog):
-    def __init__(self, parent, title, download_settings):
-        super().__init__(parent, title=title, size=(600, 300), style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER)
-        self.download_settings = download_settings
-        self.parent_frame = parent
-        self.downloading = True
-        self.process = None
-        self.output_reader_thread = None
-        self.success = False
-        self.last_status_message = ""
-
-        if getattr(sys, 'frozen', False):
-             self.project_root = os.path.dirname(sys.executable)
-        else:
-             self.project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        self.yt_dlp_exe_path = os.path.join(self.project_root, 'yt-dlp.exe')
-        self.ffmpeg_path = getattr(parent, 'ffmpeg_path', os.path.join(self.project_root, 'ffmpeg.exe'))
-        self.ffmpeg_dir = os.path.dirname(self.ffmpeg_path)
-
-        self.panel = wx.Panel(self)
-        vbox = wx.BoxSizer(wx.VERTICAL)
-
-        self.percent_label = wx.StaticText(self.panel, label="")
-        self.size_label = wx.StaticText(self.panel, label="")
-        self.speed_label = wx.StaticText(self.panel, label="")
-        self.eta_label = wx.StaticText(self.panel, label="")
-        vbox.Add(self.percent_label, 0, wx.ALL | wx.EXPAND, 2) # Less border for labels
-        vbox.Add(self.size_label, 0, wx.ALL | wx.EXPAND, 2)
-        vbox.Add(self.speed_label, 0, wx.ALL | wx.EXPAND, 2)
-        vbox.Add(self.eta_label, 0, wx.ALL | wx.EXPAND, 2)
-
-        self.percent_label.Hide()
-        self.size_label.Hide()
-        self.speed_label.Hide()
-        self.eta_label.Hide()
-
-        self.status_details_text = wx.TextCtrl(self.panel, style=wx.TE_MULTILINE | wx.TE_READONLY | wx.HSCROLL)
-        self.status_details_text.SetValue("Initializing download...")
-        vbox.Add(self.status_details_text, 1, wx.ALL | wx.EXPAND, 5)
-
-        self.progress_bar = wx.Gauge(self.panel, range=1000, size=(350, 20), style=wx.GA_HORIZONTAL)
-        vbox.Add(self.progress_bar, 0, wx.ALL | wx.ALIGN_CENTER, 10)
-
-        cancel_button = wx.Button(self.panel, label="Cancel")
-        cancel_button.Bind(wx.EVT_BUTTON, self.on_cancel)
-        vbox.Add(cancel_button, 0, wx.ALL | wx.ALIGN_CENTER, 10)
-
-        self.panel.SetSizer(vbox)
-        self.Layout()
-        self.Fit()
-        self.Centre()
-        self.Show()
-
-        self.progress_regex = re.compile(
-            r"\[download\]\s+"
-            r"(?P<percent>[\d.]+)%\s+of\s+"
-            r"(?:~?\s*)?"
-            r"(?P<size>[\d.]+[KMGTP]?i?B)\s+"
-            r"at\s+"
-            r"(?P<speed>[\d.]+[KMGTP]?i?B/s)\s+"
-            r"ETA\s+"
-            r"(?P<eta>[\d:]+)"
-        )
-
-    def download_task(self):
-        """Starts the download process using settings."""
-        url = self.download_settings['url']
-        safe_title = normalize_filename(self.download_settings['filename']) # Use chosen filename
-        download_path = self.download_settings['directory'] # Use chosen directory
-        download_type = self.download_settings['type']
-        video_quality = self.download_settings['video_quality']
-        audio_format = self.download_settings['audio_format']
-        audio_quality = self.download_settings['audio_quality']
-
-        if not safe_title:
-            safe_title = "download"
-        self.safe_title = safe_title
-        self.download_path = download_path
-
-        if not os.path.exists(self.yt_dlp_exe_path):
-             wx.CallAfter(self.update_status, f"Error: yt-dlp not found", speak_msg=True)
-             wx.CallAfter(self.on_finish)
-             return
-
-        ffmpeg_needed = (download_type == "Audio") or (download_type == "Video")
-        if ffmpeg_needed and not os.path.exists(os.path.join(self.ffmpeg_dir, 'ffmpeg.exe')):
-            wx.CallAfter(self.update_status, f"Error: ffmpeg.exe not found in {self.ffmpeg_dir}. yt-dlp requires it for conversion/merging.", speak_msg=True)
-            wx.CallAfter(self.on_finish)
-            return
-
-        self.video_id = self.extract_video_id(url)
-        if not self.video_id:
-             error_msg = "Could not determine video ID for temporary filename."
-             wx.CallAfter(self.update_status, error_msg, speak_msg=True)
-             wx.CallAfter(self.on_finish)
-             return
-        self.temp_filename_base = self.video_id
-
-        self.dl_thread = threading.Thread(target=self.start_download_process_with_settings, args=(url, download_path, download_type, video_quality, audio_format, audio_quality))
-        self.dl_thread.start()
-        wx.CallAfter(self.SetFocus)
-
-    def extract_video_id(self, url):
-        """Extracts YouTube video ID from various URL formats."""
-
-        try:
-            parsed_url = urllib.parse.urlparse(url)
-            if parsed_url.hostname == 'youtu.be':
-                return parsed_url.path[1:]
-            if parsed_url.hostname in ('www.youtube.com', 'youtube.com', 'm.youtube.com'):
-                if parsed_url.path == '/watch':
-                    query = urllib.parse.parse_qs(parsed_url.query)
-                    return query.get('v', [None])[0]
-                if parsed_url.path.startswith('/embed/'):
-                    return parsed_url.path.split('/embed/')[1]
-                if parsed_url.path.startswith('/v/'):
-                    return parsed_url.path.split('/v/')[1]
-        except Exception as e:
-            print(f"Error parsing video ID from URL '{url}': {e}")
-        return str(uuid.uuid4())
-
-    def start_download_process_with_settings(self, url, download_path, download_type, video_quality, audio_format, audio_quality):
-        """Prepares and starts the yt-dlp subprocess based on settings."""
-        try:
-            if not self.downloading:
-                return
-
-            temp_output_template = os.path.join(self.download_path, '%(id)s.%(ext)s')
-            temp_output_template = os.path.normpath(temp_output_template)
-
-            cmd = [self.yt_dlp_exe_path]
-            cmd.extend(['--no-warnings', '--progress', '--no-playlist'])
-            cmd.extend(['--ffmpeg-location', self.ffmpeg_dir])
-            cmd.extend(['-P', self.download_path])
-            cmd.extend(['-o', temp_output_template])
-
-            if download_type == "Audio":
-                cmd.extend(['-f', 'bestaudio/best'])
-                cmd.extend(['-x'])
-                cmd.extend(['--audio-format', audio_format])
-                if audio_quality and audio_quality != '0 (Best VBR)':
-                     cmd.extend(['--audio-quality', audio_quality])
-                elif audio_quality == '0 (Best VBR)':
-                    if audio_format in ['mp3', 'opus', 'vorbis', 'aac']:
-                         cmd.extend(['--audio-quality', '0'])
-                cmd.extend(['--add-metadata'])
-                cmd.extend(['--embed-thumbnail'])
-                self.final_extension = f".{audio_format}"
-            else:
-                self.final_extension = ".mp4"
-                format_selector = 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/bestvideo+bestaudio/best'
-                if video_quality == "Low":
-                    format_selector = 'worst[ext=mp4]/worstvideo[ext=mp4]/worst'
-                elif video_quality == "Medium":
-                    format_selector = 'best[height<=?720][ext=mp4]/bestvideo[height<=?720][ext=mp4]/best[height<=?720]'
-                elif video_quality == "Best":
-                     format_selector = 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/bestvideo+bestaudio/best'
-
-                cmd.extend(['-f', format_selector])
-                cmd.extend(['--merge-output-format', 'mp4'])
-
-            cmd.append(url)
-            self._run_download_process(cmd)
-
-        except Exception as e:
-            error_msg = f"Error preparing download: {e}"
-            wx.CallAfter(self.update_status, error_msg, speak_msg=True)
-            wx.CallAfter(self.on_finish)
-
-    def _run_download_process(self, cmd):
-        """Executes the command using subprocess and starts the output reader."""
-        if not self.downloading:
-            return
-
-        wx.CallAfter(self.update_status, "Starting download...", speak_msg=True)
-
-        expected_temp_path = None
-        if self.video_id and self.final_extension:
-             expected_temp_path = os.path.join(self.download_path, f"{self.video_id}{self.final_extension}")
-             expected_temp_path = os.path.normpath(expected_temp_path)
-
-        try:
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            startupinfo.wShowWindow = subprocess.SW_HIDE
-
-            self.process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                encoding='utf-8',
-                errors='replace',
-                startupinfo=startupinfo,
-                bufsize=1
-            )
-
-            self.output_reader_thread = threading.Thread(target=self.read_output, daemon=True)
-            self.output_reader_thread.start()
-            self.process.wait() # Wait for yt-dlp to finish
-
-            if self.output_reader_thread and self.output_reader_thread.is_alive():
-                 self.output_reader_thread.join()
-
-            if self.downloading:
-                if self.process.returncode == 0:
-                    self.success = True
-                    wx.CallAfter(self.update_status, "Download process finished. Finalizing...", speak_msg=False)
-
-                    try:
-                        downloaded_files = [f for f in os.listdir(self.download_path) if f.startswith(self.video_id)]
-                        if not downloaded_files:
-                            self.success = False
-                            error_msg = f"Download finished with code 0, but no file starting with '{self.video_id}' found in '{self.download_path}'."
-                            wx.CallAfter(self.update_status, error_msg, speak_msg=True)
-                        elif len(downloaded_files) > 1:
-                             # Should not happen with --no-playlist and single file output, but defensive
-                             self.success = False
-                             error_msg = f"Download finished with code 0, but multiple files starting with '{self.video_id}' found. Cannot determine which to rename."
-                             wx.CallAfter(self.update_status, error_msg, speak_msg=True)
-                        else:
-                            # Found the single downloaded file
-                            actual_temp_filename = downloaded_files[0]
-                            actual_temp_path = os.path.join(self.download_path, actual_temp_filename)
-
-                            # Determine the target final path using the selected filename and the actual downloaded extension
-                            final_filename = f"{self.safe_title}{os.path.splitext(actual_temp_filename)[1]}"
-                            final_file_path = os.path.join(self.download_path, final_filename)
-                            final_file_path = os.path.normpath(final_file_path)
-
-                            if os.path.exists(actual_temp_path):
-                                if os.path.exists(final_file_path) and actual_temp_path != final_file_path:
-                                    try:
-                                        os.remove(final_file_path)
-                                    except OSError as e:
-                                        self.success = False
-                                        error_msg = f"Download finished, but could not remove existing file '{os.path.basename(final_file_path)}' before renaming: {e}"
-                                        wx.CallAfter(self.update_status, error_msg, speak_msg=True)
-                                        # Don't attempt rename if removing failed
-                                        actual_temp_path = None
-                                if actual_temp_path and os.path.exists(actual_temp_path):
-                                    try:
-                                         os.rename(actual_temp_path, final_file_path)
-                                         wx.CallAfter(self.update_status, "Download finished successfully.", speak_msg=True)
-                                    except OSError as e:
-                                        self.success = False
-                                        error_msg = f"Error during file rename from '{os.path.basename(actual_temp_path)}' to '{os.path.basename(final_file_path)}': {e}"
-                                        wx.CallAfter(self.update_status, error_msg, speak_msg=True)
-                                    except Exception as e:
-                                        self.success = False
-                                        error_msg = f"Unexpected error during file rename: {e}"
-                                        wx.CallAfter(self.update_status, error_msg, speak_msg=True)
-
-                            else:
-                                self.success = False
-                                error_msg = f"Download finished with code 0, but temporary file '{os.path.basename(actual_temp_path)}' was not found for renaming."
-                                wx.CallAfter(self.update_status, error_msg, speak_msg=True)
-
-                    except Exception as e:
-                        self.success = False
-                        error_msg = f"Unexpected error during file finalization: {e}"
-                        wx.CallAfter(self.update_status, error_msg, speak_msg=True)
-
-                else:
-                    self.success = False
-                    error_msg = f"Download failed. yt-dlp exited with code {self.process.returncode}."
-                    wx.CallAfter(self.update_status, error_msg, speak_msg=True)
-
-        except FileNotFoundError:
-            error_msg = f"Error: Command not found - {cmd[0]}"
-            wx.CallAfter(self.update_status, error_msg, speak_msg=True)
-        except Exception as e:
-            error_msg = f"Error running subprocess: {e}"
-            wx.CallAfter(self.update_status, error_msg, speak_msg=True)
-        finally:
-            # Cleanup temporary file if it still exists and rename failed/was skipped
-            if not self.success and self.video_id:
-                try:
-                    # Look for files starting with video_id, possibly ending with .part or other temp indicators
-                    temp_files = [f for f in os.listdir(self.download_path)
-                                  if f.startswith(self.video_id) and
-                                     (f.endswith('.part') or os.path.splitext(f)[0] == self.video_id)]
-                    for temp_file in temp_files:
-                         try:
-                             os.remove(os.path.join(self.download_path, temp_file))
-                         except Exception as cleanup_e:
-                             print(f"Error cleaning up temp file {temp_file}: {cleanup_e}")
-                except Exception as list_e:
-                     print(f"Error listing directory for cleanup: {list_e}")
-
-            if self.downloading:
-                wx.CallAfter(self.on_finish)
-
-    def read_output(self):
-        """Reads stdout/stderr line by line from the subprocess."""
-        stderr_lines = []
-
-        try:
-            for line in iter(self.process.stdout.readline, ''):
-                if not self.downloading: break
-                line = line.strip()
-                if line:
-                    match = self.progress_regex.match(line)
-                    if match:
-                        progress_data = match.groupdict()
-                        wx.CallAfter(self.update_progress, progress_data)
-                    elif line.startswith('[ExtractAudio]') or line.startswith('[Merger]'):
-                        # Show post-processing status, but don't speak it
-                        wx.CallAfter(self.update_status, line, speak_msg=False)
-                    elif line.startswith('Deleting original file'):
-                         # Often follows successful conversion
-                         wx.CallAfter(self.update_status, "Cleaning up...", speak_msg=False)
-
-            # Close stdout pipe when done reading
-            if self.process and self.process.stdout:
-                try: self.process.stdout.close()
-                except Exception: pass
-
-        except Exception as e:
-            if self.downloading:
-                 print(f"Error reading stdout: {e}")
-
-        try:
-            for line in iter(self.process.stderr.readline, ''):
-                 if not self.downloading: break
-                 line = line.strip()
-                 if line:
-                    print(f"stderr: {line}")
-                    stderr_lines.append(line)
-                    if len(stderr_lines) > 10:
-                         stderr_lines.pop(0)
-
-            # Close stderr pipe when done reading
-            if self.process and self.process.stderr:
-                 try: self.process.stderr.close()
-                 except Exception: pass
-
-        except Exception as e:
-             if self.downloading:
-                 print(f"Error reading stderr: {e}")
-
-        # Update status if failed and stderr has info
-        if self.process and self.process.poll() != 0 and stderr_lines and self.downloading:
-             error_msg = f"Download failed (Code: {self.process.poll()}).\nErrors:\n" + "\n".join(stderr_lines)
-             wx.CallAfter(self.update_status, error_msg, speak_msg=True)
-
-    def update_progress(self, progress_data):
-        """Updates the progress bar, status labels, and text control."""
-        if not self.downloading:
-             return
-
-        try:
-            percent = float(progress_data.get('percent', 0))
-            size = progress_data.get('size', 'N/A')
-            speed = progress_data.get('speed', 'N/A')
-            eta = progress_data.get('eta', 'N/A')
-            self.progress_bar.SetValue(int(percent * 10))
-
-            percent_str = f"Percent: {percent:.1f}%"
-            size_str = f"Size: {size}"
-            speed_str = f"Speed: {speed}"
-            eta_str = f"ETA: {eta}"
-
-            labels_updated = False
-            if self.percent_label:
-                self.percent_label.SetLabel(percent_str)
-                if not self.percent_label.IsShown():
-                    self.percent_label.Show()
-                    labels_updated = True
-            if self.size_label:
-                self.size_label.SetLabel(size_str)
-                if not self.size_label.IsShown():
-                    self.size_label.Show()
-                    labels_updated = True
-            if self.speed_label:
-                self.speed_label.SetLabel(speed_str)
-                if not self.speed_label.IsShown():
-                    self.speed_label.Show()
-                    labels_updated = True
-            if self.eta_label:
-                self.eta_label.SetLabel(eta_str)
-                if not self.eta_label.IsShown():
-                    self.eta_label.Show()
-                    labels_updated = True
-
-            if self.status_details_text:
-                details_string = f"{percent_str}\n{size_str}\n{speed_str}\n{eta_str}"
-                self.status_details_text.SetValue(details_string)
-
-            if labels_updated:
-                self.panel.Layout()
-
-            speak_interval = 20
-            if abs(round(percent / speak_interval) * speak_interval - percent) < 0.5 and percent > 1:
-                 current_percent_int = int(round(percent / speak_interval) * speak_interval)
-                 if current_percent_int > 0 and str(current_percent_int) not in self.last_status_message:
-                     speak(f"{current_percent_int} percent", interrupt=False)
-                     self.last_status_message = f"{current_percent_int} percent"
-
-        except Exception as e:
-            print(f"Error updating progress UI: {e}")
-
-    def update_status(self, status, speak_msg=False):
-        """Updates the status text control, hides labels for general messages, and optionally speaks."""
-        current_value = self.status_details_text.GetValue() if self.status_details_text else ""
-        if status != self.last_status_message and status != current_value:
-
-            labels_hidden = False
-            if not status.startswith("Percent:") and not status.startswith("Downloading:"):
-                 if self.percent_label and self.percent_label.IsShown():
-                      self.percent_label.Hide()
-                      labels_hidden = True
-                 if self.size_label and self.size_label.IsShown():
-                      self.size_label.Hide()
-                      labels_hidden = True
-                 if self.speed_label and self.speed_label.IsShown():
-                      self.speed_label.Hide()
-                      labels_hidden = True
-                 if self.eta_label and self.eta_label.IsShown():
-                      self.eta_label.Hide()
-                      labels_hidden = True
-
-            if self.status_details_text:
-                 self.status_details_text.SetValue(status)
-
-            # Update layout if labels were hidden
-            if labels_hidden:
-                 self.panel.Layout()
-
-            if speak_msg:
-                speak(status, interrupt=True)
-            if speak_msg:
-                self.last_status_message = status
-
-    def on_cancel(self, event):
-        """Handles the cancel button click."""
-        dlg = wx.MessageDialog(self, "Are you sure you want to cancel the download?", "Confirm Cancel", wx.YES_NO | wx.ICON_QUESTION)
-        result = dlg.ShowModal()
-        dlg.Destroy()
-
-        if result == wx.ID_YES:
-             if self.downloading:
-                 self.downloading = False
-                 wx.CallAfter(self.update_status, "Cancelling...", speak_msg=True)
-                 if self.process and self.process.poll() is None:
-                     try:
-                         self.process.terminate()
-                         try:
-                             self.process.wait(timeout=2)
-                         except subprocess.TimeoutExpired:
-                             print("Process did not terminate, killing...")
-                             self.process.kill()
-                     except ProcessLookupError:
-                         print("Process already finished.")
-                     except Exception as e:
-                         print(f"Error terminating process: {e}")
-                 self.process = None
-
-                 if self.output_reader_thread and self.output_reader_thread.is_alive():
-                     try:
-                         self.output_reader_thread.join(timeout=1)
-                     except Exception as e:
-                         print(f"Error joining reader thread: {e}")
-
-             if not self.IsBeingDeleted():
-                 wx.CallAfter(self.Destroy)
-
-    def on_finish(self):
-        """Called when the download process completes or fails (if not cancelled)."""
-        if self.downloading:
-            if self.success:
-                 wx.CallAfter(self.progress_bar.SetValue, 1000)
-                 wx.CallAfter(self.show_success_message_dialog)
-            else:
-                 wx.CallAfter(self.progress_bar.SetValue, 0)
-                 if not self.IsBeingDeleted():
-                     wx.CallAfter(self.Destroy)
-
-    def show_success_message_dialog(self):
-        """Shows the final success message and closes."""
-        if self.downloading and not self.IsBeingDeleted():
-             wx.MessageBox("Download Complete!", "Success", wx.OK | wx.ICON_INFORMATION, parent=self.GetParent())
-             self.Destroy()
-
-    def Destroy(self):
-        """Overrides Destroy to ensure cleanup."""
-        self.downloading = False
-        if self.process and self.process.poll() is None:
-            try:
-                self.process.kill()
-                self.process.wait(timeout=1)
-            except Exception as e:
-                print(f"Error killing process during Destroy: {e}")
-        self.process = None
-        # Attempt to join thread if it's still alive
-        if self.output_reader_thread and self.output_reader_thread.is_alive():
-            try:
-                self.output_reader_thread.join(timeout=1)
-            except Exception as e:
-                print(f"Error joining reader thread in Destroy: {e}")
-
-        if not hasattr(self, '_already_destroying'): # Prevent recursion
-             self._already_destroying = True
-             super().Destroy()
@@ -0,0 +1,599 @@
+import wx
+import os
+import sys
+import json
+import uuid
+import threading
+import subprocess
+from speech import speak
+from gui.settings import load_app_config, get_file_path
+from process_pump import ProcessOutputPump
+from .download_dialogs import parse_progress_line, build_download_command, normalize_filename, parse_size, format_size, ThroughputMeter
+
+DEFAULT_MAX_CONCURRENT = 2
+# Number of yt-dlp output lines kept to explain a failed download.
+ERROR_TAIL_LINES = 10
+
+STATUS_QUEUED = "Queued"
+STATUS_DOWNLOADING = "Downloading"
+STATUS_PAUSED = "Paused"
+STATUS_COMPLETED = "Completed"
+STATUS_FAILED = "Failed"
+STATUS_CANCELLED = "Cancelled"
+FINISHED_STATUSES = (STATUS_COMPLETED, STATUS_FAILED, STATUS_CANCELLED)
+
+def get_tool_paths():
+    """Returns the paths of the bundled yt-dlp.exe and the folder containing ffmpeg.exe."""
+    if getattr(sys, 'frozen', False):
+        project_root = os.path.dirname(sys.executable)
+    else:
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(project_root, 'yt-dlp.exe'), project_root
+
+
+class DownloadJob:
+    """One entry of the download queue. Only settings and the fields in to_dict() are saved."""
+    def __init__(self, settings, job_id=None, status=STATUS_QUEUED, final_path=None, error=None):
+        self.id = job_id or uuid.uuid4().hex
+        self.settings = settings
+        self.status = status
+        self.final_path = final_path
+        self.error = error
+        self.final_extension = ""
+        self.percent = 0.0
+        self.size = ""
+        self.speed = 0.0
+        self.effective_speed = 0.0
+        self.eta = ""
+
+    @property
+    def title(self):
+        return self.settings.get('filename') or self.settings.get('url', 'Untitled')
+
+    def to_dict(self):
+        return {'id': self.id, 'settings': self.settings, 'status': self.status, 'final_path': self.final_path, 'error': self.error}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['settings'], job_id=data.get('id'), status=data.get('status', STATUS_QUEUED), final_path=data.get('final_path'), error=data.get('error'))
+
+
+class DownloadManager:
+    """
+    A persistent queue of yt-dlp downloads that run in the background.
+
+    At most max_concurrent jobs download at a time; the rest wait in the
+    order they were added. Each job writes to '<job id>.<ext>' in its
+    directory and is renamed to the chosen filename when it finishes, so
+    a paused or interrupted job is resumed from its .part files with
+    --continue. The queue is saved whenever a job changes state, and jobs
+    that were running when the app closed are queued again on the next start.
+
+    Listeners are called with the job whenever its status changes, from the
+    download threads. Progress is not reported through listeners; windows
+    read it from the jobs on their own refresh timer.
+    """
+    def __init__(self, queue_path, max_concurrent=DEFAULT_MAX_CONCURRENT, yt_dlp_exe_path=None, ffmpeg_dir=None):
+        default_exe, default_ffmpeg_dir = get_tool_paths()
+        self.queue_path = queue_path
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.yt_dlp_exe_path = yt_dlp_exe_path or default_exe
+        self.ffmpeg_dir = ffmpeg_dir or default_ffmpeg_dir
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self._jobs = []
+        self._processes = {}
+        # Ids of jobs whose download thread has not finished yet.
+        self._running = set()
+        self._listeners = []
+        self._shutting_down = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.queue_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = []
+        jobs = []
+        for item in data if isinstance(data, list) else []:
+            try:
+                job = DownloadJob.from_dict(item)
+            except (KeyError, TypeError):
+                continue
+            if job.status == STATUS_DOWNLOADING:
+                job.status = STATUS_QUEUED
+            jobs.append(job)
+        with self._lock:
+            self._jobs = jobs
+
+    def save(self):
+        with self._lock:
+            data = [job.to_dict() for job in self._jobs]
+        temp_path = self.queue_path + ".tmp"
+        with self._save_lock:
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=4)
+                os.replace(temp_path, self.queue_path)
+            except OSError as e:
+                print(f"Could not save the download queue: {e}")
+
+    def add_listener(self, callback):
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _notify(self, job):
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(job)
+            except Exception as e:
+                print(f"Error in download listener: {e}")
+
+    def _changed(self, job):
+        self.save()
+        self._notify(job)
+        self._schedule()
+
+    def get_jobs(self):
+        with self._lock:
+            return list(self._jobs)
+
+    def get_job(self, job_id):
+        with self._lock:
+            for job in self._jobs:
+                if job.id == job_id:
+                    return job
+        return None
+
+    def get_total_speed(self):
+        """Returns the combined speed of all running downloads in bytes per second."""
+        with self._lock:
+            return sum(job.speed for job in self._jobs if job.status == STATUS_DOWNLOADING)
+
+    def set_max_concurrent(self, max_concurrent):
+        with self._lock:
+            self.max_concurrent = max(1, int(max_concurrent))
+        self._schedule()
+
+    def enqueue(self, download_settings):
+        """Adds a download with the settings from DownloadSettingsDialog and returns its job."""
+        job = DownloadJob(dict(download_settings))
+        with self._lock:
+            self._jobs.append(job)
+        self._changed(job)
+        return job
+
+    def pause(self, job_id):
+        job = self.get_job(job_id)
+        if not job or job.status not in (STATUS_QUEUED, STATUS_DOWNLOADING):
+            return False
+        with self._lock:
+            job.status = STATUS_PAUSED
+            job.speed = 0.0
+        # The download thread sees the new status when yt-dlp exits and keeps the .part files.
+        self._stop_process(job.id)
+        self._changed(job)
+        return True
+
+    def resume(self, job_id):
+        job = self.get_job(job_id)
+        if not job or job.status not in (STATUS_PAUSED, STATUS_FAILED):
+            return False
+        with self._lock:
+            job.status = STATUS_QUEUED
+            job.error = None
+        self._changed(job)
+        return True
+
+    def cancel(self, job_id):
+        job = self.get_job(job_id)
+        if not job or job.status in (STATUS_COMPLETED, STATUS_CANCELLED):
+            return False
+        with self._lock:
+            was_running = job.id in self._running
+            job.status = STATUS_CANCELLED
+            job.speed = 0.0
+        if was_running:
+            # Partial files are removed by the download thread once yt-dlp has exited.
+            self._stop_process(job.id)
+        else:
+            self._remove_partial_files(job)
+        self._changed(job)
+        return True
+
+    def remove(self, job_id):
+        """Removes a job from the list, cancelling it first if it has not finished."""
+        job = self.get_job(job_id)
+        if not job:
+            return False
+        if job.status not in FINISHED_STATUSES:
+            self.cancel(job_id)
+        with self._lock:
+            if job in self._jobs:
+                self._jobs.remove(job)
+        self.save()
+        self._notify(job)
+        return True
+
+    def clear_finished(self):
+        with self._lock:
+            self._jobs = [job for job in self._jobs if job.status not in (STATUS_COMPLETED, STATUS_CANCELLED)]
+        self.save()
+        self._notify(None)
+
+    def _schedule(self):
+        to_start = []
+        with self._lock:
+            if self._shutting_down:
+                return
+            running = len(self._running)
+            for job in self._jobs:
+                if running >= self.max_concurrent:
+                    break
+                # A job resumed right after being paused waits until its old yt-dlp process has exited.
+                if job.status == STATUS_QUEUED and job.id not in self._running:
+                    job.status = STATUS_DOWNLOADING
+                    self._running.add(job.id)
+                    running += 1
+                    to_start.append(job)
+        for job in to_start:
+            self._notify(job)
+            threading.Thread(target=self._run_job, args=(job,), daemon=True).start()
+
+    def _stop_process(self, job_id):
+        with self._lock:
+            process = self._processes.get(job_id)
+        if process and process.poll() is None:
+            try:
+                process.terminate()
+            except Exception as e:
+                print(f"Error stopping download: {e}")
+
+    def _run_job(self, job):
+        errors = []
+        meter = ThroughputMeter()
+        returncode = None
+
+        def on_progress(progress):
+            job.percent = float(progress['percent'])
+            job.size = progress['size']
+            job.speed = parse_size(progress['speed'])
+            job.effective_speed = meter.update(job.percent, job.size)
+            job.eta = progress['eta']
+
+        try:
+            if not os.path.exists(self.yt_dlp_exe_path):
+                raise FileNotFoundError(f"yt-dlp not found at {self.yt_dlp_exe_path}")
+            output_template = os.path.join(job.settings['directory'], f"{job.id}.%(ext)s")
+            cmd, final_extension = build_download_command(job.settings, self.yt_dlp_exe_path, self.ffmpeg_dir, output_template)
+            cmd.insert(1, '--continue')
+            job.final_extension = final_extension
+
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            startupinfo.wShowWindow = subprocess.SW_HIDE
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding='utf-8', errors='replace', startupinfo=startupinfo, bufsize=1)
+            with self._lock:
+                self._processes[job.id] = process
+                stop_requested = job.status != STATUS_DOWNLOADING
+            if stop_requested:
+                # Paused or cancelled between being scheduled and starting.
+                process.terminate()
+
+            pump = ProcessOutputPump(process, parse_progress=parse_progress_line, on_progress=on_progress, error_tail_size=ERROR_TAIL_LINES).start()
+            returncode = process.wait()
+            pump.wait()
+            errors = pump.error_lines
+        except Exception as e:
+            errors.append(str(e))
+        finally:
+            with self._lock:
+                self._processes.pop(job.id, None)
+                self._running.discard(job.id)
+                job.speed = 0.0
+                job.effective_speed = 0.0
+
+        if self._shutting_down:
+            # Left as Downloading in the saved queue, so it resumes on the next start.
+            return
+        if job.status == STATUS_CANCELLED:
+            self._remove_partial_files(job)
+        elif job.status == STATUS_DOWNLOADING:
+            if returncode == 0:
+                self._finish_job(job)
+            else:
+                job.status = STATUS_FAILED
+                job.error = "\n".join(errors) or f"yt-dlp exited with code {returncode}."
+        self._changed(job)
+
+    def _job_files(self, job):
+        directory = job.settings['directory']
+        try:
+            return [f for f in os.listdir(directory) if f.startswith(f"{job.id}.")]
+        except OSError:
+            return []
+
+    def _finish_job(self, job):
+        directory = job.settings['directory']
+        files = [f for f in self._job_files(job) if not f.endswith(('.part', '.ytdl')) and '.part-Frag' not in f]
+        preferred = [f for f in files if job.final_extension and f.endswith(job.final_extension)]
+        if not files:
+            job.status = STATUS_FAILED
+            job.error = "yt-dlp finished, but the downloaded file was not found."
+            return
+        temp_name = (preferred or files)[0]
+        safe_title = normalize_filename(job.settings.get('filename', '')) or "download"
+        final_path = os.path.normpath(os.path.join(directory, f"{safe_title}{os.path.splitext(temp_name)[1]}"))
+        try:
+            os.replace(os.path.join(directory, temp_name), final_path)
+        except OSError as e:
+            job.status = STATUS_FAILED
+            job.error = f"Could not rename the downloaded file: {e}"
+            return
+        job.status = STATUS_COMPLETED
+        job.percent = 100.0
+        job.final_path = final_path
+
+    def _remove_partial_files(self, job):
+        directory = job.settings['directory']
+        for name in self._job_files(job):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError as e:
+                print(f"Error cleaning up temp file {name}: {e}")
+
+    def shutdown(self):
+        """Stops every running download without changing its saved state, so it resumes on the next start."""
+        with self._lock:
+            self._shutting_down = True
+            job_ids = list(self._processes)
+        self.save()
+        for job_id in job_ids:
+            self._stop_process(job_id)
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+def get_download_manager():
+    """Returns the process-wide DownloadManager, loading the saved queue and resuming it on first use."""
+    global _manager
+    max_concurrent = load_app_config().get('YouTube', {}).get('max_concurrent_downloads', DEFAULT_MAX_CONCURRENT)
+    try:
+        max_concurrent = int(max_concurrent)
+    except ValueError:
+        max_concurrent = DEFAULT_MAX_CONCURRENT
+    with _manager_lock:
+        created = _manager is None
+        if created:
+            _manager = DownloadManager(get_file_path("download_queue.json"), max_concurrent)
+            _manager.add_listener(_announce)
+    if created:
+        _manager._schedule()
+    else:
+        _manager.set_max_concurrent(max_concurrent)
+    return _manager
+
+def resume_pending_downloads():
+    """
+    Starts the manager at app startup if the saved queue still has queued or
+    interrupted jobs, so they resume without the Online Player being opened.
+    """
+    try:
+        with open(get_file_path("download_queue.json"), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return
+    pending_statuses = (STATUS_QUEUED, STATUS_DOWNLOADING)
+    if any(isinstance(item, dict) and item.get('status', STATUS_QUEUED) in pending_statuses for item in data if isinstance(data, list)):
+        get_download_manager()
+
+def shutdown_download_manager():
+    """Stops running downloads on app exit. Does nothing if the manager was never used."""
+    with _manager_lock:
+        manager = _manager
+    if manager is not None:
+        manager.shutdown()
+
+def _announce(job):
+    if job is None:
+        return
+    if job.status == STATUS_COMPLETED:
+        wx.CallAfter(speak, f"Download complete: {job.title}", interrupt=False)
+    elif job.status == STATUS_FAILED:
+        wx.CallAfter(speak, f"Download failed: {job.title}", interrupt=False)
+
+def enqueue_download(download_settings):
+    """Adds a download to the queue instead of opening a dialog for it."""
+    job = get_download_manager().enqueue(download_settings)
+    speak(f"Added to downloads: {job.title}")
+    return job
+
+
+class DownloadManagerFrame(wx.Frame):
+    """Lists the download queue with controls to pause, resume, cancel and remove downloads."""
+    REFRESH_INTERVAL_MS = 1000
+
+    def __init__(self, parent, calling_frame_to_show_on_my_close=None):
+        super().__init__(parent, title="Downloads", size=(700, 450), style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER)
+        self.calling_frame_to_show_on_my_close = calling_frame_to_show_on_my_close
+        self.manager = get_download_manager()
+        self.job_ids = []
+
+        panel = wx.Panel(self)
+        vbox = wx.BoxSizer(wx.VERTICAL)
+
+        self.summary_label = wx.StaticText(panel, label="")
+        vbox.Add(self.summary_label, 0, wx.ALL | wx.EXPAND, 5)
+
+        self.jobs_listbox = wx.ListBox(panel)
+        vbox.Add(self.jobs_listbox, 1, wx.ALL | wx.EXPAND, 5)
+
+        button_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        self.pause_button = wx.Button(panel, label="Pause")
+        self.pause_button.Bind(wx.EVT_BUTTON, self.onPauseResume)
+        button_sizer.Add(self.pause_button, 0, wx.ALL, 5)
+
+        cancel_button = wx.Button(panel, label="Cancel Download")
+        cancel_button.Bind(wx.EVT_BUTTON, self.onCancelDownload)
+        button_sizer.Add(cancel_button, 0, wx.ALL, 5)
+
+        remove_button = wx.Button(panel, label="Remove")
+        remove_button.Bind(wx.EVT_BUTTON, self.onRemove)
+        button_sizer.Add(remove_button, 0, wx.ALL, 5)
+
+        clear_button = wx.Button(panel, label="Clear Finished")
+        clear_button.Bind(wx.EVT_BUTTON, self.onClearFinished)
+        button_sizer.Add(clear_button, 0, wx.ALL, 5)
+
+        close_button = wx.Button(panel, wx.ID_CLOSE, label="Close")
+        close_button.Bind(wx.EVT_BUTTON, lambda event: self.Close())
+        button_sizer.Add(close_button, 0, wx.ALL, 5)
+        vbox.Add(button_sizer, 0, wx.ALL | wx.ALIGN_CENTER, 5)
+
+        panel.SetSizer(vbox)
+        self.jobs_listbox.Bind(wx.EVT_LISTBOX, lambda event: self.update_buttons())
+        self.Bind(wx.EVT_CHAR_HOOK, self.onKey)
+        self.Bind(wx.EVT_CLOSE, self.onClose)
+
+        self.timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, lambda event: self.refresh(), self.timer)
+        self.manager.add_listener(self.on_job_changed)
+        self.refresh()
+        if self.job_ids:
+            self.jobs_listbox.SetSelection(0)
+            self.update_buttons()
+        self.timer.Start(self.REFRESH_INTERVAL_MS)
+        self.Centre()
+
+    def on_job_changed(self, job):
+        # Called from download threads.
+        wx.CallAfter(self.refresh)
+
+    def format_job(self, job):
+        text = f"{job.title}, {job.status}"
+        if job.status == STATUS_DOWNLOADING:
+            text += f", {job.percent:.1f}%"
+            if job.size:
+                text += f" of {job.size}"
+            if job.speed:
+                text += f", {format_size(job.speed)}/s, ETA {job.eta}"
+            if job.effective_speed:
+                text += f", effective {format_size(job.effective_speed)}/s"
+        elif job.status == STATUS_PAUSED and job.percent:
+            text += f" at {job.percent:.1f}%"
+        elif job.status == STATUS_FAILED and job.error:
+            text += f": {job.error.splitlines()[-1]}"
+        return text
+
+    def refresh(self):
+        if not self or self.IsBeingDeleted():
+            return
+        jobs = self.manager.get_jobs()
+        selected_id = self.get_selected_job_id()
+        texts = [self.format_job(job) for job in jobs]
+        new_ids = [job.id for job in jobs]
+        if new_ids != self.job_ids:
+            self.jobs_listbox.Set(texts)
+            self.job_ids = new_ids
+            if selected_id in new_ids:
+                self.jobs_listbox.SetSelection(new_ids.index(selected_id))
+            elif new_ids:
+                self.jobs_listbox.SetSelection(0)
+        else:
+            # Only rewrite changed rows, so screen readers are not interrupted every second.
+            for index, text in enumerate(texts):
+                if self.jobs_listbox.GetString(index) != text:
+                    self.jobs_listbox.SetString(index, text)
+
+        downloading = sum(1 for job in jobs if job.status == STATUS_DOWNLOADING)
+        queued = sum(1 for job in jobs if job.status == STATUS_QUEUED)
+        summary = f"{downloading} downloading, {queued} queued"
+        if downloading:
+            summary += f", total speed {format_size(self.manager.get_total_speed())}/s"
+        if self.summary_label.GetLabel() != summary:
+            self.summary_label.SetLabel(summary)
+        self.update_buttons()
+
+    def get_selected_job_id(self):
+        selection = self.jobs_listbox.GetSelection()
+        if selection != wx.NOT_FOUND and selection < len(self.job_ids):
+            return self.job_ids[selection]
+        return None
+
+    def get_selected_job(self):
+        job_id = self.get_selected_job_id()
+        return self.manager.get_job(job_id) if job_id else None
+
+    def update_buttons(self):
+        job = self.get_selected_job()
+        label = "Resume" if job and job.status in (STATUS_PAUSED, STATUS_FAILED) else "Pause"
+        if self.pause_button.GetLabel() != label:
+            self.pause_button.SetLabel(label)
+        self.pause_button.Enable(bool(job) and job.status not in (STATUS_COMPLETED, STATUS_CANCELLED))
+
+    def onPauseResume(self, event):
+        job = self.get_selected_job()
+        if not job:
+            return
+        if job.status in (STATUS_PAUSED, STATUS_FAILED):
+            if self.manager.resume(job.id):
+                speak("Resumed")
+        elif self.manager.pause(job.id):
+            speak("Paused")
+        self.refresh()
+
+    def onCancelDownload(self, event):
+        job = self.get_selected_job()
+        if not job or job.status in FINISHED_STATUSES:
+            return
+        if wx.MessageBox(f"Cancel the download of '{job.title}'?", "Confirm Cancel", wx.YES_NO | wx.ICON_QUESTION, self) == wx.YES:
+            self.manager.cancel(job.id)
+            speak("Download cancelled")
+            self.refresh()
+
+    def onRemove(self, event):
+        job = self.get_selected_job()
+        if not job:
+            return
+        if job.status not in FINISHED_STATUSES:
+            if wx.MessageBox(f"'{job.title}' has not finished downloading. Cancel and remove it?", "Confirm Remove", wx.YES_NO | wx.ICON_QUESTION, self) != wx.YES:
+                return
+        self.manager.remove(job.id)
+        speak("Removed")
+        self.refresh()
+
+    def onClearFinished(self, event):
+        self.manager.clear_finished()
+        self.refresh()
+
+    def onKey(self, event):
+        keycode = event.GetKeyCode()
+        if keycode == wx.WXK_ESCAPE:
+            self.Close()
+        elif keycode == wx.WXK_SPACE and self.jobs_listbox.HasFocus():
+            self.onPauseResume(event)
+        elif keycode == wx.WXK_DELETE and self.jobs_listbox.HasFocus():
+            self.onRemove(event)
+        else:
+            event.Skip()
+
+    def onClose(self, event):
+        self.timer.Stop()
+        self.manager.remove_listener(self.on_job_changed)
+        if self.calling_frame_to_show_on_my_close:
+            try:
+                self.calling_frame_to_show_on_my_close.Show()
+                self.calling_frame_to_show_on_my_close.Raise()
+            except (wx.wxAssertionError, RuntimeError):
+                pass
+        self.Destroy()
@@ -0,0 +1,417 @@
+import os
+import sys
+import copy
+import json
+import threading
+import itertools
+import subprocess
+from concurrent.futures import Future
+from .info_cache import InfoCache, VideoDetailsStore, extract_details
+
+try:
+    import yt_dlp
+except ImportError:
+    yt_dlp = None
+
+
+class ExtractionError(Exception):
+    """Raised when video information could not be extracted. title is suitable for an error dialog."""
+    def __init__(self, message, title="yt-dlp Error"):
+        super().__init__(message)
+        self.title = title
+
+
+def get_yt_dlp_exe_path():
+    """Returns the path of the bundled yt-dlp.exe, whether or not it exists."""
+    if getattr(sys, 'frozen', False):
+        project_root = os.path.dirname(sys.executable)
+    else:
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(project_root, 'yt-dlp.exe')
+
+def build_options(format_selector=None, extra_args=None, is_search=False):
+    """
+    Converts the yt-dlp command-line arguments used by the Online Player into
+    YoutubeDL option names, so every extractor receives the same request.
+
+    Raises:
+        ValueError: If extra_args contains an argument that has no option mapping.
+    """
+    options = {
+        'extract_flat': 'in_playlist' if is_search else False,
+        'noplaylist': not is_search,
+    }
+    if format_selector:
+        options['format'] = format_selector
+    for arg in extra_args or []:
+        if arg in ('--flat-playlist', '--no-playlist'):
+            # Decided by is_search, exactly as the command line version did.
+            continue
+        elif arg == '--write-comments':
+            options['getcomments'] = True
+        elif arg == '--write-subs':
+            options['writesubtitles'] = True
+        elif arg == '--write-auto-subs':
+            options['writeautomaticsub'] = True
+        elif arg == '--no-check-formats':
+            options['check_formats'] = False
+        else:
+            raise ValueError(f"Unsupported yt-dlp argument: {arg}")
+    return options
+
+def options_to_args(options):
+    """The reverse of build_options: returns the yt-dlp.exe arguments for an options dict."""
+    args = []
+    if options.get('format'):
+        args.extend(['-f', options['format']])
+    args.append('--flat-playlist' if options.get('extract_flat') else '--no-playlist')
+    if options.get('getcomments'):
+        args.append('--write-comments')
+    if options.get('writesubtitles'):
+        args.append('--write-subs')
+    if options.get('writeautomaticsub'):
+        args.append('--write-auto-subs')
+    if options.get('check_formats') is False:
+        args.append('--no-check-formats')
+    return args
+
+def playlist_items_range(start=1, end=None):
+    """Returns the --playlist-items value for the 1-based, inclusive range start to end (None for the rest)."""
+    return f"{start}-{end}" if end else f"{start}-"
+
+
+class SubprocessExtractor:
+    """Runs the bundled yt-dlp.exe once per request, the way the player always has."""
+    def __init__(self, exe_path=None):
+        self.exe_path = exe_path or get_yt_dlp_exe_path()
+
+    def extract(self, url, options):
+        if not os.path.exists(self.exe_path):
+            raise ExtractionError(f"Error: yt-dlp.exe not found at expected location:\n{self.exe_path}", "Dependency Error")
+
+        command = [self.exe_path, '--dump-single-json', '--quiet'] + options_to_args(options) + [url]
+        try:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding='utf-8', startupinfo=subprocess.STARTUPINFO(dwFlags=subprocess.STARTF_USESHOWWINDOW, wShowWindow=subprocess.SW_HIDE))
+            stdout, stderr = process.communicate()
+        except FileNotFoundError:
+            print(f"Error: Command not found - {self.exe_path}")
+            raise ExtractionError(f"Error: Could not execute yt-dlp.exe. Ensure it exists at:\n{self.exe_path}", "Execution Error")
+
+        if process.returncode != 0:
+            raise ExtractionError(f"yt-dlp failed with error:\n{stderr}")
+        if not stdout:
+            raise ExtractionError("yt-dlp did not return video information.")
+        try:
+            return json.loads(stdout)
+        except json.JSONDecodeError as json_err:
+            raise ExtractionError(f"Failed to parse video information from yt-dlp.\nError: {json_err}", "Parsing Error")
+
+    def iter_entries(self, url, options, start=1, end=None, is_cancelled=None):
+        """
+        Yields the flat entries of a playlist or search as yt-dlp prints them,
+        one JSON object per line, instead of waiting for the whole document.
+        """
+        if not os.path.exists(self.exe_path):
+            raise ExtractionError(f"Error: yt-dlp.exe not found at expected location:\n{self.exe_path}", "Dependency Error")
+
+        command = [self.exe_path, '--dump-json', '--quiet', '--no-warnings', '--playlist-items', playlist_items_range(start, end)]
+        command += options_to_args(options) + [url]
+        try:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding='utf-8', startupinfo=subprocess.STARTUPINFO(dwFlags=subprocess.STARTF_USESHOWWINDOW, wShowWindow=subprocess.SW_HIDE))
+        except FileNotFoundError:
+            print(f"Error: Command not found - {self.exe_path}")
+            raise ExtractionError(f"Error: Could not execute yt-dlp.exe. Ensure it exists at:\n{self.exe_path}", "Execution Error")
+
+        try:
+            for line in process.stdout:
+                if is_cancelled and is_cancelled():
+                    return
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as json_err:
+                    print(f"Skipping unreadable yt-dlp entry: {json_err}")
+            # With --quiet and --no-warnings, stderr only carries errors, so it cannot fill its pipe first.
+            stderr = process.stderr.read()
+            if process.wait() != 0 and not (is_cancelled and is_cancelled()):
+                raise ExtractionError(f"yt-dlp failed with error:\n{stderr}")
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            process.stderr.close()
+
+
+class LibraryExtractor:
+    """
+    Extracts with the yt_dlp package loaded once into this process.
+
+    YoutubeDL objects are kept in a pool per option set and reused, so the
+    import, option parsing and extractor initialisation are only paid on the
+    first request of each kind. A YoutubeDL object is not thread-safe, so each
+    one serves a single request at a time.
+
+    The bundled yt-dlp.exe is what the Updates menu keeps current, so when the
+    library fails in a way a newer extractor could fix, the request is retried
+    with the executable before giving up. Errors about the video itself, such
+    as it being private or removed, are raised straight away.
+    """
+    BASE_OPTIONS = {
+        'quiet': True,
+        'no_warnings': True,
+        'skip_download': True,
+        'noprogress': True,
+    }
+
+    def __init__(self, fallback=None):
+        if yt_dlp is None:
+            raise RuntimeError("The yt_dlp package is not installed.")
+        self.fallback = fallback
+        self._lock = threading.Lock()
+        self._idle = {}
+
+    @staticmethod
+    def _pool_key(options):
+        return tuple(sorted(options.items()))
+
+    def _acquire(self, options):
+        key = self._pool_key(options)
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return key, idle.pop()
+        params = dict(self.BASE_OPTIONS)
+        params.update(options)
+        return key, yt_dlp.YoutubeDL(params)
+
+    def _release(self, key, ydl):
+        with self._lock:
+            self._idle.setdefault(key, []).append(ydl)
+
+    def _should_fall_back(self, error):
+        """Whether the executable could plausibly succeed where the library failed."""
+        if not self.fallback:
+            return False
+        cause = error
+        if isinstance(error, yt_dlp.utils.DownloadError) and error.exc_info:
+            cause = error.exc_info[1]
+        if isinstance(cause, yt_dlp.utils.UnsupportedError):
+            return True
+        if isinstance(cause, yt_dlp.utils.ExtractorError):
+            # Expected errors are about the video or the network, not the extractor.
+            return not cause.expected
+        # Any other yt-dlp error is not the extractor's fault; anything else is a library bug.
+        return not isinstance(cause, yt_dlp.utils.YoutubeDLError)
+
+    def extract(self, url, options):
+        key, ydl = self._acquire(options)
+        try:
+            info = ydl.extract_info(url, download=False)
+            result = ydl.sanitize_info(info)
+        except Exception as e:
+            if self._should_fall_back(e):
+                return self.fallback.extract(url, options)
+            raise ExtractionError(f"yt-dlp failed with error:\n{e}")
+        self._release(key, ydl)
+        if not result:
+            raise ExtractionError("yt-dlp did not return video information.")
+        return result
+
+    def iter_entries(self, url, options, start=1, end=None, is_cancelled=None):
+        """
+        Yields the flat entries of a playlist or search one at a time. With
+        process=False yt-dlp hands back its lazy entry generator, so each
+        search page is only requested when the entries on it are reached.
+        """
+        key, ydl = self._acquire(options)
+        yielded = False
+        try:
+            try:
+                info = ydl.extract_info(url, download=False, process=False)
+                entries = iter((info or {}).get('entries') or [])
+                entries = itertools.islice(entries, start - 1, end)
+                for entry in entries:
+                    if is_cancelled and is_cancelled():
+                        return
+                    yielded = True
+                    yield ydl.sanitize_info(entry)
+            except ExtractionError:
+                raise
+            except Exception as e:
+                if not yielded and self._should_fall_back(e):
+                    yield from self.fallback.iter_entries(url, options, start, end, is_cancelled)
+                    return
+                raise ExtractionError(f"yt-dlp failed with error:\n{e}")
+        finally:
+            self._release(key, ydl)
+
+    def close(self):
+        with self._lock:
+            pools, self._idle = self._idle, {}
+        for idle in pools.values():
+            for ydl in idle:
+                try:
+                    ydl.close()
+                except Exception:
+                    pass
+
+
+def create_default_extractor():
+    """Uses the in-process library when it is available, otherwise the bundled executable."""
+    fallback = SubprocessExtractor()
+    if yt_dlp is not None:
+        return LibraryExtractor(fallback=fallback)
+    return fallback
+
+
+class ExtractionEngine:
+    """
+    The single entry point the Online Player uses to get video, playlist and
+    search information.
+
+    The actual work is done by an extractor: any object with an
+    extract(url, options) method that returns the info dict and raises
+    ExtractionError on failure. Tests can pass a fake one to the constructor
+    or to set_extractor(). Extractors may also provide
+    iter_entries(url, options, start, end, is_cancelled) to stream search
+    results; see ExtractionEngine.iter_entries.
+
+    Results are kept in an InfoCache keyed by (URL, format selector, extra
+    arguments, search mode). When a VideoDetailsStore is given, the lasting
+    details of every extracted video are also remembered on disk.
+
+    Identical requests made while one is still running wait for its result
+    instead of extracting again, so a background prefetch and the user
+    asking for the same video only cost one extraction.
+    """
+    def __init__(self, extractor=None, cache=None, details_store=None):
+        self._extractor = extractor
+        self._lock = threading.Lock()
+        self.cache = cache if cache is not None else InfoCache()
+        self.details_store = details_store
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+    @property
+    def extractor(self):
+        with self._lock:
+            if self._extractor is None:
+                self._extractor = create_default_extractor()
+            return self._extractor
+
+    def set_extractor(self, extractor):
+        with self._lock:
+            old, self._extractor = self._extractor, extractor
+        if old is not None and hasattr(old, 'close'):
+            old.close()
+
+    def extract(self, url, format_selector=None, extra_args=None, is_search=False):
+        """
+        Returns the info dict for url. Takes the same arguments as run_yt_dlp_json.
+
+        Raises:
+            ExtractionError: If the information could not be extracted.
+        """
+        key = (url, format_selector or None, tuple(extra_args or ()), bool(is_search))
+        info = self.cache.get(key)
+        if info is not None:
+            return info
+
+        with self._inflight_lock:
+            pending = self._inflight.get(key)
+            is_owner = pending is None
+            if is_owner:
+                pending = self._inflight[key] = Future()
+        if not is_owner:
+            return copy.deepcopy(pending.result())
+
+        try:
+            info = self._extract_uncached(url, format_selector, extra_args, is_search)
+            self.cache.put(key, info)
+            pending.set_result(info)
+            return copy.deepcopy(info)
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def _extract_uncached(self, url, format_selector, extra_args, is_search):
+        try:
+            options = build_options(format_selector, extra_args, is_search)
+        except ValueError as e:
+            raise ExtractionError(str(e), "Error")
+        info = self.extractor.extract(url, options)
+        if self.details_store is not None and not is_search:
+            details = extract_details(info)
+            if details:
+                self.details_store.put(url, details)
+        return info
+
+    def iter_entries(self, url, start=1, end=None, is_cancelled=None):
+        """
+        Yields the flat entries of a search or playlist URL as soon as each is
+        extracted. start and end are 1-based and inclusive; end=None reads to
+        the last entry. Iteration stops early once is_cancelled() returns True.
+        Entries are not cached, since a stream is usually only read once.
+
+        Raises:
+            ExtractionError: If the entries could not be extracted.
+        """
+        options = build_options(is_search=True)
+        extractor = self.extractor
+        if hasattr(extractor, 'iter_entries'):
+            yield from extractor.iter_entries(url, options, start, end, is_cancelled)
+            return
+        # Extractors without streaming support still work, just all at once.
+        info = extractor.extract(url, options)
+        for entry in itertools.islice(info.get('entries') or [], start - 1, end):
+            if is_cancelled and is_cancelled():
+                return
+            yield entry
+
+    def get_video_details(self, url):
+        """
+        Returns what is already known about a video without extracting it:
+        its cached info dict, or the details remembered on disk. None if neither exists.
+        """
+        info = self.cache.find(url)
+        if info is not None and info.get('_type') not in ('playlist', 'multi_video'):
+            return info
+        if self.details_store is not None:
+            return self.details_store.get(url)
+        return None
+
+    def close(self):
+        self.set_extractor(None)
+        self.cache.clear()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    """Returns the process-wide ExtractionEngine, creating it on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = ExtractionEngine(details_store=_create_details_store())
+        return _engine
+
+def shutdown_engine():
+    """Writes pending video details on app exit. Does nothing if the engine was never used."""
+    with _engine_lock:
+        engine = _engine
+    if engine is not None and engine.details_store is not None:
+        engine.details_store.flush()
+
+def _create_details_store():
+    from gui.settings import load_app_config, get_file_path
+    remember = load_app_config().get('YouTube', {}).get('remember_video_details', 'True')
+    if str(remember).lower() != 'true':
+        return None
+    return VideoDetailsStore(get_file_path("video_details.json"))
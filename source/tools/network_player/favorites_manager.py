@@ -5,8 +5,10 @@ import app_vars
 import threading
 from speech import speak
 from .youtube_player import YoutubePlayer, EVT_VLC_READY
-from .download_dialogs import DownloadSettingsDialog, DownloadDialog
+from .download_dialogs import DownloadSettingsDialog
+from .download_manager import enqueue_download
 from .utils import run_yt_dlp_json
+from .extraction_engine import get_engine
 from gui.dialogs import DescriptionDialog
 from configobj import ConfigObj
 
@@ -429,10 +431,8 @@ class FavoritesFrame(wx.Frame):
         self.start_download_process(download_settings)
 
     def start_download_process(self, download_settings):
-        """Starts the DownloadDialog with the collected settings."""
-        dlg_title = f"Downloading: {download_settings['filename']}"
-        download_dlg = DownloadDialog(self, dlg_title, download_settings)
-        download_dlg.download_task()
+        """Adds the download to the download queue with the collected settings."""
+        enqueue_download(download_settings)
 
     def onRemoveFromFavorites(self, event):
         selected_item = self.get_selected_video_info()
@@ -566,7 +566,7 @@ class FavoritesFrame(wx.Frame):
         description = None
         error_message = None
         try:
-            info_dict = run_yt_dlp_json(video_url)
+            info_dict = get_engine().get_video_details(video_url) or run_yt_dlp_json(video_url)
             if info_dict:
                 description = info_dict.get('description', 'No description available.')
             else:
@@ -0,0 +1,203 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse, parse_qs
+
+# How long an info dict without expiring stream URLs stays valid, in seconds.
+DEFAULT_TTL = 30 * 60
+# Stream URLs are dropped this many seconds before the expiry they carry.
+EXPIRY_MARGIN = 5 * 60
+# Upper bound for the serialized size of all cached info dicts.
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+# Number of videos whose details are remembered on disk.
+MAX_STORED_DETAILS = 500
+# Seconds a change to the stored details waits before it is written, so a burst of extractions is saved once.
+DETAILS_SAVE_DELAY = 5
+
+
+def get_url_expiry(url):
+    """Returns the expire timestamp carried by a googlevideo style URL, or None."""
+    if not url or 'expire' not in url:
+        return None
+    parsed = urlparse(url)
+    values = parse_qs(parsed.query).get('expire')
+    if not values and '/expire/' in parsed.path:
+        # Some manifest URLs carry their parameters as path segments.
+        parts = parsed.path.split('/')
+        index = parts.index('expire')
+        values = parts[index + 1:index + 2]
+    try:
+        return int(values[0]) if values else None
+    except ValueError:
+        return None
+
+def get_info_expiry(info):
+    """Returns the earliest expiry of any stream URL in an info dict, or None if none expire."""
+    urls = [info.get('url'), info.get('manifest_url')]
+    for key in ('requested_formats', 'formats'):
+        urls.extend(f.get('url') for f in info.get(key) or [])
+    expiries = [e for e in (get_url_expiry(u) for u in urls) if e]
+    return min(expiries) if expiries else None
+
+def extract_details(info):
+    """
+    Returns the parts of a single video's info dict that stay valid between
+    sessions: title, description, duration, uploader and the subtitle languages.
+    Returns None for playlists and search results.
+    """
+    if not info or info.get('_type') in ('playlist', 'multi_video'):
+        return None
+
+    def languages(tracks):
+        # Same shape as the info dict, minus the expiring track URLs.
+        return {code: [{'name': entries[0].get('name', code)}] for code, entries in (tracks or {}).items() if entries}
+
+    return {
+        'title': info.get('title'),
+        'description': info.get('description'),
+        'duration': info.get('duration'),
+        'uploader': info.get('uploader'),
+        'channel_url': info.get('channel_url'),
+        'subtitles': languages(info.get('subtitles')),
+        'automatic_captions': languages(info.get('automatic_captions')),
+    }
+
+
+class InfoCache:
+    """
+    An in-memory LRU cache of yt-dlp info dicts.
+
+    Entries are stored serialized, which both gives their size for the memory
+    cap and hands every caller its own copy. An entry expires after
+    DEFAULT_TTL, or earlier if it contains stream URLs that expire sooner.
+    All methods are thread-safe.
+    """
+    def __init__(self, max_bytes=MAX_CACHE_BYTES, default_ttl=DEFAULT_TTL):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            text, expires_at = entry
+            if time.time() >= expires_at:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+        return json.loads(text)
+
+    def put(self, key, info):
+        expires_at = time.time() + self.default_ttl
+        stream_expiry = get_info_expiry(info)
+        if stream_expiry:
+            expires_at = min(expires_at, stream_expiry - EXPIRY_MARGIN)
+        if expires_at <= time.time():
+            return
+        text = json.dumps(info)
+        if len(text) > self.max_bytes // 4:
+            # A single huge entry (long comment threads) would flush everything else.
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (text, expires_at)
+            self._size += len(text)
+            while self._size > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+
+    def find(self, url):
+        """Returns any unexpired info dict cached for url, regardless of the other key parts."""
+        with self._lock:
+            keys = [key for key in reversed(self._entries) if key[0] == url]
+        for key in keys:
+            info = self.get(key)
+            if info is not None:
+                return info
+        return None
+
+    def _remove(self, key):
+        text, _ = self._entries.pop(key)
+        self._size -= len(text)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+class VideoDetailsStore:
+    """
+    Remembers the lasting details of recently viewed videos on disk (see
+    extract_details), so descriptions and subtitle languages are available
+    in later sessions without asking YouTube again.
+
+    put() only updates memory; the file is written on a timer
+    DETAILS_SAVE_DELAY seconds later, off the extraction thread, or by
+    flush() on shutdown.
+    """
+    def __init__(self, path, max_entries=MAX_STORED_DETAILS):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._dirty = False
+        self._save_timer = None
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._entries = OrderedDict(data) if isinstance(data, dict) else OrderedDict()
+        except (OSError, ValueError):
+            self._entries = OrderedDict()
+
+    def get(self, url):
+        with self._lock:
+            details = self._entries.get(url)
+            return dict(details) if details else None
+
+    def put(self, url, details):
+        with self._lock:
+            if self._entries.get(url) == details:
+                return
+            self._entries[url] = details
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(DETAILS_SAVE_DELAY, self.save)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def save(self):
+        # The snapshot is taken under the save lock, so an older one is never written after a newer one.
+        with self._save_lock:
+            with self._lock:
+                if self._save_timer:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                data = dict(self._entries)
+            temp_path = self.path + ".tmp"
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                print(f"Could not save video details: {e}")
+
+    def flush(self):
+        """Writes pending changes now, for example on app exit."""
+        self.save()
@@ -0,0 +1,306 @@
+import os
+import json
+import hashlib
+import threading
+import subprocess
+from collections import OrderedDict
+from gui.settings import load_app_config, get_file_path
+from process_pump import ProcessOutputPump
+from .download_dialogs import parse_video_id, get_performance_args
+from .download_manager import get_tool_paths
+
+DEFAULT_MAX_SIZE_MB = 1024
+INDEX_FILENAME = "index.json"
+# Suffixes of files yt-dlp leaves behind while a fetch is still running.
+PARTIAL_SUFFIXES = ('.part', '.ytdl', '.temp')
+# Seconds a change in recency waits before the index is saved.
+RECENCY_SAVE_DELAY = 60
+
+
+def get_cache_key(page_url, format_selector):
+    """
+    Returns the cache key for a video played with a format selector: the
+    YouTube video id, or a hash of the page URL for other sites, followed by
+    a short hash of the selector, since audio and each video quality are
+    cached separately.
+    """
+    video_id = parse_video_id(page_url) or hashlib.sha1(page_url.encode('utf-8')).hexdigest()[:16]
+    format_hash = hashlib.sha1(format_selector.encode('utf-8')).hexdigest()[:8]
+    return f"{video_id}-{format_hash}"
+
+def get_media_cache_settings(youtube_settings=None):
+    """Returns (enabled, max_size_mb) from the YouTube settings."""
+    if youtube_settings is None:
+        youtube_settings = load_app_config().get('YouTube', {})
+    enabled = str(youtube_settings.get('media_cache_enabled', 'False')).lower() == 'true'
+    try:
+        max_size_mb = max(1, int(youtube_settings.get('media_cache_size_mb', DEFAULT_MAX_SIZE_MB)))
+    except (TypeError, ValueError):
+        max_size_mb = DEFAULT_MAX_SIZE_MB
+    return enabled, max_size_mb
+
+
+class MediaCache:
+    """
+    An on-disk LRU cache of played audio and video, so replays, seeks and
+    saved selections read local files instead of streaming again.
+
+    While a video plays, fetch() downloads the same format with yt-dlp in the
+    background. Only the media being played is worth fetching, so starting a
+    fetch stops any other one that is still running. When the total size
+    goes over max_bytes the least recently used files are deleted; a file
+    that cannot be deleted because it is open is skipped and tried again
+    next time. The index of cached files is saved next to them whenever a
+    file is added or removed. Lookups only change the order of recency,
+    which is saved a while later, or on shutdown, instead of on every read.
+    """
+    def __init__(self, directory, max_bytes, enabled=True, yt_dlp_exe_path=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.yt_dlp_exe_path = yt_dlp_exe_path or get_tool_paths()[0]
+        self.index_path = os.path.join(directory, INDEX_FILENAME)
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        # key -> {'file': name, 'size': bytes}, least recently used first.
+        self._entries = OrderedDict()
+        self._fetches = {}
+        self._recency_dirty = False
+        self._save_timer = None
+        os.makedirs(directory, exist_ok=True)
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = []
+        entries = OrderedDict()
+        for key, entry in data if isinstance(data, list) else []:
+            if os.path.isfile(os.path.join(self.directory, entry.get('file', ''))):
+                entries[key] = entry
+        with self._lock:
+            self._entries = entries
+        known_files = {entry['file'] for entry in entries.values()}
+        # Remove what interrupted fetches and lost index entries left behind.
+        for name in os.listdir(self.directory):
+            if name != INDEX_FILENAME and name not in known_files:
+                self._delete_file(name)
+
+    def save(self):
+        with self._lock:
+            data = list(self._entries.items())
+            self._recency_dirty = False
+            if self._save_timer:
+                self._save_timer.cancel()
+                self._save_timer = None
+        temp_path = self.index_path + ".tmp"
+        with self._save_lock:
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                os.replace(temp_path, self.index_path)
+            except OSError as e:
+                print(f"Could not save media cache index: {e}")
+
+    def get_path(self, page_url, format_selector):
+        """Returns the local file cached for page_url and format_selector, or None, and marks it as recently used."""
+        key = get_cache_key(page_url, format_selector)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            path = os.path.join(self.directory, entry['file'])
+            removed = not os.path.isfile(path)
+            if removed:
+                del self._entries[key]
+                path = None
+            else:
+                self._entries.move_to_end(key)
+                self._schedule_recency_save()
+        if removed:
+            self.save()
+        return path
+
+    def _schedule_recency_save(self):
+        """Saves the new order of recency after RECENCY_SAVE_DELAY seconds. Called with the lock held."""
+        self._recency_dirty = True
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(RECENCY_SAVE_DELAY, self.save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self):
+        """Saves the index if lookups changed the order of recency since the last save."""
+        with self._lock:
+            dirty = self._recency_dirty
+        if dirty:
+            self.save()
+
+    def fetch(self, page_url, format_selector, on_complete=None):
+        """
+        Starts downloading page_url in format_selector into the cache, unless
+        it is cached or already being fetched. on_complete(path) is called
+        from the fetch thread when the file is ready. Returns True if a fetch
+        was started.
+        """
+        key = get_cache_key(page_url, format_selector)
+        with self._lock:
+            if key in self._entries or key in self._fetches:
+                return False
+            others = [self._fetches.pop(other) for other in list(self._fetches)]
+            self._fetches[key] = None
+        for process in others:
+            self._stop_process(process)
+        threading.Thread(target=self._fetch, args=(key, page_url, format_selector, on_complete), daemon=True).start()
+        return True
+
+    def _fetch(self, key, page_url, format_selector, on_complete):
+        cmd = [
+            self.yt_dlp_exe_path, page_url,
+            '-f', format_selector,
+            '--no-playlist',
+            '--match-filter', '!is_live',
+            '--quiet', '--no-warnings',
+            '-o', os.path.join(self.directory, f"{key}.%(ext)s"),
+        ]
+        cmd.extend(get_performance_args())
+        path = None
+        try:
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            startupinfo.wShowWindow = subprocess.SW_HIDE
+            process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, encoding='utf-8', errors='replace', startupinfo=startupinfo)
+            with self._lock:
+                cancelled = key not in self._fetches
+                if not cancelled:
+                    self._fetches[key] = process
+            if cancelled:
+                self._stop_process(process)
+            pump = ProcessOutputPump(process).start()
+            return_code = process.wait()
+            pump.wait()
+            with self._lock:
+                cancelled = key not in self._fetches
+            if return_code == 0 and not cancelled:
+                path = self._add(key)
+            elif not cancelled:
+                print(f"Could not cache {page_url}: {' '.join(pump.error_lines[-3:]) or f'exit code {return_code}'}")
+        except Exception as e:
+            print(f"Could not cache {page_url}: {e}")
+        finally:
+            with self._lock:
+                self._fetches.pop(key, None)
+            if path is None:
+                self._remove_files(key)
+        if path and on_complete:
+            on_complete(path)
+
+    def _add(self, key):
+        """Records the finished file for key and evicts old entries. Returns its path, or None if nothing was written."""
+        names = [name for name in os.listdir(self.directory)
+                 if name.startswith(key + '.') and not name.endswith(PARTIAL_SUFFIXES)]
+        if not names:
+            # The match filter skipped a live stream.
+            return None
+        name = names[0]
+        size = os.path.getsize(os.path.join(self.directory, name))
+        with self._lock:
+            self._entries[key] = {'file': name, 'size': size}
+            self._evict()
+            kept = key in self._entries
+        self.save()
+        return os.path.join(self.directory, name) if kept else None
+
+    def _evict(self):
+        """
+        Deletes least recently used files until the cache fits in max_bytes.
+        Called with the lock held. Returns True if any entry was removed.
+        """
+        total = sum(entry['size'] for entry in self._entries.values())
+        removed = False
+        for key in list(self._entries):
+            if total <= self.max_bytes:
+                break
+            entry = self._entries[key]
+            if self._delete_file(entry['file']):
+                del self._entries[key]
+                total -= entry['size']
+                removed = True
+        return removed
+
+    def _delete_file(self, name):
+        try:
+            os.remove(os.path.join(self.directory, name))
+            return True
+        except FileNotFoundError:
+            return True
+        except OSError:
+            # Still open, usually by a player; it is deleted on a later eviction.
+            return False
+
+    def _remove_files(self, key):
+        for name in os.listdir(self.directory):
+            if name.startswith(key + '.'):
+                self._delete_file(name)
+
+    def _stop_process(self, process):
+        if process and process.poll() is None:
+            try:
+                process.terminate()
+            except Exception as e:
+                print(f"Error stopping media cache fetch: {e}")
+
+    def set_limits(self, enabled, max_bytes):
+        with self._lock:
+            if enabled == self.enabled and max_bytes == self.max_bytes:
+                return
+            self.enabled = enabled
+            self.max_bytes = max_bytes
+            removed = self._evict()
+        if removed:
+            self.save()
+
+    def get_usage(self):
+        """Returns (number of cached files, total size in bytes)."""
+        with self._lock:
+            return len(self._entries), sum(entry['size'] for entry in self._entries.values())
+
+    def clear(self):
+        """Stops running fetches and deletes every cached file that is not in use."""
+        self.cancel_fetches()
+        with self._lock:
+            for key in list(self._entries):
+                if self._delete_file(self._entries[key]['file']):
+                    del self._entries[key]
+        self.save()
+
+    def cancel_fetches(self):
+        with self._lock:
+            processes = list(self._fetches.values())
+            self._fetches.clear()
+        for process in processes:
+            self._stop_process(process)
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_media_cache():
+    """Returns the process-wide MediaCache, applying the current cache settings."""
+    global _cache
+    enabled, max_size_mb = get_media_cache_settings()
+    with _cache_lock:
+        if _cache is None:
+            _cache = MediaCache(get_file_path("media_cache"), max_size_mb * 1024 * 1024, enabled=enabled)
+            return _cache
+    _cache.set_limits(enabled, max_size_mb * 1024 * 1024)
+    return _cache
+
+def shutdown_media_cache():
+    """Stops background fetches and saves pending recency on app exit. Does nothing if the cache was never used."""
+    with _cache_lock:
+        cache = _cache
+    if cache is not None:
+        cache.cancel_fetches()
+        cache.flush()
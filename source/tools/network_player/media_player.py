@@ -2,6 +2,7 @@ import wx
 from wx.lib.newevent import NewEvent
 from gui.custom_controls import CustomButton
 import vlc
+from vlc_engine import get_vlc_engine
 import sys
 import threading
 from speech import speak
@@ -15,7 +16,7 @@ class DirectLinkPlayer(wx.Frame):
         super().__init__(parent, title=title, size=(640, 480))
         self.panel = wx.Panel(self)
         self.url = url
-        self.instance = None
+        self.vlc_engine = None
         self.player = None
         self.loading_dialog = None
 
@@ -58,9 +59,13 @@ class DirectLinkPlayer(wx.Frame):
 
 
     def init_vlc_thread(self):
-        self.instance = vlc.Instance()
-        self.player = self.instance.media_player_new()
-        media = self.instance.media_new(self.url)
+        try:
+            self.vlc_engine = get_vlc_engine()
+        except RuntimeError:
+            wx.CallAfter(wx.MessageBox, "Failed to initialize the media player.", "Player error", wx.OK | wx.ICON_ERROR)
+            return
+        self.player = self.vlc_engine.new_player()
+        media = self.vlc_engine.new_media(self.url)
         self.player.set_media(media)
 
         if sys.platform == "win32":
@@ -179,9 +184,7 @@ class DirectLinkPlayer(wx.Frame):
 
     def OnClose(self, event):
         if self.player:
-            self.player.stop()
-            self.player.release()
-            self.instance.release()
+            self.vlc_engine.release_player(self.player)
             self.player = None
         if self.loading_dialog: #Close the dialog if it still exists.
             self.loading_dialog.Destroy()
@@ -6,7 +6,8 @@ from .media_player import DirectLinkPlayer, EVT_VLC_READY
 from .youtube_search import YoutubeSearchDialog
 from .youtube_streamer import YoutubeStreamer
 from .favorites_manager import FavoritesFrame
-from .download_dialogs import DownloadSettingsDialog, DownloadDialog
+from .download_dialogs import DownloadSettingsDialog
+from .download_manager import enqueue_download, get_download_manager, DownloadManagerFrame
 from .utils import run_yt_dlp_json
 from .youtube_player import YoutubePlayer
 
@@ -42,11 +43,17 @@ class NetworkPlayerFrame(wx.Frame):
         favorites_button.Bind(wx.EVT_BUTTON, self.on_open_favorites)
         vbox.Add(favorites_button, 0, wx.ALL | wx.CENTER, 10)
 
+        downloads_button = wx.Button(panel, label="Downloads")
+        downloads_button.Bind(wx.EVT_BUTTON, self.on_open_downloads)
+        vbox.Add(downloads_button, 0, wx.ALL | wx.CENTER, 10)
+
         panel.SetSizer(vbox)
         self.Centre()
         self.Show(True)
         # Check clipboard after the frame is initialized and shown
         wx.CallAfter(self.check_clipboard)
+        # Resumes downloads that were queued or running when the app last closed.
+        wx.CallAfter(get_download_manager)
 
 
     def _is_youtube_video_link(self, text_to_check):
@@ -109,10 +116,7 @@ class NetworkPlayerFrame(wx.Frame):
                 elif result == download_id:
                     settings_dialog = DownloadSettingsDialog(self, "Download Settings", "Youtube video", youtube_url)
                     if settings_dialog.ShowModal() == wx.ID_OK:
-                        download_settings = settings_dialog.settings
-                        dlg_title = f"Downloading: {download_settings['filename']}"
-                        download_dlg = DownloadDialog(self, dlg_title, download_settings)
-                        download_dlg.download_task()
+                        enqueue_download(settings_dialog.settings)
                     settings_dialog.Destroy()
 
     def _fetch_and_prepare_clipboard_play(self, youtube_url):
@@ -187,6 +191,13 @@ class NetworkPlayerFrame(wx.Frame):
         self.access_hub_instance.add_child_frame(favorites_frame)
         favorites_frame.Show()
 
+    def on_open_downloads(self, event):
+        """Opens the download queue window."""
+        self.Hide()
+        downloads_frame = DownloadManagerFrame(self.access_hub_instance, calling_frame_to_show_on_my_close=self)
+        self.access_hub_instance.add_child_frame(downloads_frame)
+        downloads_frame.Show()
+
     def play_video(self, link):
         self.player = DirectLinkPlayer(self, "Direct link Player", link)
         self.player.Bind(EVT_VLC_READY, self.player.onVlcReady)
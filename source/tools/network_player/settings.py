@@ -3,6 +3,8 @@ from gui.settings import SettingsPanel
 from speech import speak
 import os
 import app_vars
+from .download_dialogs import DOWNLOAD_PROFILES, CUSTOM_PROFILE, get_download_performance_settings, format_size
+from .media_cache import get_media_cache, get_media_cache_settings
 
 class YoutubeSettings(SettingsPanel):
     category_name = "YouTube"
@@ -52,6 +54,12 @@ class YoutubeSettings(SettingsPanel):
         playback_sizer.Add(self.post_playback_combo, 0, wx.ALL | wx.EXPAND, 5)
         self.post_playback_combo.Bind(wx.EVT_COMBOBOX, self.on_setting_change)
 
+        prefetch_label = wx.StaticText(self, label="Next videos to prepare in the background (0 to disable):")
+        self.prefetch_spin = wx.SpinCtrl(self, min=0, max=5, initial=2)
+        playback_sizer.Add(prefetch_label, 0, wx.ALL | wx.EXPAND, 5)
+        playback_sizer.Add(self.prefetch_spin, 0, wx.ALL | wx.EXPAND, 5)
+        self.prefetch_spin.Bind(wx.EVT_SPINCTRL, self.on_setting_change)
+
         update_channel_label = wx.StaticText(self, label="yt-dlp Update Channel:")
         self.update_channel_combo = wx.ComboBox(self, choices=["stable", "nightly", "master"], style=wx.CB_READONLY)
         self.update_channel_combo.SetValue("stable")
@@ -59,6 +67,10 @@ class YoutubeSettings(SettingsPanel):
         playback_sizer.Add(self.update_channel_combo, 0, wx.ALL | wx.EXPAND, 5)
         self.update_channel_combo.Bind(wx.EVT_COMBOBOX, self.on_setting_change)
 
+        self.remember_details_checkbox = wx.CheckBox(self, label="Remember video descriptions and subtitle languages between sessions")
+        playback_sizer.Add(self.remember_details_checkbox, 0, wx.ALL, 5)
+        self.remember_details_checkbox.Bind(wx.EVT_CHECKBOX, self.on_setting_change)
+
         self.sizer.Add(playback_sizer, 0, wx.EXPAND | wx.ALL, 5)
         self.sizer.AddSpacer(15)
 
@@ -105,6 +117,42 @@ class YoutubeSettings(SettingsPanel):
         default_download_sizer.Add(reset_default_dir_button, 0, wx.ALL | wx.ALIGN_LEFT, 5)
         reset_default_dir_button.Bind(wx.EVT_BUTTON, self.on_reset_default_directory)
 
+        max_downloads_label = wx.StaticText(self, label="Downloads to run at the same time:")
+        self.max_downloads_spin = wx.SpinCtrl(self, min=1, max=5, initial=2)
+        default_download_sizer.Add(max_downloads_label, 0, wx.ALL | wx.EXPAND, 5)
+        default_download_sizer.Add(self.max_downloads_spin, 0, wx.ALL | wx.EXPAND, 5)
+        self.max_downloads_spin.Bind(wx.EVT_SPINCTRL, self.on_setting_change)
+
+        profile_label = wx.StaticText(self, label="Download performance profile:")
+        self.download_profile_combo = wx.ComboBox(self, choices=list(DOWNLOAD_PROFILES) + [CUSTOM_PROFILE], style=wx.CB_READONLY)
+        default_download_sizer.Add(profile_label, 0, wx.ALL | wx.EXPAND, 5)
+        default_download_sizer.Add(self.download_profile_combo, 0, wx.ALL | wx.EXPAND, 5)
+        self.download_profile_combo.Bind(wx.EVT_COMBOBOX, self.on_download_profile_change)
+
+        fragments_label = wx.StaticText(self, label="Fragments to download at the same time:")
+        self.fragments_spin = wx.SpinCtrl(self, min=1, max=16, initial=1)
+        default_download_sizer.Add(fragments_label, 0, wx.ALL | wx.EXPAND, 5)
+        default_download_sizer.Add(self.fragments_spin, 0, wx.ALL | wx.EXPAND, 5)
+        self.fragments_spin.Bind(wx.EVT_SPINCTRL, self.on_performance_setting_change)
+
+        chunk_size_label = wx.StaticText(self, label="HTTP chunk size (for example 10M, empty for none):")
+        self.chunk_size_text = wx.TextCtrl(self)
+        default_download_sizer.Add(chunk_size_label, 0, wx.ALL | wx.EXPAND, 5)
+        default_download_sizer.Add(self.chunk_size_text, 0, wx.ALL | wx.EXPAND, 5)
+        self.chunk_size_text.Bind(wx.EVT_TEXT, self.on_performance_setting_change)
+
+        rate_limit_label = wx.StaticText(self, label="Maximum download speed per download (for example 2M, empty for unlimited):")
+        self.rate_limit_text = wx.TextCtrl(self)
+        default_download_sizer.Add(rate_limit_label, 0, wx.ALL | wx.EXPAND, 5)
+        default_download_sizer.Add(self.rate_limit_text, 0, wx.ALL | wx.EXPAND, 5)
+        self.rate_limit_text.Bind(wx.EVT_TEXT, self.on_performance_setting_change)
+
+        downloader_label = wx.StaticText(self, label="External downloader:")
+        self.downloader_combo = wx.ComboBox(self, choices=["None", "aria2c"], style=wx.CB_READONLY)
+        default_download_sizer.Add(downloader_label, 0, wx.ALL | wx.EXPAND, 5)
+        default_download_sizer.Add(self.downloader_combo, 0, wx.ALL | wx.EXPAND, 5)
+        self.downloader_combo.Bind(wx.EVT_COMBOBOX, self.on_performance_setting_change)
+
         self.sizer.Add(default_download_sizer, 0, wx.EXPAND | wx.ALL, 5)
         self.sizer.AddStretchSpacer(1)
 
@@ -126,7 +174,10 @@ class YoutubeSettings(SettingsPanel):
             self.post_playback_combo.SetValue(post_playback_action)
         else:
             self.post_playback_combo.SetValue("Close player")
+        self.prefetch_spin.SetValue(int(youtube_settings.get('prefetch_depth', 2)))
         self.update_channel_combo.SetValue(youtube_settings.get('yt_dlp_update_channel', "stable"))
+        remember_details = youtube_settings.get('remember_video_details', 'True')
+        self.remember_details_checkbox.SetValue(str(remember_details).lower() == 'true')
         default_type = youtube_settings.get('default_download_type', 'Video')
         if default_type in self.default_type_combo.GetItems():
              self.default_type_combo.SetValue(default_type)
@@ -135,6 +186,12 @@ class YoutubeSettings(SettingsPanel):
         self.default_video_quality_combo.SetValue(youtube_settings.get('default_video_quality', "Medium"))
         self.default_audio_format_combo.SetValue(youtube_settings.get('default_audio_format', "mp3"))
         self.default_audio_quality_combo.SetValue(youtube_settings.get('default_audio_quality', "128K"))
+        self.max_downloads_spin.SetValue(int(youtube_settings.get('max_concurrent_downloads', 2)))
+        profile = youtube_settings.get('download_profile', "Default")
+        if profile not in self.download_profile_combo.GetItems():
+            profile = "Default"
+        self.download_profile_combo.SetValue(profile)
+        self.show_performance_settings(get_download_performance_settings(youtube_settings))
         default_dir = youtube_settings.get('default_download_directory', '')
         if default_dir and os.path.isdir(default_dir):
             self.default_directory_text.SetValue(default_dir)
@@ -151,16 +208,44 @@ class YoutubeSettings(SettingsPanel):
         self.config['YouTube']['video_quality'] = self.quality_combo.GetValue()
         self.config['YouTube']['search_results_count'] = self.search_results_combo.GetValue()
         self.config['YouTube']['post_playback_action'] = self.post_playback_combo.GetValue()
+        self.config['YouTube']['prefetch_depth'] = self.prefetch_spin.GetValue()
         self.config['YouTube']['yt_dlp_update_channel'] = self.update_channel_combo.GetValue()
+        self.config['YouTube']['remember_video_details'] = self.remember_details_checkbox.GetValue()
         self.config['YouTube']['default_download_type'] = self.default_type_combo.GetValue()
         self.config['YouTube']['default_video_quality'] = self.default_video_quality_combo.GetValue()
         self.config['YouTube']['default_audio_format'] = self.default_audio_format_combo.GetValue()
         self.config['YouTube']['default_audio_quality'] = self.default_audio_quality_combo.GetValue()
         self.config['YouTube']['default_download_directory'] = self.default_directory_text.GetValue()
+        self.config['YouTube']['max_concurrent_downloads'] = self.max_downloads_spin.GetValue()
+        self.config['YouTube']['download_profile'] = self.download_profile_combo.GetValue()
+        self.config['YouTube']['concurrent_fragments'] = self.fragments_spin.GetValue()
+        self.config['YouTube']['http_chunk_size'] = self.chunk_size_text.GetValue().strip()
+        self.config['YouTube']['download_rate_limit'] = self.rate_limit_text.GetValue().strip()
+        self.config['YouTube']['external_downloader'] = self.downloader_combo.GetValue()
 
     def on_setting_change(self, event):
         self.save_settings()
 
+    def show_performance_settings(self, performance_settings):
+        """Fills the performance controls without marking the profile as custom."""
+        self.fragments_spin.SetValue(int(performance_settings.get('concurrent_fragments', 1)))
+        self.chunk_size_text.ChangeValue(str(performance_settings.get('http_chunk_size', '')))
+        self.rate_limit_text.ChangeValue(str(performance_settings.get('download_rate_limit', '')))
+        downloader = performance_settings.get('external_downloader', 'None')
+        self.downloader_combo.SetValue(downloader if downloader in self.downloader_combo.GetItems() else "None")
+
+    def on_download_profile_change(self, event):
+        profile = self.download_profile_combo.GetValue()
+        if profile in DOWNLOAD_PROFILES:
+            self.show_performance_settings(DOWNLOAD_PROFILES[profile])
+        self.on_setting_change(event)
+
+    def on_performance_setting_change(self, event):
+        # Changing any individual value turns the selected profile into a custom one.
+        if self.download_profile_combo.GetValue() != CUSTOM_PROFILE:
+            self.download_profile_combo.SetValue(CUSTOM_PROFILE)
+        self.on_setting_change(event)
+
     def on_default_type_change(self, event):
         """Handles change in default download type radio box."""
         selected_type = self.default_type_combo.GetValue()
@@ -244,3 +329,60 @@ class YoutubeSettings(SettingsPanel):
                     except Exception:
                          default_dir = downloads_base_dir if downloads_base_dir and os.path.exists(downloads_base_dir) else os.path.expanduser("~")
         self.default_directory_text.SetValue(default_dir)
+
+
+class MediaCacheSettings(SettingsPanel):
+    category_name = "Media Cache"
+
+    def create_controls(self):
+        cache_sizer = wx.BoxSizer(wx.VERTICAL)
+        self.cache_enabled_checkbox = wx.CheckBox(self, label="Keep played videos on disk so replays, seeks and saved selections do not stream them again")
+        cache_sizer.Add(self.cache_enabled_checkbox, 0, wx.ALL, 5)
+        self.cache_enabled_checkbox.Bind(wx.EVT_CHECKBOX, self.on_setting_change)
+
+        size_label = wx.StaticText(self, label="Maximum cache size (MB):")
+        self.cache_size_spin = wx.SpinCtrl(self, min=100, max=102400, initial=1024)
+        cache_sizer.Add(size_label, 0, wx.ALL | wx.EXPAND, 5)
+        cache_sizer.Add(self.cache_size_spin, 0, wx.ALL | wx.EXPAND, 5)
+        self.cache_size_spin.Bind(wx.EVT_SPINCTRL, self.on_setting_change)
+
+        usage_label = wx.StaticText(self, label="Cache usage:")
+        self.usage_text = wx.TextCtrl(self, style=wx.TE_READONLY)
+        cache_sizer.Add(usage_label, 0, wx.ALL | wx.EXPAND, 5)
+        cache_sizer.Add(self.usage_text, 0, wx.ALL | wx.EXPAND, 5)
+
+        clear_button = wx.Button(self, label="Clear Cache")
+        cache_sizer.Add(clear_button, 0, wx.ALL | wx.ALIGN_LEFT, 5)
+        clear_button.Bind(wx.EVT_BUTTON, self.on_clear_cache)
+
+        self.sizer.Add(cache_sizer, 0, wx.EXPAND | wx.ALL, 5)
+        self.sizer.AddStretchSpacer(1)
+
+    def load_settings(self):
+        enabled, max_size_mb = get_media_cache_settings(self.config.get('YouTube', {}))
+        self.cache_enabled_checkbox.SetValue(enabled)
+        self.cache_size_spin.SetValue(max_size_mb)
+        self.show_usage()
+
+    def save_settings(self):
+        if 'YouTube' not in self.config:
+            self.config['YouTube'] = {}
+        self.config['YouTube']['media_cache_enabled'] = self.cache_enabled_checkbox.GetValue()
+        self.config['YouTube']['media_cache_size_mb'] = self.cache_size_spin.GetValue()
+
+    def on_setting_change(self, event):
+        self.save_settings()
+
+    def show_usage(self):
+        try:
+            count, total_bytes = get_media_cache().get_usage()
+        except OSError as e:
+            self.usage_text.SetValue(f"Unavailable: {e}")
+            return
+        files = "file" if count == 1 else "files"
+        self.usage_text.SetValue(f"{format_size(total_bytes)} in {count} {files}, of {self.cache_size_spin.GetValue()} MB")
+
+    def on_clear_cache(self, event):
+        get_media_cache().clear()
+        self.show_usage()
+        speak("Media cache cleared.")
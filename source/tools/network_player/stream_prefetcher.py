@@ -0,0 +1,69 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .extraction_engine import get_engine
+
+DEFAULT_PREFETCH_DEPTH = 2
+
+
+class StreamPrefetcher:
+    """
+    Resolves the streams of the entries around the one being played, so that
+    moving to the next or previous entry finds its info dict already in the
+    extraction engine's cache.
+
+    update() is called with the current index whenever it changes. Entries
+    that are no longer near the current one are cancelled if they have not
+    started yet; an extraction that is already running finishes and simply
+    stays in the cache. Failures are ignored here: the player reports them
+    when the entry is actually played.
+    """
+    def __init__(self, results, get_format_selector, depth=DEFAULT_PREFETCH_DEPTH, max_workers=2):
+        self.results = results
+        self.get_format_selector = get_format_selector
+        self.depth = depth
+        self._lock = threading.Lock()
+        self._futures = {}
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="StreamPrefetch") if depth > 0 else None
+
+    def _neighbour_urls(self, index):
+        # Next entries first, since moving forward is the common case.
+        indexes = [index + offset for offset in range(1, self.depth + 1)]
+        indexes.append(index - 1)
+        urls = []
+        for i in indexes:
+            if 0 <= i < len(self.results):
+                url = self.results[i].get('webpage_url') or self.results[i].get('url')
+                if url and url not in urls:
+                    urls.append(url)
+        return urls
+
+    def update(self, index):
+        if self._executor is None or index is None or index < 0:
+            return
+        wanted = self._neighbour_urls(index)
+        format_selector = self.get_format_selector()
+        with self._lock:
+            if self._closed:
+                return
+            for url, future in list(self._futures.items()):
+                if url not in wanted:
+                    future.cancel()
+                    del self._futures[url]
+            for url in wanted:
+                # A finished entry is submitted again; it is a cache hit unless its stream expired.
+                if url not in self._futures or self._futures[url].done():
+                    self._futures[url] = self._executor.submit(self._resolve, url, format_selector)
+
+    def _resolve(self, url, format_selector):
+        try:
+            get_engine().extract(url, format_selector=format_selector)
+        except Exception as e:
+            print(f"Could not prefetch {url}: {e}")
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._futures.clear()
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -2,6 +2,7 @@ import wx
 import os
 import sys
 from .utils import run_yt_dlp_json
+from .extraction_engine import get_engine
 from speech import speak
 import app_vars
 import concurrent.futures
@@ -56,7 +57,10 @@ class SubtitleManager:
     def fetch_subtitles(self):
         """Fetches available subtitles, listing manual first, then unique automatic ones."""
         try:
-            info_dict = run_yt_dlp_json(self.youtube_url, extra_args=['--write-subs', '--write-auto-subs'])
+            # Only the language names are needed here, so remembered details are enough.
+            info_dict = get_engine().get_video_details(self.youtube_url)
+            if not info_dict or 'subtitles' not in info_dict:
+                info_dict = run_yt_dlp_json(self.youtube_url, extra_args=['--write-subs', '--write-auto-subs'])
             if not info_dict:
                 wx.CallAfter(self.loading_dialog.Destroy)
                 return
@@ -168,13 +172,19 @@ class SubtitleManager:
                  expected_srt_filename = f'subtitle.{self.selected_language}.srt'
                  expected_srt_path = os.path.join(subtitles_dir, expected_srt_filename)
                  final_srt_path = os.path.join(subtitles_dir, 'subtitle.srt')
+                 vtt_path = os.path.join(subtitles_dir, f'subtitle.{self.selected_language}.vtt')
+                 if not os.path.exists(expected_srt_path) and os.path.exists(vtt_path):
+                     # The conversion to SRT did not happen (no ffmpeg); the player reads WebVTT as well.
+                     expected_srt_filename = os.path.basename(vtt_path)
+                     expected_srt_path = vtt_path
+                     final_srt_path = os.path.join(subtitles_dir, 'subtitle.vtt')
 
                  if os.path.exists(expected_srt_path):
                      try:
                          if os.path.exists(final_srt_path):
                              os.remove(final_srt_path)
                          os.rename(expected_srt_path, final_srt_path)
-                         self.subtitle_filename = "subtitle.srt"
+                         self.subtitle_filename = os.path.basename(final_srt_path)
                          wx.CallAfter(speak, "Subtitle downloaded successfully.")
                      except OSError as rename_err:
                          wx.CallAfter(speak, "Subtitle downloaded, but failed to rename.")
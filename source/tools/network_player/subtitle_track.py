@@ -0,0 +1,115 @@
+import re
+import html
+from bisect import bisect_right
+import srt
+
+VTT_TIMING_RE = re.compile(r"^((?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3})\s+-->\s+((?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3})")
+VTT_TAG_RE = re.compile(r"<[^>]*>")
+
+
+def parse_timestamp(value):
+    """Converts a WebVTT or SRT timestamp ([hh:]mm:ss.ttt) to milliseconds."""
+    clock, _, fraction = value.replace(',', '.').partition('.')
+    parts = [int(p) for p in clock.split(':')]
+    while len(parts) < 3:
+        parts.insert(0, 0)
+    hours, minutes, seconds = parts
+    millis = int(fraction.ljust(3, '0')[:3]) if fraction else 0
+    return ((hours * 60 + minutes) * 60 + seconds) * 1000 + millis
+
+def clean_vtt_text(text):
+    """Removes WebVTT markup (voice, class and karaoke timestamp tags) and decodes entities."""
+    return html.unescape(VTT_TAG_RE.sub('', text)).strip()
+
+def parse_vtt(content):
+    """Returns a list of (start_ms, end_ms, text) tuples from WebVTT content."""
+    cues = []
+    blocks = re.split(r"\r?\n\s*\r?\n", content)
+    for block in blocks:
+        lines = block.strip().splitlines()
+        if not lines or lines[0].startswith(('WEBVTT', 'NOTE', 'STYLE', 'REGION')):
+            continue
+        # An optional cue identifier comes before the timing line.
+        for i, line in enumerate(lines[:2]):
+            match = VTT_TIMING_RE.match(line.strip())
+            if match:
+                text = clean_vtt_text("\n".join(lines[i + 1:]))
+                if text:
+                    cues.append((parse_timestamp(match.group(1)), parse_timestamp(match.group(2)), text))
+                break
+    return cues
+
+def parse_srt(content):
+    """Returns a list of (start_ms, end_ms, text) tuples from SRT content."""
+    cues = []
+    for subtitle in srt.parse(content):
+        start = int(subtitle.start.total_seconds() * 1000)
+        end = int(subtitle.end.total_seconds() * 1000)
+        cues.append((start, end, subtitle.content))
+    return cues
+
+
+class SubtitleTrack:
+    """
+    Subtitle cues compiled into sorted start and end arrays for fast lookup
+    by playback time.
+
+    Lookups remember the last cue found, so during normal playback the
+    answer is usually the same cue or the next one and costs O(1). After a
+    seek the cue is found with a binary search, O(log n). When cues overlap,
+    as in auto-generated captions, the most recently started one that is
+    still running is shown. If the last cue to start has already ended, the
+    lookup walks back over earlier cues, stopping as soon as the running
+    maximum of the end times shows none of them can still be running.
+    """
+    def __init__(self, cues):
+        cues = sorted(cues, key=lambda cue: cue[0])
+        self.starts = [cue[0] for cue in cues]
+        self.ends = [cue[1] for cue in cues]
+        self.texts = [cue[2] for cue in cues]
+        # max_ends[i] is the latest end time of cues 0..i.
+        self.max_ends = []
+        latest_end = None
+        for end in self.ends:
+            latest_end = end if latest_end is None else max(latest_end, end)
+            self.max_ends.append(latest_end)
+        self._cursor = -1
+
+    @classmethod
+    def from_file(cls, path):
+        """Loads an SRT or WebVTT file, detected from its header rather than its extension."""
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            content = f.read()
+        if content.lstrip().startswith('WEBVTT'):
+            return cls(parse_vtt(content))
+        return cls(parse_srt(content))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _index_of_start(self, time_ms):
+        """Returns the index of the last cue starting at or before time_ms, or -1."""
+        cursor = self._cursor
+        starts = self.starts
+        count = len(starts)
+        if 0 <= cursor < count and starts[cursor] <= time_ms:
+            if cursor + 1 == count or time_ms < starts[cursor + 1]:
+                return cursor
+            if cursor + 2 == count or time_ms < starts[cursor + 2]:
+                return cursor + 1
+        return bisect_right(starts, time_ms) - 1
+
+    def index_at(self, time_ms):
+        """Returns the index of the cue shown at time_ms, or -1 if none is."""
+        index = self._index_of_start(time_ms)
+        self._cursor = index
+        ends, max_ends = self.ends, self.max_ends
+        while index >= 0 and time_ms <= max_ends[index]:
+            if time_ms <= ends[index]:
+                return index
+            index -= 1
+        return -1
+
+    def text_at(self, time_ms):
+        index = self.index_at(time_ms)
+        return self.texts[index] if index >= 0 else None
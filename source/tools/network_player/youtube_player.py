@@ -4,11 +4,16 @@ import app_vars
 from gui.custom_controls import CustomButton
 from gui.dialogs import DescriptionDialog
 from .comments import CommentsDialog
-from .download_dialogs import DownloadSettingsDialog, DownloadDialog
+from .download_dialogs import DownloadSettingsDialog
+from .download_manager import enqueue_download
 from .subtitle_manager import SubtitleManager
+from .subtitle_track import SubtitleTrack
 from .utils import run_yt_dlp_json
+from .stream_prefetcher import StreamPrefetcher, DEFAULT_PREFETCH_DEPTH
+from .media_cache import get_media_cache
 from .go_to_time import GoToTimeDialog
 from speech import speak
+from vlc_engine import get_vlc_engine
 import vlc
 import sys
 import threading
@@ -16,8 +21,6 @@ import time
 import os
 import subprocess
 from configobj import ConfigObj
-import srt
-from datetime import timedelta
 
 # Create a custom event for when VLC is ready
 VlcReadyEvent, EVT_VLC_READY = NewEvent()
@@ -66,7 +69,8 @@ class YoutubePlayer(wx.Frame):
         self.is_fullscreen = False
         self.is_audio = play_as_audio
         self.subtitle_enabled = False
-        self.current_subtitle=None
+        self.subtitle_track = None
+        self.current_subtitle_index = -1
         self.playback_speed = 1.0
         self.start_time = None
         self.end_time = None
@@ -78,6 +82,10 @@ class YoutubePlayer(wx.Frame):
         project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         self.ffmpeg_path = os.path.join(project_root, 'ffmpeg.exe')
         self.subtitle_manager = None
+        self.navigation_id = 0
+        self.media_cache = get_media_cache()
+        # A cached copy of the current video that finished while it was streaming.
+        self.cached_media_path = None
 
         self.load_settings()
         self.create_menu_bar()
@@ -85,7 +93,7 @@ class YoutubePlayer(wx.Frame):
         self.Maximize(True)
         self.SetBackgroundColour(wx.BLACK if not self.is_audio else wx.Colour(240, 240, 240))
         self.url = url
-        self.instance = None
+        self.vlc_engine = None
         self.player = None
         self.loading_dialog = None
 
@@ -128,6 +136,8 @@ class YoutubePlayer(wx.Frame):
         # Initialize VLC in a separate thread
         threading.Thread(target=self.init_vlc_thread).start()
         self.Bind(EVT_VLC_READY, self.onVlcReady)
+        self.prefetcher = StreamPrefetcher(self.results or [], self.get_format_selector, depth=self.prefetch_depth)
+        self.prefetcher.update(self.current_index)
 
 
     def load_settings(self):
@@ -144,6 +154,7 @@ class YoutubePlayer(wx.Frame):
         self.default_audio_format = youtube_settings.get('default_audio_format', 'mp3')
         self.default_audio_quality = youtube_settings.get('default_audio_quality', '128K')
         self.default_download_directory = youtube_settings.get('default_download_directory', '')
+        self.prefetch_depth = int(youtube_settings.get('prefetch_depth', DEFAULT_PREFETCH_DEPTH))
 
     def create_menu_bar(self):
         menubar = wx.MenuBar()
@@ -195,11 +206,13 @@ class YoutubePlayer(wx.Frame):
         self.update_save_selection_state()
 
     def init_vlc_thread(self):
-        self.instance = vlc.Instance()
-        if not self.instance:
+        try:
+            self.vlc_engine = get_vlc_engine()
+        except RuntimeError:
             wx.CallAfter(wx.MessageBox, "Failed to initialize the media player.", "Player error", wx.OK | wx.ICON_ERROR)
-        self.player = self.instance.media_player_new()
-        media = self.instance.media_new(self.url)
+            return
+        self.player = self.vlc_engine.new_player()
+        media = self.create_media(self.url)
         self.player.set_media(media)
 
         if sys.platform == "win32":
@@ -216,6 +229,7 @@ class YoutubePlayer(wx.Frame):
         event_manager.event_attach(vlc.EventType.MediaPlayerEndReached, self.on_media_end)
         self.player.audio_set_volume(self.default_volume)
         self.player.play()
+        self.cache_current_media()
         wx.PostEvent(self, VlcReadyEvent())  # Post the event after play()
 
     def on_media_opening(self, event):
@@ -227,7 +241,7 @@ class YoutubePlayer(wx.Frame):
             action = self.post_playback_action
             if action == "Replay video":
                 wx.CallAfter(self.player.stop)
-                new_media = self.instance.media_new(self.url)
+                new_media = self.create_media(self.url)
                 wx.CallAfter(self.player.set_media, new_media)
                 wx.CallAfter(self.player.play)
                 wx.CallAfter(self.pause_button.SetLabel, "Pause")
@@ -250,25 +264,20 @@ class YoutubePlayer(wx.Frame):
 
     def on_time_changed(self, event):
         """Handles the MediaPlayerTimeChanged event to display subtitles."""
-        current_time_ms = self.player.get_time()
-        current_time = timedelta(milliseconds=current_time_ms)
-
-        # Check if we are already displaying a subtitle
-        if hasattr(self, 'current_subtitle') and self.current_subtitle:
-            if self.current_subtitle.start <= current_time <= self.current_subtitle.end:
-                return
-            else:
-                self.current_subtitle = None
-
-        for subtitle in self.subtitles:
-            if subtitle.start <= current_time <= subtitle.end:
-                wx.CallAfter(self.display_subtitle, subtitle.content)
-                self.current_subtitle = subtitle
-                return
-        wx.CallAfter(self.hide_subtitle)
+        if not self.subtitle_track:
+            return
+        index = self.subtitle_track.index_at(self.player.get_time())
+        # Only touch the UI when the visible cue changes.
+        if index == self.current_subtitle_index:
+            return
+        self.current_subtitle_index = index
+        if index >= 0:
+            wx.CallAfter(self.display_subtitle, self.subtitle_track.texts[index])
+        else:
+            wx.CallAfter(self.hide_subtitle)
 
     def onRewind(self, event):
-        self.player.set_time(self.player.get_time() - (self.rewind_interval * 1000))
+        self.seek_to(self.player.get_time() - (self.rewind_interval * 1000))
 
     def onPause(self, event):
         if self.player.is_playing():
@@ -281,7 +290,7 @@ class YoutubePlayer(wx.Frame):
              speak("Play")
 
     def onForward(self, event):
-        self.player.set_time(self.player.get_time() + (self.fast_forward_interval * 1000))
+        self.seek_to(self.player.get_time() + (self.fast_forward_interval * 1000))
 
     def onKey(self, event):
         keycode = event.GetKeyCode()
@@ -381,8 +390,8 @@ class YoutubePlayer(wx.Frame):
         subtitle_path = os.path.join(subtitles_dir, self.subtitle_manager.subtitle_filename)
 
         try:
-            with open(subtitle_path, 'r', encoding='utf-8') as f:
-                self.subtitles = list(srt.parse(f))
+            self.subtitle_track = SubtitleTrack.from_file(subtitle_path)
+            self.current_subtitle_index = -1
         except Exception as e:
             wx.MessageBox(f"Error parsing subtitle file: {e}", "Error", wx.OK | wx.ICON_ERROR)
             self.subtitle_enabled = False
@@ -475,39 +484,40 @@ class YoutubePlayer(wx.Frame):
             return
 
         selected_video = self.results[index]
-        if self.player:
-            self.player.stop()
-            self.player.release()
-            self.instance.release()
-            self.player = None
-        threading.Thread(target=self.get_direct_link_and_play, args=(selected_video['webpage_url'], selected_video['title'], False)).start()
-
-    def get_direct_link_and_play(self, url, title, play_as_audio=False):
+        # The player is kept and only its media replaced, so there is no new VLC instance to start.
+        self.player.stop()
+        self.navigation_id += 1
+        self.prefetcher.update(index)
+        threading.Thread(target=self.get_direct_link_and_play, args=(selected_video['webpage_url'], selected_video['title'], False, self.navigation_id)).start()
+
+    def get_format_selector(self):
+        """Returns the yt-dlp format string used to play results in this player."""
+        if self.is_audio:
+            return 'ba/b'
+        if self.default_video_quality == "Low":
+            return 'worst[ext=mp4]/worstvideo[ext=mp4]/worst'
+        elif self.default_video_quality == "Best":
+            return 'best[ext=mp4]/bestvideo[ext=mp4]/best'
+        return 'best[height<=?720][ext=mp4]/bestvideo[height<=?720][ext=mp4]/best[height<=?720]'
+
+    def get_direct_link_and_play(self, url, title, play_as_audio=False, navigation_id=None):
         # This function is called when navigating next/previous
         try:
-            self.youtube_url = url
-            self.title = title
-            self.SetTitle(title)
-
-            format_selector = None
-            if self.is_audio:
-                 format_selector = 'ba/b'
-            else:
-                if self.default_video_quality == "Low":
-                    format_selector = 'worst[ext=mp4]/worstvideo[ext=mp4]/worst'
-                elif self.default_video_quality == "Medium":
-                    format_selector = 'best[height<=?720][ext=mp4]/bestvideo[height<=?720][ext=mp4]/best[height<=?720]'
-                elif self.default_video_quality == "Best":
-                    format_selector = 'best[ext=mp4]/bestvideo[ext=mp4]/best'
-                else:
-                    format_selector = 'best[height<=?720][ext=mp4]/bestvideo[height<=?720][ext=mp4]/best[height<=?720]'
-
             wx.CallAfter(speak, f"Loading {title}...")
             wx.CallAfter(wx.BeginBusyCursor)
 
-            info_dict = run_yt_dlp_json(url, format_selector=format_selector)
+            # Usually answered from the cache, because the prefetcher resolved it while the previous item played.
+            info_dict = run_yt_dlp_json(url, format_selector=self.get_format_selector())
             if not info_dict:
                  raise ValueError("Failed to get video info from yt-dlp.")
+            if navigation_id is not None and navigation_id != self.navigation_id:
+                # The user moved on to another item while this one was loading.
+                wx.CallAfter(wx.EndBusyCursor)
+                return
+
+            self.youtube_url = url
+            self.title = title
+            wx.CallAfter(self.SetTitle, title)
 
             media_url = info_dict.get('url')
             self.description = info_dict.get('description', '')
@@ -521,11 +531,66 @@ class YoutubePlayer(wx.Frame):
 
             self.url = media_url
             wx.CallAfter(wx.EndBusyCursor)
-            self.init_vlc_thread()
+            if self.player:
+                wx.CallAfter(self.switch_media, media_url, navigation_id)
+            else:
+                self.init_vlc_thread()
         except Exception as e:
             wx.CallAfter(wx.EndBusyCursor)
             wx.CallAfter(wx.MessageBox, f"Could not play next/previous video: {e}", "Error", wx.OK | wx.ICON_ERROR)
 
+    def switch_media(self, media_url, navigation_id=None):
+        """Plays media_url in the existing player, unless a newer navigation replaced it."""
+        if not self.player or (navigation_id is not None and navigation_id != self.navigation_id):
+            return
+        self.player.stop()
+        self.player.set_media(self.create_media(media_url))
+        self.player.play()
+        self.pause_button.SetLabel("Pause")
+        self.cache_current_media()
+
+    def get_cached_path(self):
+        """Returns the media cache's copy of the current video in the current format, or None."""
+        if not self.media_cache.enabled or not self.youtube_url:
+            return None
+        return self.media_cache.get_path(self.youtube_url, self.get_format_selector())
+
+    def create_media(self, media_url):
+        """Returns VLC media for the current video, read from the media cache when it has a copy."""
+        self.cached_media_path = None
+        cached_path = self.get_cached_path()
+        if cached_path:
+            return self.vlc_engine.new_media_path(cached_path)
+        return self.vlc_engine.new_media(media_url)
+
+    def cache_current_media(self):
+        """Fetches the current video into the media cache in the background while it streams."""
+        if not self.media_cache.enabled or not self.youtube_url:
+            return
+        page_url = self.youtube_url
+        self.media_cache.fetch(page_url, self.get_format_selector(),
+                               on_complete=lambda path: wx.CallAfter(self.on_media_cached, page_url, path))
+
+    def on_media_cached(self, page_url, path):
+        # The player may be closed, or showing another video by now.
+        if not self or page_url != self.youtube_url:
+            return
+        self.cached_media_path = path
+
+    def seek_to(self, time_ms):
+        """
+        Moves playback to time_ms. If the current video finished caching
+        while it streamed, the player switches to the local copy here, since
+        a seek interrupts playback anyway.
+        """
+        if self.cached_media_path and self.player.is_playing():
+            path, self.cached_media_path = self.cached_media_path, None
+            self.player.stop()
+            self.player.set_media(self.vlc_engine.new_media_path(path, f"start-time={max(0, time_ms) / 1000:.3f}"))
+            self.player.play()
+        else:
+            self.player.set_time(time_ms)
+
     def _format_time(self, milliseconds):
         if milliseconds is None or milliseconds == 0:
             return "Unknown"
@@ -585,14 +650,14 @@ class YoutubePlayer(wx.Frame):
 
     def onRestart(self, event):
         if self.player is not None:
-            self.player.set_time(0)
+            self.seek_to(0)
             speak("Restart from beginning")
 
     def onGoToEnd(self, event):
         if self.player is not None:
             total_time = self.player.get_length()
             if total_time != 0:
-                self.player.set_time(max(0, total_time - 10000))
+                self.seek_to(max(0, total_time - 10000))
             speak("Near end")
 
     def handle_percentage_jump(self, keycode, modifiers):
@@ -603,7 +668,7 @@ class YoutubePlayer(wx.Frame):
         total_time = self.player.get_length()
         if total_time > 0:
             target_time = int(total_time * (percentage / 100.0))
-            self.player.set_time(target_time)
+            self.seek_to(target_time)
             speak(f"{percentage} percent")
 
     def set_start_time(self):
@@ -638,7 +703,7 @@ class YoutubePlayer(wx.Frame):
                 output_path += ".mp3"
             self.loading_dialog = wx.ProgressDialog("Downloading Selection", "Please wait...", maximum=100, parent=self, style=wx.PD_APP_MODAL | wx.PD_AUTO_HIDE)
             threading.Thread(target=self.download_and_extract_audio,
-                             args=(self.url, output_path, self.start_time, self.end_time)).start()
+                             args=(self.get_cached_path() or self.url, output_path, self.start_time, self.end_time)).start()
 
     def on_save_video_selection(self, event):
         """Downloads the selected portion of the video as an MP4 file."""
@@ -662,10 +727,10 @@ class YoutubePlayer(wx.Frame):
             
             self.loading_dialog = wx.ProgressDialog("Saving Video Selection", "Please wait...", maximum=100, parent=self, style=wx.PD_APP_MODAL | wx.PD_AUTO_HIDE)
             threading.Thread(target=self.download_and_extract_video,
-                             args=(self.url, output_path, self.start_time, self.end_time)).start()
+                             args=(self.get_cached_path() or self.url, output_path, self.start_time, self.end_time)).start()
 
     def download_and_extract_video(self, url, output_path, start_time, end_time):
-        """Uses ffmpeg to save a video clip from a stream URL."""
+        """Uses ffmpeg to save a video clip from a stream URL or a cached file."""
         try:
             start_time_str = time.strftime('%H:%M:%S', time.gmtime(start_time / 1000))
             duration_seconds = (end_time - start_time) / 1000
@@ -796,7 +861,7 @@ class YoutubePlayer(wx.Frame):
         if dlg.ShowModal() == wx.ID_OK:
             target_ms = dlg.get_selected_time_milliseconds()
             if self.player:
-                self.player.set_time(target_ms)
+                self.seek_to(target_ms)
                 speak(f"Jumped to {self._format_time(target_ms)}")
         dlg.Destroy()
 
@@ -890,17 +955,14 @@ class YoutubePlayer(wx.Frame):
         self.start_download_process(download_settings)
 
     def start_download_process(self, download_settings):
-        """Starts the DownloadDialog with the collected settings."""
-        dlg_title = f"Downloading: {download_settings['filename']}"
-        download_dlg = DownloadDialog(self, dlg_title, download_settings)
-        download_dlg.download_task()
+        """Adds the download to the download queue with the collected settings."""
+        enqueue_download(download_settings)
 
 
     def OnClose(self, event):
+        self.prefetcher.close()
         if self.player:
-            self.player.stop()
-            self.player.release()
-            self.instance.release()
+            self.vlc_engine.release_player(self.player)
             self.player = None
         if self.loading_dialog: #Close the dialog if it still exists.
             self.loading_dialog.Destroy()
@@ -1,9 +1,11 @@
 import wx
 from .youtube_player import YoutubePlayer, EVT_VLC_READY
-from .download_dialogs import DownloadSettingsDialog, DownloadDialog
+from .download_dialogs import DownloadSettingsDialog
+from .download_manager import enqueue_download
 from .favorites_manager import FavoritesManager
 from .channel_viewer import ChannelViewerFrame
 from .utils import run_yt_dlp_json
+from .extraction_engine import get_engine, ExtractionError
 from gui.settings import get_file_path
 from gui.custom_controls import CustomTextCtrl
 from speech import speak
@@ -11,10 +13,13 @@ from configobj import ConfigObj
 from gui.dialogs import DescriptionDialog
 import app_vars
 from wx.lib.newevent import NewEvent
-import os, json, threading
+import os, json, time, threading
 
-# Events for search completion and description
-YoutubeSearchEvent, EVT_YOUTUBE_SEARCH = NewEvent()
+# Streamed search results are added to the list at most this often, in seconds.
+SEARCH_UPDATE_INTERVAL = 0.2
+
+# Events for streamed search results and description
+SearchEntriesEvent, EVT_SEARCH_ENTRIES = NewEvent()
 DescriptionFetchEvent, EVT_DESCRIPTION_FETCH = NewEvent()
 PlaylistItemsFetchEvent, EVT_PLAYLIST_ITEMS_FETCH = NewEvent()
 ChannelDataFetchEvent, EVT_CHANNEL_DATA_FETCH = NewEvent()
@@ -79,86 +84,62 @@ class YoutubeSearchDialog(wx.Dialog):
 
         self.search_text.AddHistory(search_term)
         self.save_history()
-        self.loading_dialog = wx.Dialog(self, title="Searching...", style=wx.CAPTION)
-        loading_text = wx.StaticText(self.loading_dialog, -1, "Searching...")
-        loading_sizer = wx.BoxSizer(wx.VERTICAL)
-        loading_sizer.Add(loading_text, 0, wx.ALL | wx.CENTER, 10)
-        self.loading_dialog.SetSizer(loading_sizer)
-        self.loading_dialog.Show()
-        wx.Yield()
-
-        threading.Thread(target=self.search_youtube, args=(search_term,)).start()
-        self.Bind(EVT_YOUTUBE_SEARCH, self.onSearchResults)
+        self.show_search_results(search_term, self.get_page_size())
+        self.Destroy()
 
-    def search_youtube(self, search_term):
-        """Performs YouTube search using yt-dlp."""
-        results_list = []
+    def get_page_size(self):
+        """Returns the configured number of results per page, or None for "automatic" (all results)."""
         config_path = os.path.join(wx.StandardPaths.Get().GetUserConfigDir(), app_vars.app_name, "settings.ini")
         config = ConfigObj(config_path)
         youtube_settings = config.get('YouTube', {})
         search_results_count_str = youtube_settings.get('search_results_count', "5")
-
-        search_query_url = ""
         if search_results_count_str.lower() == "automatic":
-            search_query_url = f"ytsearchall:{search_term}"
-        else:
-            try:
-                num_results = int(search_results_count_str)
-                search_query_url = f"ytsearch{num_results}:{search_term}"
-            except ValueError:
-                search_query_url = f"ytsearch5:{search_term}"
-                
+            return None
         try:
-            info_dict = run_yt_dlp_json(search_query_url, is_search=True)             
-            if info_dict and 'entries' in info_dict:
-                results_list = info_dict['entries']
-        except Exception as e:
-            wx.CallAfter(wx.MessageBox, f"An unexpected error occurred while initiating the search: {e}", "Search Error", wx.OK | wx.ICON_ERROR)
-        
-        wx.PostEvent(self, YoutubeSearchEvent(results=results_list, search_instance=None))
+            return max(1, int(search_results_count_str))
+        except ValueError:
+            return 5
 
-    def onSearchResults(self, event):
-        results = event.results        
-        if hasattr(self, 'loading_dialog') and self.loading_dialog:
+    def show_search_results(self, search_term, page_size):
+        """Opens the results window straight away; it fills itself as results arrive."""
+        if self.frame_to_manage:
             try:
-                self.loading_dialog.Destroy()
-            except RuntimeError: pass # It might have been destroyed
-            self.loading_dialog = None
+                self.frame_to_manage.Hide()
+            except (wx.wxAssertionError, RuntimeError): pass
 
-        if results:
-            if self.frame_to_manage:
-                try:
-                    self.frame_to_manage.Hide()
-                except (wx.wxAssertionError, RuntimeError): pass
+        wx_parent_for_results = None
+        if self.frame_to_manage:
+            if hasattr(self.frame_to_manage, 'access_hub_instance'):
+                wx_parent_for_results = self.frame_to_manage.access_hub_instance
+            else: # Fallback to NPF's direct parent
+                wx_parent_for_results = self.frame_to_manage.GetParent()
+        if not wx_parent_for_results:
+             wx_parent_for_results = wx.GetApp().GetTopWindow()
 
-            if self.frame_to_manage:
-                if hasattr(self.frame_to_manage, 'access_hub_instance'):
-                    wx_parent_for_results = self.frame_to_manage.access_hub_instance
-                else: # Fallback to NPF's direct parent
-                    wx_parent_for_results = self.frame_to_manage.GetParent()
-            if not wx_parent_for_results:
-                 wx_parent_for_results = wx.GetApp().GetTopWindow()
-
-            youtube_results_frame = YoutubeSearchResults(wx_parent_for_results, results, is_playlist_view=False, calling_frame_to_show_on_my_close=self.frame_to_manage)
-            # Add to AccessHub's child tracking if AccessHub is the parent or known
-            access_hub_ref = None
-            if isinstance(wx_parent_for_results, wx.Frame) and hasattr(wx_parent_for_results, 'add_child_frame'):
-                access_hub_ref = wx_parent_for_results
-            elif self.frame_to_manage and hasattr(self.frame_to_manage, 'access_hub_instance'):
-                access_hub_ref = self.frame_to_manage.access_hub_instance
-
-            if access_hub_ref and hasattr(access_hub_ref, 'add_child_frame'):
-                access_hub_ref.add_child_frame(youtube_results_frame)
-            youtube_results_frame.Show()
-        else:
-            wx.MessageBox("No results found or error fetching results.", "YouTube Search", wx.OK | wx.ICON_INFORMATION)        
-        self.Destroy()
+        youtube_results_frame = YoutubeSearchResults(wx_parent_for_results, [], is_playlist_view=False, calling_frame_to_show_on_my_close=self.frame_to_manage, search_term=search_term, page_size=page_size)
+        # Add to AccessHub's child tracking if AccessHub is the parent or known
+        access_hub_ref = None
+        if isinstance(wx_parent_for_results, wx.Frame) and hasattr(wx_parent_for_results, 'add_child_frame'):
+            access_hub_ref = wx_parent_for_results
+        elif self.frame_to_manage and hasattr(self.frame_to_manage, 'access_hub_instance'):
+            access_hub_ref = self.frame_to_manage.access_hub_instance
+
+        if access_hub_ref and hasattr(access_hub_ref, 'add_child_frame'):
+            access_hub_ref.add_child_frame(youtube_results_frame)
+        youtube_results_frame.Show()
 
 
 class YoutubeSearchResults(wx.Frame):
-    def __init__(self, parent, results_list, is_playlist_view=False, calling_frame_to_show_on_my_close=None, playlist_uploader=None):
+    def __init__(self, parent, results_list, is_playlist_view=False, calling_frame_to_show_on_my_close=None, playlist_uploader=None, search_term=None, page_size=None):
         self.is_playlist_view = is_playlist_view
         self.playlist_uploader = playlist_uploader
+        # With a search_term the window runs the search itself and streams the results in.
+        self.search_term = search_term
+        self.page_size = page_size
+        self.search_cancelled = threading.Event()
+        self.is_searching = False
+        self.has_more_results = False
+        self.page_start_index = 0
         title = "Playlist Viewer" if is_playlist_view else "Search Results"
         super().__init__(parent, title=title, size=(800, 650), style=wx.DEFAULT_DIALOG_STYLE| wx.RESIZE_BORDER)
         self.calling_frame_to_show_on_my_close = calling_frame_to_show_on_my_close
@@ -188,9 +169,19 @@ class YoutubeSearchResults(wx.Frame):
         download_button.Bind(wx.EVT_BUTTON, self.onDownloadSelectedVideo)
         vbox.Add(download_button, 0, wx.ALL | wx.ALIGN_RIGHT, 5)
 
+        self.load_more_button = None
+        if search_term and page_size:
+            self.load_more_button = wx.Button(panel, label="Load More Results")
+            self.load_more_button.Bind(wx.EVT_BUTTON, self.onLoadMore)
+            self.load_more_button.Disable()
+            vbox.Add(self.load_more_button, 0, wx.ALL | wx.ALIGN_RIGHT, 5)
+
         panel.SetSizer(vbox)
         self.results = []
         self.populate_results_listbox(results_list)
+        if search_term:
+            self.Bind(EVT_SEARCH_ENTRIES, self.onSearchEntries)
+            self.start_search_page()
         self.Bind(wx.EVT_CLOSE, self.onClose)
         self.Bind(wx.EVT_CHAR_HOOK, self.onKey)
         self.results_listbox.Bind(wx.EVT_CONTEXT_MENU, self.onContextMenu)
@@ -228,7 +219,12 @@ class YoutubeSearchResults(wx.Frame):
 
     def populate_results_listbox(self, results): #Corrected the loop and result appending.
         self.results_listbox.Clear()
-        self.results = []
+        # Cleared in place, since an open player holds a reference to this list.
+        del self.results[:]
+        self.append_results(results)
+
+    def append_results(self, results):
+        """Adds yt-dlp entries to the end of the list, keeping the current selection."""
         for result_item in results:
             title = result_item.get('title', 'Untitled Video')
             webpage_url = result_item.get('url')
@@ -273,6 +269,89 @@ class YoutubeSearchResults(wx.Frame):
             }
             self.results.append(results_info)
 
+    def start_search_page(self):
+        """
+        Streams the next page of search results in a background thread. Search
+        pages map to playlist-item ranges: page n of size N is ytsearch{n*N}
+        items (n-1)*N+1 to n*N, so earlier pages are not fetched again.
+        Without a page size every result is streamed until the window closes.
+        """
+        if self.is_searching or self.search_cancelled.is_set():
+            return
+        start = len(self.results) + 1
+        if self.page_size:
+            end = start + self.page_size - 1
+            query_url = f"ytsearch{end}:{self.search_term}"
+        else:
+            end = None
+            query_url = f"ytsearchall:{self.search_term}"
+        self.is_searching = True
+        self.has_more_results = False
+        self.page_start_index = start - 1
+        if self.load_more_button:
+            self.load_more_button.Disable()
+        self.results_label.SetLabel("Searching...")
+        threading.Thread(target=self.search_thread, args=(query_url, start, end), daemon=True).start()
+
+    def search_thread(self, query_url, start, end):
+        batch = []
+        count = 0
+        error = None
+        last_post = time.monotonic()
+        try:
+            for entry in get_engine().iter_entries(query_url, start, end, is_cancelled=self.search_cancelled.is_set):
+                batch.append(entry)
+                count += 1
+                now = time.monotonic()
+                # The first hit is shown at once so it can be played; later ones are batched.
+                if count == 1 or now - last_post >= SEARCH_UPDATE_INTERVAL:
+                    self.post_search_entries(batch, done=False)
+                    batch = []
+                    last_post = now
+        except ExtractionError as e:
+            error = e
+        except Exception as e:
+            error = ExtractionError(f"An unexpected error occurred while searching: {e}", "Search Error")
+        requested = (end - start + 1) if end else None
+        self.post_search_entries(batch, done=True, error=error, has_more=bool(requested and count >= requested))
+
+    def post_search_entries(self, entries, done, error=None, has_more=False):
+        if self.search_cancelled.is_set():
+            return
+        try:
+            wx.PostEvent(self, SearchEntriesEvent(entries=entries, done=done, error=error, has_more=has_more))
+        except RuntimeError:
+            pass # The window was destroyed while the search was running.
+
+    def onSearchEntries(self, event):
+        if self.search_cancelled.is_set():
+            return
+        if event.entries:
+            self.append_results(event.entries)
+            if self.results_listbox.GetSelection() == wx.NOT_FOUND:
+                self.results_listbox.SetSelection(0)
+        if not event.done:
+            return
+
+        self.is_searching = False
+        self.results_label.SetLabel("Search Results:")
+        if event.error:
+            wx.MessageBox(str(event.error), event.error.title, wx.OK | wx.ICON_ERROR)
+        if not self.results:
+            if not event.error:
+                wx.MessageBox("No results found or error fetching results.", "YouTube Search", wx.OK | wx.ICON_INFORMATION)
+            self.Close()
+            return
+        self.has_more_results = event.has_more and not event.error
+        if self.load_more_button:
+            self.load_more_button.Enable(self.has_more_results)
+        if self.page_start_index and len(self.results) > self.page_start_index:
+            speak(f"{len(self.results) - self.page_start_index} more results loaded")
+
+    def onLoadMore(self, event):
+        if self.has_more_results:
+            self.start_search_page()
+
     def load_settings(self):
         """Loads settings from the config file."""
         config_path = os.path.join(wx.StandardPaths.Get().GetUserConfigDir(), app_vars.app_name, "settings.ini")
@@ -826,7 +905,7 @@ class YoutubeSearchResults(wx.Frame):
         description = None
         error_message = None
         try:
-            info_dict = run_yt_dlp_json(video_url)
+            info_dict = get_engine().get_video_details(video_url) or run_yt_dlp_json(video_url)
 
             if info_dict:
                 description = info_dict.get('description', 'No description available.')
@@ -926,13 +1005,12 @@ class YoutubeSearchResults(wx.Frame):
         if event: event.Skip()
 
     def start_download_process(self, download_settings):
-        """Starts the DownloadDialog with the collected settings."""
-        dlg_title = f"Downloading: {download_settings['filename']}"
-        download_dlg = DownloadDialog(self, dlg_title, download_settings)
-        download_dlg.download_task()
+        """Adds the download to the download queue with the collected settings."""
+        enqueue_download(download_settings)
 
 
     def onClose(self, event):
+        self.search_cancelled.set()
         if hasattr(self, 'player') and self.player:
             try: self.player.Close(force=True)
             except: pass
@@ -1,5 +1,5 @@
 import wx
-import vlc
+from vlc_engine import get_vlc_engine
 import time
 import threading
 import os
@@ -43,7 +43,6 @@ class AlarmNotificationFrame(wx.Frame):
         self.snooze_interval_min = self.alarm_settings.get("snooze_interval_minutes", 5)
         self.sound_path = self.alarm_settings.get("sound_path", "")
 
-        self.vlc_instance = None
         self.media_player = None
         self.sound_duration_timer = None
         self.is_playing = False
@@ -92,37 +91,20 @@ class AlarmNotificationFrame(wx.Frame):
     def _init_vlc_and_play(self):
         """Initializes VLC and starts playing in a separate thread."""
         try:
-            self.vlc_instance = vlc.Instance("--no-xlib --quiet --input-repeat=-1")
-            if self.vlc_instance is None:
-                raise Exception("VLC Instance could not be created.")
-            
+            vlc_engine = get_vlc_engine()
+
             if not self.sound_path or not os.path.exists(self.sound_path):
                 wx.PostEvent(self, VlcReadyEvent(VLC_READY_EVENT_TYPE, self.GetId(), value="ERROR_NO_SOUND_FILE_IN_THREAD"))
                 return
 
-            media = self.vlc_instance.media_new(self.sound_path)
-            if media is None:
-                 raise Exception(f"VLC Media object could not be created for path: {self.sound_path}")
-
-            media_list = self.vlc_instance.media_list_new()
-            if media_list is None:
-                 raise Exception("VLC MediaList could not be created.")
-            media_list.add_media(media)
-
-            self.media_player = self.vlc_instance.media_list_player_new()
-            if self.media_player is None:
-                 raise Exception("VLC MediaListPlayer could not be created.")
-
-            # Set the media list and playback mode to loop
-            self.media_player.set_media_list(media_list)
-            self.media_player.set_playback_mode(vlc.PlaybackMode.loop)
+            # A looping list player on the shared VLC instance
+            self.media_player, media_list = vlc_engine.new_list_player([self.sound_path], loop=True)
             # setting the volume
             media_player = self.media_player.get_media_player()
             media_player.audio_set_volume(90)
 
             self.media_player.play()
             self.is_playing = True
-            media.release()
             media_list.release()
             wx.PostEvent(self, VlcReadyEvent(VLC_READY_EVENT_TYPE, self.GetId(), value="SUCCESS"))
         except Exception as e:
@@ -161,10 +143,6 @@ class AlarmNotificationFrame(wx.Frame):
             except Exception as e:
                 pass
             self.media_player = None
-
-        if self.vlc_instance:
-            self.vlc_instance.release()
-            self.vlc_instance = None
         self.is_playing = False
 
     def on_stop_alarm(self, event=None):
@@ -2,7 +2,7 @@ import wx
 import datetime
 import os
 import sys
-import vlc
+from vlc_engine import get_vlc_engine
 import app_vars
 
 class AlarmSettingsDialog(wx.Dialog):
@@ -10,12 +10,12 @@ class AlarmSettingsDialog(wx.Dialog):
         super().__init__(parent, title="Alarm Settings", size=(500, 630))
         self.panel = wx.Panel(self)
         self.custom_sound_path = ""
-        self.vlc_instance_preview = None
+        self.vlc_engine = None
         self.media_player_preview = None
         
         try:
-            self.vlc_instance_preview = vlc.Instance("--no-xlib --quiet")
-            self.media_player_preview = self.vlc_instance_preview.media_player_new()
+            self.vlc_engine = get_vlc_engine()
+            self.media_player_preview = self.vlc_engine.new_player()
         except Exception as e:
             wx.MessageBox("Sound preview is not available because VLC failed to initialize.",
                           "Sound Preview Warning", wx.OK | wx.ICON_WARNING, self)
@@ -29,11 +29,8 @@ class AlarmSettingsDialog(wx.Dialog):
     def _on_dialog_close(self, event):
         """Cleanup VLC resources when dialog closes."""
         if self.media_player_preview:
-            if self.media_player_preview.is_playing():
-                self.media_player_preview.stop()
-            self.media_player_preview.release()
-        if self.vlc_instance_preview:
-            self.vlc_instance_preview.release()
+            self.vlc_engine.release_player(self.media_player_preview)
+            self.media_player_preview = None
         event.Skip()
 
     def _setup_ui(self):
@@ -243,7 +240,7 @@ class AlarmSettingsDialog(wx.Dialog):
                     
                     if sound_path_to_play and os.path.exists(sound_path_to_play):
                         try:
-                            media = self.vlc_instance_preview.media_new(sound_path_to_play)
+                            media = self.vlc_engine.new_media(sound_path_to_play)
                             self.media_player_preview.set_media(media)
                             self.media_player_preview.play()
                         except Exception as e:
@@ -1,11 +1,12 @@
 import wx
 from gui.dialogs import MultilineTextEditDialog, ReplacementEntryDialog
+from gui.custom_controls import CustomVirtualList
 from speech import speak
 import uuid
 import os
-import shutil
 import re
 import threading
+from .finder_engine import compile_search_pattern, search_sources, save_replacements, load_terms, TermAutomaton, STATUS_PENDING_REPLACE, STATUS_PENDING_REPLACE_ALL, STATUS_SAVED
 
 
 class ModifiedTextsViewerDialog(wx.Dialog):
@@ -64,17 +65,18 @@ class AdvancedFinderResultsDialog(wx.Dialog):
     COL_SOURCE = 3
     COL_LINE_NUM = 4
     COL_ORIGINAL_LINE = 5
+    COL_TERM = 6
 
     def __init__(self, parent, title="Advanced Find Results", found_results=None, source_items_metadata=None):
-        # found_results: list of dicts from search thread
+        # found_results: MatchStore from the search thread
         # source_items_metadata: list of dicts from AdvancedFinderFrame.source_items
         super().__init__(parent, title=title, style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER | wx.MAXIMIZE_BOX | wx.MINIMIZE_BOX)
         self.SetSize((900, 700))
-        self.raw_found_results = found_results
+        self.match_store = found_results
         self.raw_source_items_metadata = source_items_metadata
         self.source_items_metadata = {item['id']: item for item in source_items_metadata}
-        self.displayable_results = self._prepare_displayable_results(found_results)
         self.output_destination = ""
+        self.save_thread = None
 
         panel = wx.Panel(self)
         main_sizer = wx.BoxSizer(wx.VERTICAL)
@@ -82,14 +84,16 @@ class AdvancedFinderResultsDialog(wx.Dialog):
         results_label = wx.StaticText(panel, label="Found matches:")
         main_sizer.Add(results_label, 0, wx.ALL | wx.ALIGN_LEFT, 5)
 
-        self.results_list_ctrl = wx.ListCtrl(panel, style=wx.LC_REPORT | wx.LC_SINGLE_SEL | wx.LC_VRULES)
+        self.results_list_ctrl = CustomVirtualList(panel)
         self.results_list_ctrl.InsertColumn(self.COL_MATCH_TEXT, "Found Text", width=200)
         self.results_list_ctrl.InsertColumn(self.COL_REPLACEMENT, "Replacement", width=150)
         self.results_list_ctrl.InsertColumn(self.COL_STATUS, "Status", width=100)
         self.results_list_ctrl.InsertColumn(self.COL_SOURCE, "File/Source", width=150)
         self.results_list_ctrl.InsertColumn(self.COL_LINE_NUM, "Line", width=60)
         self.results_list_ctrl.InsertColumn(self.COL_ORIGINAL_LINE, "Original Line Context", width=300)
-        self._populate_results_list()
+        if self.match_store.terms:
+            self.results_list_ctrl.InsertColumn(self.COL_TERM, "Term", width=150)
+        self.results_list_ctrl.SetDataSource(self.match_store, self._get_result_cell_text)
         main_sizer.Add(self.results_list_ctrl, 1, wx.EXPAND | wx.ALL, 5)
 
         actions_sizer = wx.BoxSizer(wx.HORIZONTAL)
@@ -133,74 +137,58 @@ class AdvancedFinderResultsDialog(wx.Dialog):
         self.Bind(wx.EVT_BUTTON, lambda e: self.EndModal(wx.ID_CANCEL), id=wx.ID_CLOSE)
 
 
-    def _prepare_displayable_results(self, found_results):
-        displayable = []
-        for res in found_results:
-            displayable.append({
-                'result_id': uuid.uuid4(),
-                'source_id': res['source_id'],
-                'source_display_name': res['source_display_name'],
-                'line_number': res['line_num'], # 1-based
-                'original_line_content': res['line_text'],
-                'match_start_char_in_line': res['match_start'], # 0-based
-                'match_end_char_in_line': res['match_end'],    
-                'matched_text': res['matched_text'],
-                'replacement_text': None,
-                'status': 'Found'
-            })
-        return displayable
-
-    def _populate_results_list(self):
-        self.results_list_ctrl.DeleteAllItems()
-        for idx, res_item in enumerate(self.displayable_results):
-            self.results_list_ctrl.InsertItem(idx, str(res_item['matched_text']))
-            self.results_list_ctrl.SetItem(idx, self.COL_REPLACEMENT, str(res_item['replacement_text'] or ""))
-            self.results_list_ctrl.SetItem(idx, self.COL_STATUS, res_item['status'])
-            self.results_list_ctrl.SetItem(idx, self.COL_SOURCE, res_item['source_display_name'])
-            self.results_list_ctrl.SetItem(idx, self.COL_LINE_NUM, str(res_item['line_number']))
-            self.results_list_ctrl.SetItem(idx, self.COL_ORIGINAL_LINE, res_item['original_line_content'].strip())
-            self.results_list_ctrl.SetItemData(idx, idx)
-
-    def _update_list_item(self, list_ctrl_idx, displayable_result_item):
-        self.results_list_ctrl.SetItem(list_ctrl_idx, self.COL_MATCH_TEXT, str(displayable_result_item['matched_text']))
-        self.results_list_ctrl.SetItem(list_ctrl_idx, self.COL_REPLACEMENT, str(displayable_result_item['replacement_text'] or ""))
-        self.results_list_ctrl.SetItem(list_ctrl_idx, self.COL_STATUS, displayable_result_item['status'])
+    def _get_result_cell_text(self, row, col):
+        """Returns the text of one cell of the virtual results list, reading the line from its source."""
+        store = self.match_store
+        if col == self.COL_MATCH_TEXT:
+            return store.matched_text(row)
+        if col == self.COL_REPLACEMENT:
+            return store.get_replacement(row) or ""
+        if col == self.COL_STATUS:
+            return store.status_label(row)
+        if col == self.COL_SOURCE:
+            return store.get_source(row)['display_name']
+        if col == self.COL_LINE_NUM:
+            return str(store.line_numbers[row])
+        if col == self.COL_ORIGINAL_LINE:
+            return store.line_text(row).strip()
+        if col == self.COL_TERM:
+            return store.get_term(row)
+        return ""
+
+    def _refresh_results_list(self):
+        if len(self.match_store) > 0:
+            self.results_list_ctrl.RefreshItems(0, len(self.match_store) - 1)
 
     def OnReplaceSelected(self, event):
         selected_idx = self.results_list_ctrl.GetFirstSelected()
         if selected_idx == -1:
             wx.MessageBox("Please select an item from the list to replace.", "No Selection", wx.ICON_WARNING, self)
             return
-        
-        item_data_idx = self.results_list_ctrl.GetItemData(selected_idx)
-        result_to_modify = self.displayable_results[item_data_idx]
 
-        dlg = ReplacementEntryDialog(self, current_text=result_to_modify['replacement_text'] or result_to_modify['matched_text'])
+        current_text = self.match_store.get_replacement(selected_idx) or self.match_store.matched_text(selected_idx)
+        dlg = ReplacementEntryDialog(self, current_text=current_text)
         if dlg.ShowModal() == wx.ID_OK:
-            replacement = dlg.GetValue()
-            result_to_modify['replacement_text'] = replacement
-            result_to_modify['status'] = "Pending Replace"
-            self._update_list_item(selected_idx, result_to_modify)
+            self.match_store.set_replacement(selected_idx, dlg.GetValue())
+            self.results_list_ctrl.RefreshItem(selected_idx)
         dlg.Destroy()
 
     def OnReplaceAll(self, event):
-        if not self.displayable_results:
+        if len(self.match_store) == 0:
             wx.MessageBox("No items to replace.", "Empty List", wx.ICON_INFORMATION, self)
             return
 
-        first_match_text = self.displayable_results[0]['matched_text'] if self.displayable_results else ""
+        first_match_text = self.match_store.matched_text(0)
         dlg = ReplacementEntryDialog(self, title="Enter Replacement Text for All Found Items", current_text=first_match_text)        
         if dlg.ShowModal() == wx.ID_OK:
             replacement = dlg.GetValue()
             confirm_dlg = wx.MessageDialog(self,
-                                           f"Are you sure you want to replace all {len(self.displayable_results)} found occurrences with '{replacement}'?\nThis action will be applied in memory and can be saved later.",
+                                           f"Are you sure you want to replace all {len(self.match_store)} found occurrences with '{replacement}'?\nThis action will be applied in memory and can be saved later.",
                                            "Confirm Replace All",
                                            wx.YES_NO | wx.NO_DEFAULT | wx.ICON_QUESTION)
             if confirm_dlg.ShowModal() == wx.ID_YES:
-                for item in self.displayable_results:
-                    item['replacement_text'] = replacement
-                    item['status'] = "Pending Replace All"
-                self._populate_results_list() # Repopulate to update all
+                self.match_store.replace_all(replacement)
+                self._refresh_results_list()
             confirm_dlg.Destroy()
         dlg.Destroy()
 
@@ -215,116 +203,83 @@ class AdvancedFinderResultsDialog(wx.Dialog):
         if not self.output_destination:
             wx.MessageBox("Please select an output destination folder.", "No Destination", wx.ICON_ERROR, self)
             return
+        if self.save_thread and self.save_thread.is_alive():
+            wx.MessageBox("Files are already being saved.", "Save Active", wx.ICON_INFORMATION, self)
+            return
 
-        items_to_process = [item for item in self.displayable_results if item['replacement_text'] is not None]
-        if not items_to_process:
+        store = self.match_store
+        rows_to_process = store.rows_with_replacement()
+        if not rows_to_process:
             wx.MessageBox("No replacements have been specified. Nothing to save.", "No Changes", wx.ICON_INFORMATION, self)
             return
 
-        replacements_by_source = {}
-        for item in items_to_process:
-            source_id = item['source_id']
-            if source_id not in replacements_by_source:
-                replacements_by_source[source_id] = []
-            replacements_by_source[source_id].append(item)
-
-        # Check for overwrites
-        overwrite_confirmed_sources = set()
-
-        processed_files_count = 0
-        modified_text_inputs = {} # {'source_display_name': 'full_modified_content'}
+        rows_by_source = {}
+        for row in rows_to_process:
+            source_index = store.source_indexes[row]
+            if source_index not in rows_by_source:
+                rows_by_source[source_index] = []
+            rows_by_source[source_index].append(row)
+
+        # Overwrites are confirmed here, before any file is written in the background.
+        save_jobs = []
+        overwritten_sources = []
+        for source_index, rows in rows_by_source.items():
+            source_meta = store.sources[source_index]
+            if source_meta['type'] != 'file':
+                save_jobs.append((source_index, rows, None))
+                continue
+            output_file_path = os.path.join(self.output_destination, source_meta['display_name'])
+            if os.path.normcase(os.path.abspath(output_file_path)) == os.path.normcase(os.path.abspath(source_meta['path'])):
+                confirm_ow = wx.MessageDialog(self,
+                                            f"The output destination for '{source_meta['display_name']}' is the same as the source.\n"
+                                            "This will overwrite the original file. Continue?",
+                                            "Confirm Overwrite",
+                                            wx.YES_NO | wx.ICON_WARNING | wx.NO_DEFAULT)
+                overwrite = confirm_ow.ShowModal() == wx.ID_YES
+                confirm_ow.Destroy()
+                if not overwrite:
+                    continue
+                overwritten_sources.append(source_index)
+            save_jobs.append((source_index, rows, output_file_path))
+        if not save_jobs:
+            return
+        # The rows of overwritten files keep showing the lines they were found in.
+        store.freeze_source_lines(overwritten_sources)
 
-        save_progress_dlg = wx.ProgressDialog(
+        self.save_progress_dlg = wx.ProgressDialog(
             "Saving Files",
             "Preparing to save...",
-            maximum=len(replacements_by_source),
+            maximum=len(save_jobs),
             parent=self,
-            style=wx.PD_APP_MODAL | wx.PD_AUTO_HIDE | wx.PD_ELAPSED_TIME | wx.PD_REMAINING_TIME
+            style=wx.PD_APP_MODAL | wx.PD_AUTO_HIDE | wx.PD_ELAPSED_TIME | wx.PD_REMAINING_TIME | wx.PD_CAN_ABORT
         )
-        save_progress_dlg.Show()
+        self.save_progress_dlg.Show()
         wx.Yield()
-        
-        current_source_idx = 0
-        for source_id, source_replacements in replacements_by_source.items():
-            current_source_idx +=1
-            source_meta = self.source_items_metadata.get(source_id)
-            if not source_meta:
-                wx.CallAfter(wx.MessageBox, f"Could not find metadata for source ID {source_id}. Skipping.", "Save Error", wx.ICON_ERROR, self)
-                wx.CallAfter(save_progress_dlg.Update, current_source_idx, f"Skipping unknown source {source_id}...")
-                continue
 
-            wx.CallAfter(save_progress_dlg.Update, current_source_idx, f"Processing: {source_meta['display_name']}")
-
-            original_lines = []
-            is_file_source = source_meta['type'] == 'file'
-            
-            if is_file_source:
-                source_path = source_meta['path']
-                try:
-                    # For "large files", read line by line. UTF-8 assumed.
-                    with open(source_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        original_lines = f.readlines()
-                except Exception as e:
-                    wx.CallAfter(wx.MessageBox, f"Error reading source file {source_path}:\n{e}", "Read Error", wx.ICON_ERROR, self)
-                    continue
-            else:
-                original_lines = source_meta['content'].splitlines(True)
-
-            replacements_by_line_num = {} # {line_num_0_based: [list_of_replacements_for_this_line]}
-            for rep_item in source_replacements:
-                line_num_0_based = rep_item['line_number'] - 1
-                if line_num_0_based not in replacements_by_line_num:
-                    replacements_by_line_num[line_num_0_based] = []
-                replacements_by_line_num[line_num_0_based].append(rep_item)
-            
-            modified_content_lines = []
-            for i, original_line in enumerate(original_lines):
-                current_line = original_line
-                if i in replacements_by_line_num:
-                    # Sort replacements for this line by start_char in REVERSE order
-                    # to avoid index shifts within the same line during replacement
-                    line_replacements = sorted(replacements_by_line_num[i], key=lambda r: r['match_start_char_in_line'], reverse=True)
-                    for rep in line_replacements:
-                        start = rep['match_start_char_in_line']
-                        end = rep['match_end_char_in_line']
-                        current_line = current_line[:start] + rep['replacement_text'] + current_line[end:]
-                modified_content_lines.append(current_line)
-            
-            if is_file_source:
-                output_file_path = os.path.join(self.output_destination, source_meta['display_name'])
-                
-                try:
-                    if shutil.disk_usage(os.path.dirname(source_path)) == shutil.disk_usage(self.output_destination) and \
-                       os.path.basename(source_path) == os.path.basename(output_file_path) and \
-                       source_id not in overwrite_confirmed_sources :
-                        
-                        confirm_ow = wx.MessageDialog(self,
-                                                    f"The output destination for '{source_meta['display_name']}' is the same as the source.\n"
-                                                    "This will overwrite the original file. Continue?",
-                                                    "Confirm Overwrite",
-                                                    wx.YES_NO | wx.ICON_WARNING | wx.NO_DEFAULT)
-                        if confirm_ow.ShowModal() == wx.ID_NO:
-                            confirm_ow.Destroy()
-                            continue
-                        confirm_ow.Destroy()
-                        overwrite_confirmed_sources.add(source_id)
-                except Exception as e:
-                    print(f"Warning: Could not reliably perform overwrite check for {source_path} due to {e}. Proceeding with caution.")
-
-                try:
-                    os.makedirs(os.path.dirname(output_file_path), exist_ok=True)
-                    with open(output_file_path, 'w', encoding='utf-8') as f_out:
-                        f_out.writelines(modified_content_lines)
-                    processed_files_count += 1
-                except Exception as e:
-                    wx.CallAfter(wx.MessageBox, f"Error writing to file {output_file_path}:\n{e}", "Write Error", wx.ICON_ERROR, self)
-            else:
-                modified_text_inputs[source_meta['display_name']] = "".join(modified_content_lines)
-                processed_files_count += 1
-
-        wx.CallAfter(save_progress_dlg.Destroy)
-
-        summary_message = f"Save process completed.\n{processed_files_count} files/text inputs processed and saved to '{self.output_destination}'."
+        self.save_thread = threading.Thread(target=self._perform_save_thread_task, args=(save_jobs,))
+        self.save_thread.daemon = True
+        self.save_thread.start()
+
+    def _perform_save_thread_task(self, save_jobs):
+        total_jobs = len(save_jobs)
+
+        def on_progress(done_count, source_item):
+            wx.CallAfter(self.save_progress_dlg.Update, min(done_count, total_jobs - 1),
+                         f"Saved: {source_item['display_name']} ({done_count}/{total_jobs})")
+
+        saved_jobs, modified_text_inputs, errors = save_replacements(self.match_store, save_jobs, on_progress=on_progress,
+                                                                     is_cancelled=self.save_progress_dlg.WasCancelled)
+        wx.CallAfter(self._on_save_finished, saved_jobs, modified_text_inputs, errors)
+
+    def _on_save_finished(self, saved_jobs, modified_text_inputs, errors):
+        self.save_progress_dlg.Destroy()
+        if errors:
+            error_lines = [f"{source_item['display_name']}: {error}" for source_item, error in errors[:10]]
+            if len(errors) > 10:
+                error_lines.append(f"...and {len(errors) - 10} more.")
+            wx.MessageBox("Some sources could not be saved:\n" + "\n".join(error_lines), "Save Error", wx.ICON_ERROR, self)
+
+        summary_message = f"Save process completed.\n{len(saved_jobs)} files/text inputs processed and saved to '{self.output_destination}'."
         if modified_text_inputs:
             summary_message += "\n\nSome modified text inputs are ready to be viewed/copied."        
         wx.MessageBox(summary_message, "Save Complete", wx.ICON_INFORMATION, self)
@@ -333,27 +288,22 @@ class AdvancedFinderResultsDialog(wx.Dialog):
             viewer_dlg = ModifiedTextsViewerDialog(self, modified_texts_map=modified_text_inputs)
             viewer_dlg.ShowModal()
             viewer_dlg.Destroy()
-        
-        for item in self.displayable_results:
-            if item['replacement_text'] is not None: # If it was a candidate for saving
-                item['status'] = "Saved" 
-        self._populate_results_list()
+
+        for source_index, rows, output_path in saved_jobs:
+            self.match_store.mark_saved(rows)
+            source_meta = self.match_store.sources[source_index]
+            if output_path and os.path.normcase(os.path.abspath(output_path)) == os.path.normcase(os.path.abspath(source_meta['path'])):
+                self.match_store.mark_source_rewritten(source_index)
+        self._refresh_results_list()
 
     def OnShowStatistics(self, event):
         """Calculates and displays search statistics."""
-        total_occurrences = len(self.displayable_results)
-       
-        unique_source_ids_with_matches = set()
-        if self.displayable_results: # or self.raw_found_results
-            unique_source_ids_with_matches = set(item['source_id'] for item in self.displayable_results)        
-        num_unique_sources_with_matches = len(unique_source_ids_with_matches)
+        total_occurrences = len(self.match_store)
+        num_unique_sources_with_matches = self.match_store.source_count()
         total_sources_searched = len(self.raw_source_items_metadata)
 
-        items_pending_replace = len([
-            item for item in self.displayable_results 
-            if item['status'] == "Pending Replace" or item['status'] == "Pending Replace All"
-        ])
-        items_saved = len([item for item in self.displayable_results if item['status'] == "Saved"])
+        items_pending_replace = self.match_store.count_status(STATUS_PENDING_REPLACE, STATUS_PENDING_REPLACE_ALL)
+        items_saved = self.match_store.count_status(STATUS_SAVED)
         
         # Determine how many of the originally searched sources were files vs text inputs
         num_files_searched = 0
@@ -374,6 +324,10 @@ class AdvancedFinderResultsDialog(wx.Dialog):
             f"Replacements Pending: {items_pending_replace},\n"
             f"Replacements Saved (in this session): {items_saved}.\n"
         )        
+        if self.match_store.terms:
+            term_lines = [f"  - {term}: {occurrences} occurrences in {source_count} sources"
+                          for term, occurrences, source_count in self.match_store.get_term_statistics()]
+            stats_message += "\nPer Term:\n" + "\n".join(term_lines) + "\n"
         wx.MessageBox(stats_message, "Search Statistics", wx.OK | wx.ICON_INFORMATION, self)
 
 
@@ -383,6 +337,7 @@ class AdvancedFinder(wx.Frame):
         self.source_items = [] # List of dicts: {'id': unique, 'type': 'file'/'text', 'path_or_content': ..., 'display_name': ...}
         self.text_input_counter = 0
         self.search_thread = None
+        self.search_terms = []
 
         panel = wx.Panel(self)
         main_sizer = wx.BoxSizer(wx.VERTICAL)
@@ -422,6 +377,19 @@ class AdvancedFinder(wx.Frame):
 
         self.regex_checkbox = wx.CheckBox(panel, label="Use Regular Expressions")
         search_params_sizer.Add(self.regex_checkbox, 0, wx.ALL, 5)
+
+        self.term_list_checkbox = wx.CheckBox(panel, label="Search for a list of terms from a file")
+        self.term_list_checkbox.Bind(wx.EVT_CHECKBOX, self.OnTermListModeChanged)
+        search_params_sizer.Add(self.term_list_checkbox, 0, wx.ALL, 5)
+
+        term_list_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        self.load_terms_btn = wx.Button(panel, label="Load Terms...")
+        self.load_terms_btn.Bind(wx.EVT_BUTTON, self.OnLoadTerms)
+        term_list_sizer.Add(self.load_terms_btn, 0, wx.RIGHT, 5)
+        self.terms_label = wx.StaticText(panel, label="No term list loaded.")
+        term_list_sizer.Add(self.terms_label, 0, wx.ALIGN_CENTER_VERTICAL)
+        search_params_sizer.Add(term_list_sizer, 0, wx.EXPAND | wx.ALL, 5)
+        self.load_terms_btn.Enable(False)
         main_sizer.Add(search_params_sizer, 0, wx.EXPAND | wx.ALL, 5)
 
         start_button = wx.Button(panel, label="Start Search")
@@ -491,9 +459,38 @@ class AdvancedFinder(wx.Frame):
                 new_selection = count - 1
             self.source_list_box.SetSelection(new_selection)
 
+    def OnTermListModeChanged(self, event):
+        # Terms are matched literally, so the find box and regular expressions do not apply.
+        term_list_mode = self.term_list_checkbox.GetValue()
+        self.find_text_ctrl.Enable(not term_list_mode)
+        self.regex_checkbox.Enable(not term_list_mode)
+        self.load_terms_btn.Enable(term_list_mode)
+
+    def OnLoadTerms(self, event):
+        with wx.FileDialog(self, "Select Term List (one term per line)", wildcard="Text files (*.txt)|*.txt|All files (*.*)|*.*",
+                           style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST) as fileDialog:
+            if fileDialog.ShowModal() == wx.ID_CANCEL:
+                return
+            path = fileDialog.GetPath()
+        try:
+            terms = load_terms(path)
+        except OSError as e:
+            wx.MessageBox(f"Could not read the term list:\n{e}", "Read Error", wx.ICON_ERROR, self)
+            return
+        if not terms:
+            wx.MessageBox("The selected file does not contain any terms.", "Empty Term List", wx.ICON_WARNING, self)
+            return
+        self.search_terms = terms
+        self.terms_label.SetLabel(f"{len(terms)} terms loaded from {os.path.basename(path)}.")
+        speak(f"{len(terms)} terms loaded.")
+
     def OnStartSearch(self, event):
+        term_list_mode = self.term_list_checkbox.GetValue()
         search_term = self.find_text_ctrl.GetValue()
-        if not search_term:
+        if term_list_mode and not self.search_terms:
+            wx.MessageBox("Please load a term list to search for.", "Missing Input", wx.ICON_WARNING, self)
+            return
+        if not term_list_mode and not search_term:
             wx.MessageBox("Please enter a search term.", "Missing Input", wx.ICON_WARNING, self)
             return
         if not self.source_items:
@@ -503,7 +500,15 @@ class AdvancedFinder(wx.Frame):
             wx.MessageBox("A search is already in progress.", "Search Active", wx.ICON_INFORMATION, self)
             return
 
-        use_regex = self.regex_checkbox.GetValue()
+        if term_list_mode:
+            matcher = TermAutomaton(self.search_terms)
+        else:
+            use_regex = self.regex_checkbox.GetValue()
+            try:
+                matcher = compile_search_pattern(search_term, use_regex)
+            except re.error as e:
+                wx.MessageBox(f"Invalid Regular Expression: {e}\nSearch term: '{search_term}'", "Regex Pattern Error", wx.ICON_ERROR, self)
+                return
 
         self.progress_dialog = wx.ProgressDialog(
             "Searching...",
@@ -516,99 +521,25 @@ class AdvancedFinder(wx.Frame):
         wx.Yield()
 
         self.search_thread = threading.Thread(target=self._perform_search_thread_task,
-                                              args=(search_term, use_regex, list(self.source_items)))
+                                              args=(matcher, list(self.source_items)))
         self.search_thread.daemon = True
         self.search_thread.start()
 
-    def _perform_search_thread_task(self, search_term, use_regex, sources_to_search):
-        found_results = []
-        total_occurrences = 0
-        search_term_lower = search_term.lower()
+    def _perform_search_thread_task(self, matcher, sources_to_search):
+        total_sources = len(sources_to_search)
 
-        for idx, source_item in enumerate(sources_to_search):
-            if self.progress_dialog.WasCancelled():
-                wx.CallAfter(self.progress_dialog.Destroy)
-                wx.CallAfter(wx.MessageBox, "Search cancelled by user.", "Cancelled", wx.ICON_INFORMATION)
-                return
+        def on_progress(done_count, source_item, total_occurrences):
+            wx.CallAfter(self.progress_dialog.Update, min(done_count, total_sources - 1),
+                         f"Processed: {source_item['display_name']} ({done_count}/{total_sources})\nFound: {total_occurrences} occurrences.")
 
-            wx.CallAfter(self.progress_dialog.Update, idx,
-                          f"Processing: {source_item['display_name']} ({idx+1}/{len(sources_to_search)})\nFound: {total_occurrences} occurrences.")
-            
-            lines = []
-            try:
-                if source_item['type'] == 'file':
-                    with open(source_item['path'], 'r', encoding='utf-8', errors='ignore') as f:
-                        lines = f.readlines()
-                elif source_item['type'] == 'text':
-                    lines = source_item['content'].splitlines(True)
-            except Exception as e:
-                continue 
-
-            for line_num_1_based, original_line_text in enumerate(lines, 1):
-                line_text_for_search = original_line_text
-                
-                try:
-                    if use_regex:
-                        try:
-                            regex_pattern = re.compile(search_term, re.IGNORECASE) 
-                        except re.error as re_compile_err:
-                            wx.CallAfter(self.progress_dialog.Destroy)
-                            wx.CallAfter(wx.MessageBox, f"Invalid Regular Expression: {re_compile_err}\nSearch term: '{search_term}'\nAborting search.", "Regex Pattern Error", wx.ICON_ERROR, self)
-                            return
-
-                        for match in regex_pattern.finditer(line_text_for_search):
-                            total_occurrences += 1
-                            found_results.append({
-                                'source_id': source_item['id'],
-                                'source_display_name': source_item['display_name'],
-                                'line_num': line_num_1_based,
-                                'match_start': match.start(),
-                                'match_end': match.end(),
-                                'matched_text': match.group(0), # This will be the actual text from the line
-                                'line_text': original_line_text 
-                            })
-                    else:
-                        # For non-regex, search on the lowercase version of the line
-                        line_text_lower = line_text_for_search.lower()
-                        start_index = 0
-                        while True:
-                            # Find in the lowercased line
-                            pos_in_lower = line_text_lower.find(search_term_lower, start_index)
-                            if pos_in_lower == -1:
-                                break
-                            
-                            total_occurrences += 1
-                            match_end_in_lower = pos_in_lower + len(search_term_lower)                            
-                            original_matched_text = line_text_for_search[pos_in_lower:match_end_in_lower]
-
-                            found_results.append({
-                                'source_id': source_item['id'],
-                                'source_display_name': source_item['display_name'],
-                                'line_num': line_num_1_based,
-                                'match_start': pos_in_lower, # Position is relative to original line
-                                'match_end': match_end_in_lower,
-                                'matched_text': original_matched_text, # Store the text with its original casing
-                                'line_text': original_line_text
-                            })
-                            start_index = match_end_in_lower
-                except re.error as re_err: 
-                    wx.CallAfter(self.progress_dialog.Destroy)
-                    wx.CallAfter(wx.MessageBox, f"Regex error during matching: {re_err}\nAborting search.", "Expression Error", wx.ICON_ERROR, self)
-                    return
-                except Exception as e_match:
-                    print(f"Error during matching in '{source_item['display_name']}' line {line_num_1_based}: {e_match}")
-                    
+        found_results = search_sources(matcher, sources_to_search, on_progress=on_progress, is_cancelled=self.progress_dialog.WasCancelled)
         wx.CallAfter(self.progress_dialog.Destroy)
-
-        if not (hasattr(self.progress_dialog, '_cancelled') and self.progress_dialog._cancelled):
-            if found_results:
-                wx.CallAfter(self._show_results_dialog, found_results, list(self.source_items))
-            else:
-                wx.CallAfter(wx.MessageBox, "Search term not found.", "No Results", wx.ICON_INFORMATION)
-        elif hasattr(self.progress_dialog, 'WasCancelled') and self.progress_dialog.WasCancelled():
-             if not hasattr(self.progress_dialog, '_cancelled'):
-                 self.progress_dialog._cancelled = True
-
+        if found_results is None:
+            wx.CallAfter(wx.MessageBox, "Search cancelled by user.", "Cancelled", wx.ICON_INFORMATION)
+        elif len(found_results) > 0:
+            wx.CallAfter(self._show_results_dialog, found_results, list(self.source_items))
+        else:
+            wx.CallAfter(wx.MessageBox, "Search term not found.", "No Results", wx.ICON_INFORMATION)
 
     def _show_results_dialog(self, found_results, original_source_items_metadata):
         results_dlg = AdvancedFinderResultsDialog(self, found_results=found_results, source_items_metadata=original_source_items_metadata)
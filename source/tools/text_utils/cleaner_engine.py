@@ -0,0 +1,351 @@
+import io
+import os
+import re
+import tempfile
+import html.parser
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+# Cleaning is CPU-bound, so one worker process per core.
+DEFAULT_CLEAN_WORKERS = os.cpu_count() or 1
+# How often the batch checks whether the user cancelled, in seconds.
+CANCEL_POLL_INTERVAL = 0.2
+
+CHANGE_KEYS = (
+    'spaces_removed',
+    'comments_removed',
+    'html_tags_removed',
+    'duplicate_lines_removed',
+    'empty_lines_removed',
+    'lines_removed',
+)
+
+
+class HTMLStripper(html.parser.HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.reset()
+        self.strict = False
+        self.convert_charrefs = True
+        self.text = io.StringIO()
+
+    def handle_data(self, data):
+        # Append text content, replacing consecutive whitespace with a single space
+        # This prevents smashing words together if tags were between them.
+        cleaned_data = re.sub(r'\s+', ' ', data)
+        self.text.write(cleaned_data)
+
+    def get_data(self):
+        return self.text.getvalue().strip() # Strip leading/trailing whitespace from the whole output
+
+
+def get_newline_char(ending_name):
+    """Maps line ending name to character(s)."""
+    if "Unix" in ending_name:
+        return '\n'
+    elif "Mac" in ending_name:
+        return '\r'
+    elif "Windows" in ending_name:
+        return '\r\n'
+    return os.linesep # Default to system's native if unknown
+
+def get_newline_char_from_line(line):
+    """Detects and returns the newline character(s) from a single line."""
+    if line.endswith('\r\n'):
+        return '\r\n'
+    elif line.endswith('\n'):
+        return '\n'
+    elif line.endswith('\r'):
+        return '\r'
+    return '' # No newline found
+
+def clean_spaces(lines):
+    """Removes leading and trailing spaces from each line."""
+    count = 0
+    cleaned = []
+    for line in lines:
+        newline = get_newline_char_from_line(line)
+        stripped_line = line.strip()
+        if stripped_line != line[:len(line) - len(newline)]:
+            count += 1
+        cleaned.append(stripped_line + newline)
+    return cleaned, count
+
+def normalize_line_endings(lines, target_ending_name):
+    """Ensures all lines have the specified line ending."""
+    target_ending = get_newline_char(target_ending_name)
+    cleaned = []
+    # count is not relevant here as it changes all lines
+    for line in lines:
+        line = line.rstrip('\r\n') # Remove \r\n or just \n or just \r
+        cleaned.append(line + target_ending)
+    return cleaned, 0
+
+def remove_comments(text):
+    """
+    Removes various types of comments (#, //, --, /* */) from text
+    with improved heuristics for quoted strings and URLs.
+    Still not a full language parser and may have edge cases.
+    """
+    count = 0
+    cleaned_text_buffer = []
+
+    i = 0
+    n = len(text)
+
+    in_block_comment = False
+    in_single_quote_string = False
+    in_double_quote_string = False
+
+    while i < n:
+        # Handle escape characters within strings primarily
+        if (in_single_quote_string or in_double_quote_string) and text[i] == '\\':
+            if i + 1 < n:
+                cleaned_text_buffer.append(text[i:i+2]) # Keep escape and char after
+                i += 2
+                continue
+            else: # Dangling escape at end of text
+                cleaned_text_buffer.append(text[i])
+                i += 1
+                continue
+
+        # Toggle string states
+        if text[i] == "'":
+            if not in_double_quote_string: # Not allowed to toggle single inside double
+                in_single_quote_string = not in_single_quote_string
+            cleaned_text_buffer.append(text[i])
+            i += 1
+            continue
+
+        if text[i] == '"':
+            if not in_single_quote_string:
+                in_double_quote_string = not in_double_quote_string
+            cleaned_text_buffer.append(text[i])
+            i += 1
+            continue
+
+        # If inside a string, just append characters (unless it's an escape, handled above)
+        if in_single_quote_string or in_double_quote_string:
+            cleaned_text_buffer.append(text[i])
+            i += 1
+            continue
+
+        # Handle block comments (/* ... */)
+        if not in_block_comment and i + 1 < n and text[i:i+2] == '/*':
+            in_block_comment = True
+            count += 1 # Count block comment start
+            i += 2
+            continue
+
+        if in_block_comment and i + 1 < n and text[i:i+2] == '*/':
+            in_block_comment = False
+            i += 2
+            continue
+
+        if in_block_comment:
+            i += 1 # Skip characters inside block comment
+            continue
+
+        # Check for '//'
+        if i + 1 < n and text[i:i+2] == '//':
+            # Check if it's part of a URL like http://, file://
+            is_url_protocol = False
+            if i > 0 and text[i-1] == ':':
+                if i > 1 and not text[i-2].isspace():
+                    is_url_protocol = True
+
+            if not is_url_protocol:
+                count += 1
+                # Skip to the end of the line
+                while i < n and text[i] != '\n':
+                    i += 1
+                # If loop ended due to '\n', we'll append it in the next step.
+                # If loop ended due to end of text, i will be n.
+                continue
+            else: # It's likely part of a URL, treat as normal text
+                cleaned_text_buffer.append(text[i:i+2])
+                i += 2
+                continue
+
+        if text[i] == '#':
+            count += 1
+            while i < n and text[i] != '\n':
+                i += 1
+            continue
+
+        # Check for '--' (common in SQL, Ada, Haskell, Lua)
+        if i + 1 < n and text[i:i+2] == '--':
+            count += 1
+            while i < n and text[i] != '\n':
+                i += 1
+            continue
+
+        # If none of the above, it's normal text
+        cleaned_text_buffer.append(text[i])
+        i += 1
+
+    final_cleaned_text = "".join(cleaned_text_buffer)
+    return final_cleaned_text, count
+
+def remove_html_tags(text):
+    """
+    Removes HTML/XML tags using html.parser.
+
+    Raises:
+        Exception: Whatever the parser raises on malformed input.
+    """
+    stripper = HTMLStripper()
+    stripper.feed(text)
+    cleaned_text = stripper.get_data()
+    approx_tag_count = len(re.findall(r'<[^>]*>', text))
+    return cleaned_text, approx_tag_count
+
+def remove_duplicate_lines(lines):
+    """Removes identical consecutive or non-consecutive duplicate lines."""
+    seen_lines = set()
+    cleaned = []
+    removed_count = 0
+    for line in lines:
+        if line not in seen_lines:
+            cleaned.append(line)
+            seen_lines.add(line)
+        else:
+            removed_count += 1
+    return cleaned, removed_count
+
+def remove_empty_lines(lines):
+    """Removes lines that are empty or contain only whitespace."""
+    cleaned = []
+    removed_count = 0
+    for line in lines:
+        if line.strip():
+            cleaned.append(line)
+        else:
+            removed_count += 1
+    return cleaned, removed_count
+
+def clean_text(text, settings):
+    """
+    Applies the enabled cleaning settings to text. Returns (lines, changes,
+    warning): the cleaned lines ready to be written, the count of each kind
+    of change by CHANGE_KEYS, and a message if a step had to be skipped.
+    """
+    changes = dict.fromkeys(CHANGE_KEYS, 0)
+    warning = None
+
+    if settings['remove_comments']:
+        text, changes['comments_removed'] = remove_comments(text)
+
+    if settings['remove_html']:
+        try:
+            text, changes['html_tags_removed'] = remove_html_tags(text)
+        except Exception as e:
+            warning = f"Error parsing HTML for cleaning:\n{e}\n\nProceeding without HTML removal for this file."
+
+    lines = text.splitlines(keepends=True)
+    lines_count_after_text_clean = len(lines) # Lines after text-based ops
+
+    if settings['strip_spaces']:
+        lines, changes['spaces_removed'] = clean_spaces(lines)
+
+    if settings['remove_empty_lines']:
+        lines, changes['empty_lines_removed'] = remove_empty_lines(lines)
+
+    if settings['remove_duplicates']:
+        lines, changes['duplicate_lines_removed'] = remove_duplicate_lines(lines)
+
+    # Lines removed purely by line-based operations
+    changes['lines_removed'] = max(0, lines_count_after_text_clean - len(lines))
+
+    if settings['normalize_lines']:
+        lines, _ = normalize_line_endings(lines, settings['line_ending'])
+    return lines, changes, warning
+
+def write_lines(output_path, lines):
+    """
+    Writes lines to output_path through a temporary file in the same folder,
+    so two sources with the same name never interleave their output and an
+    error never leaves a half-written file behind.
+    """
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=output_dir, prefix=".", suffix=".tmp")
+    try:
+        with open(fd, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def clean_file(source_path, destination_dir, settings):
+    """
+    Cleans one file into destination_dir. Runs in a worker process, so it
+    only takes and returns plain, picklable values. Returns a dict with the
+    source_path, its original_lines count, the changes made, an optional
+    warning, and error as a (title, message) pair when the file could not
+    be read or written. Changes still count when only writing failed.
+    """
+    result = {
+        'source_path': source_path,
+        'original_lines': 0,
+        'changes': dict.fromkeys(CHANGE_KEYS, 0),
+        'warning': None,
+        'error': None,
+    }
+    name = os.path.basename(source_path)
+    try:
+        with open(source_path, 'r', encoding='utf-8', errors='ignore') as f:
+            original_text = f.read()
+    except Exception as e:
+        result['error'] = ("Reading Error", f"Error reading file: {name}\n\n{e}")
+        return result
+    result['original_lines'] = len(original_text.splitlines())
+
+    lines, result['changes'], result['warning'] = clean_text(original_text, settings)
+    try:
+        write_lines(os.path.join(destination_dir, name), lines)
+    except Exception as e:
+        result['error'] = ("Writing Error", f"Error writing file: {name}\n\n{e}")
+    return result
+
+def clean_files(files, destination_dir, settings, on_result=None, is_cancelled=None, max_workers=DEFAULT_CLEAN_WORKERS):
+    """
+    Cleans files into destination_dir on a pool of worker processes, so the
+    character-by-character comment removal runs on every core instead of
+    one. on_result(done_count, result) is called on the calling thread with
+    the clean_file() result of each file as it finishes. Once is_cancelled()
+    returns true, files that have not started are dropped; files already
+    being cleaned still finish. Returns (results, cancelled).
+    """
+    results = []
+    cancelled = False
+    if not files:
+        return results, cancelled
+
+    executor = ProcessPoolExecutor(max_workers=max(1, min(max_workers, len(files))))
+    try:
+        pending = {executor.submit(clean_file, path, destination_dir, settings) for path in files}
+        while pending:
+            if not cancelled and is_cancelled and is_cancelled():
+                cancelled = True
+                for future in pending:
+                    future.cancel()
+            done, pending = wait(pending, timeout=CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.cancelled():
+                    continue
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker process died, or the result could not be sent back.
+                    print(f"Error cleaning file in worker process: {e}")
+                    continue
+                results.append(result)
+                if on_result:
+                    on_result(len(results), result)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    return results, cancelled
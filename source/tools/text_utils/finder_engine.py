@@ -0,0 +1,554 @@
+import io
+import os
+import re
+import shutil
+import tempfile
+import threading
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Same default as ThreadPoolExecutor: reading files is mostly waiting on the disk.
+DEFAULT_SEARCH_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+# Number of sources whose text is kept in memory to show result rows.
+CACHED_SOURCE_TEXTS = 4
+# Characters read at a time when a file is rewritten with its replacements.
+REWRITE_CHUNK_SIZE = 1024 * 1024
+# Files rewritten at the same time when saving.
+DEFAULT_SAVE_WORKERS = 4
+
+STATUS_FOUND = 0
+STATUS_PENDING_REPLACE = 1
+STATUS_PENDING_REPLACE_ALL = 2
+STATUS_SAVED = 3
+STATUS_LABELS = ("Found", "Pending Replace", "Pending Replace All", "Saved")
+
+
+def compile_search_pattern(search_term, use_regex):
+    """
+    Compiles the finder's search term once for a whole search. Searches are
+    case-insensitive, and ^ and $ match at every line as they did when the
+    finder searched line by line.
+
+    Raises:
+        re.error: If use_regex is set and search_term is not a valid expression.
+    """
+    pattern = search_term if use_regex else re.escape(search_term)
+    return re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+
+def build_newline_index(text):
+    """Returns the offset at which each line of text starts."""
+    line_starts = [0]
+    find = text.find
+    position = find('\n')
+    while position != -1:
+        line_starts.append(position + 1)
+        position = find('\n', position + 1)
+    return line_starts
+
+def split_lines(text):
+    """Splits text into lines at '\\n' only, keeping the line breaks, so line numbers match build_newline_index()."""
+    lines = [line + '\n' for line in text.split('\n')]
+    lines[-1] = lines[-1][:-1]
+    return lines if lines[-1] else lines[:-1]
+
+def load_terms(path):
+    """Reads a term list file, one term per line. Empty lines and repeated terms (ignoring case) are dropped."""
+    with open(path, 'r', encoding='utf-8-sig', errors='ignore') as f:
+        lines = f.read().splitlines()
+    terms = []
+    seen = set()
+    for line in lines:
+        term = line.strip()
+        if term and term.lower() not in seen:
+            seen.add(term.lower())
+            terms.append(term)
+    return terms
+
+def read_source_text(source_item):
+    """Returns the text of a finder source: the file's content or the text input itself."""
+    if source_item['type'] == 'file':
+        with open(source_item['path'], 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read()
+    return source_item['content']
+
+def iter_match_spans(matcher, text, position=0):
+    """
+    Yields (start, end, term_index) for every match of a compiled pattern or
+    a TermAutomaton in text, from position on. Terms never contain a line
+    break, so a TermAutomaton always scans the whole text.
+    """
+    if isinstance(matcher, TermAutomaton):
+        return matcher.iter_matches(text)
+    return ((match.start(), match.end(), 0) for match in matcher.finditer(text, position))
+
+def find_matches(matcher, text):
+    """
+    Scans text with a compiled pattern or a TermAutomaton in a single pass
+    and returns four arrays: the term index of every match (always 0 for a
+    pattern), its 1-based line number and its start and end offsets within
+    that line. The newline index is only built once the text turns out to
+    contain a match.
+
+    Results and replacements work per line, as the finder once searched
+    line by line. When a match runs into the next line, as \\s or [^,] can,
+    that line is searched again on its own and the scan resumes after it,
+    giving the same matches the per-line search did. A zero-width match
+    right after a line break belongs to the start of the next line, so one
+    at the very end of a text that ends with a line break is not reported,
+    since that line does not exist.
+    """
+    term_indexes, line_numbers, starts, ends = array('l'), array('l'), array('l'), array('l')
+    text_length = len(text)
+    line_starts = None
+    current_line = -1
+    line_first_row = 0
+    position = 0
+    while True:
+        crossed_line = None
+        for start, end, term_index in iter_match_spans(matcher, text, position):
+            if start == text_length and (not text or text[-1] == '\n'):
+                break
+            if line_starts is None:
+                line_starts = build_newline_index(text)
+            line_index = bisect_right(line_starts, start) - 1
+            line_start = line_starts[line_index]
+            line_end = line_starts[line_index + 1] if line_index + 1 < len(line_starts) else text_length
+            if line_index != current_line:
+                current_line, line_first_row = line_index, len(starts)
+            if end > line_end:
+                crossed_line = (line_index, line_start, line_end)
+                break
+            term_indexes.append(term_index)
+            line_numbers.append(line_index + 1)
+            starts.append(start - line_start)
+            ends.append(end - line_start)
+        if crossed_line is None:
+            break
+        line_index, line_start, line_end = crossed_line
+        # Replace what the whole-text scan found on this line with a search of the line alone.
+        for column in (term_indexes, line_numbers, starts, ends):
+            del column[line_first_row:]
+        for match in matcher.finditer(text, line_start, line_end):
+            if match.start() == line_end and text[line_end - 1] == '\n':
+                # Past the line break; the scan of the next line reports it.
+                continue
+            term_indexes.append(0)
+            line_numbers.append(line_index + 1)
+            starts.append(match.start() - line_start)
+            ends.append(match.end() - line_start)
+        position = line_end
+        if position >= text_length:
+            break
+    return term_indexes, line_numbers, starts, ends
+
+def search_source(matcher, source_item):
+    """Returns the (term_indexes, line_numbers, starts, ends) arrays of the matches in one source."""
+    return find_matches(matcher, read_source_text(source_item))
+
+def search_sources(matcher, sources, on_progress=None, is_cancelled=None, max_workers=DEFAULT_SEARCH_WORKERS):
+    """
+    Searches sources with a compiled pattern or a TermAutomaton on a pool
+    of worker threads, so files are read while others are being scanned.
+    Returns a MatchStore with the matches of all sources in the order the
+    sources were given, grouped by term for a TermAutomaton, or None if
+    is_cancelled() became true. on_progress(done_count,
+    source_item, total_occurrences) is called on the calling thread as each
+    source finishes. A source that cannot be read is skipped.
+    """
+    cancel_event = threading.Event()
+    matches_by_index = {}
+    total_occurrences = 0
+
+    def search(source_item):
+        if cancel_event.is_set():
+            return None
+        return search_source(matcher, source_item)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="FinderSearch") as executor:
+        futures = {executor.submit(search, source_item): index for index, source_item in enumerate(sources)}
+        for done_count, future in enumerate(as_completed(futures), 1):
+            index = futures[future]
+            try:
+                matches_by_index[index] = future.result()
+            except Exception as e:
+                print(f"Could not search '{sources[index]['display_name']}': {e}")
+                matches_by_index[index] = None
+            if matches_by_index[index]:
+                total_occurrences += len(matches_by_index[index][0])
+            if is_cancelled and is_cancelled():
+                cancel_event.set()
+                for pending in futures:
+                    pending.cancel()
+                return None
+            if on_progress:
+                on_progress(done_count, sources[index], total_occurrences)
+
+    terms = matcher.terms if isinstance(matcher, TermAutomaton) else None
+    store = MatchStore(sources, terms)
+    for index in range(len(sources)):
+        if matches_by_index[index]:
+            store.add_source_matches(index, *matches_by_index[index])
+    if terms:
+        store.group_by_term()
+    return store
+
+
+def iter_replacements(store, rows):
+    """
+    Yields (line_number, start, end, replacement) for the given rows of one
+    source in the order they appear in it. Where two matches overlap, as
+    terms of a term list can, only the first one is replaced.
+    """
+    line_numbers, starts, ends = store.line_numbers, store.starts, store.ends
+    ordered_rows = sorted(rows, key=lambda row: (line_numbers[row], starts[row], ends[row]))
+    last_line, last_end = 0, 0
+    for row in ordered_rows:
+        line_number, start, end = line_numbers[row], starts[row], ends[row]
+        if line_number == last_line and start < last_end:
+            continue
+        last_line, last_end = line_number, end
+        yield line_number, start, end, store.get_replacement(row)
+
+def stream_replacements(reader, writer, replacements, chunk_size=REWRITE_CHUNK_SIZE):
+    """
+    Copies the text of reader to writer chunk by chunk, splicing in
+    replacements, (line_number, start, end, text) tuples in file order.
+    Only the current chunk and whatever is left of the previous one are
+    held in memory, so the size of the file does not matter. Returns the
+    number of replacements made; replacements beyond the end of the text,
+    which means the source changed since the search, are left out.
+    """
+    buffer = ''
+    position = 0 # First character of buffer not written yet, at line_number and column in the source.
+    line_number, column = 1, 0
+    made = 0
+    replacements = iter(replacements)
+    current = next(replacements, None)
+    while current is not None:
+        target_line, start, end, text = current
+        # Walk the line breaks between the current position and the replacement's line.
+        scan, scan_line, scan_column = position, line_number, column
+        while scan_line < target_line:
+            newline = buffer.find('\n', scan)
+            if newline == -1:
+                break
+            scan, scan_line, scan_column = newline + 1, scan_line + 1, 0
+        index = scan + start - scan_column if scan_line == target_line else None
+
+        if index is None or index + (end - start) > len(buffer):
+            # Not all of the replaced text has been read: write out what surely comes before it and read on.
+            if index is None:
+                flush_to, line_number, column = scan, scan_line, scan_column
+            else:
+                flush_to = min(index, len(buffer))
+                line_number, column = target_line, scan_column + (flush_to - scan)
+            writer.write(buffer[position:flush_to])
+            chunk = reader.read(chunk_size)
+            if not chunk:
+                writer.write(buffer[flush_to:])
+                return made
+            buffer = buffer[flush_to:] + chunk
+            position = 0
+            continue
+
+        writer.write(buffer[position:index])
+        writer.write(text)
+        position = index + (end - start)
+        if end > start and buffer[position - 1] == '\n':
+            line_number, column = target_line + 1, 0
+        else:
+            line_number, column = target_line, end
+        made += 1
+        current = next(replacements, None)
+    writer.write(buffer[position:])
+    shutil.copyfileobj(reader, writer, chunk_size)
+    return made
+
+def replace_in_file(source_path, output_path, replacements, chunk_size=REWRITE_CHUNK_SIZE):
+    """
+    Writes source_path with replacements applied to output_path, which may
+    be the source itself. The result goes to a temporary file in the output
+    folder that is renamed over output_path only once it is complete, so an
+    error never leaves a half-written file behind. Returns the number of
+    replacements made.
+    """
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=output_dir, prefix=".", suffix=".tmp")
+    try:
+        with open(source_path, 'r', encoding='utf-8', errors='ignore') as reader, \
+             open(fd, 'w', encoding='utf-8') as writer:
+            made = stream_replacements(reader, writer, replacements, chunk_size)
+        try:
+            shutil.copymode(source_path, temp_path)
+        except OSError:
+            pass
+        os.replace(temp_path, output_path)
+        return made
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def replace_in_text(text, replacements):
+    """Returns text with replacements applied."""
+    writer = io.StringIO()
+    stream_replacements(io.StringIO(text), writer, replacements)
+    return writer.getvalue()
+
+def save_replacements(store, jobs, on_progress=None, is_cancelled=None, max_workers=DEFAULT_SAVE_WORKERS):
+    """
+    Applies the replacements of a MatchStore on a pool of worker threads.
+    jobs is a list of (source_index, rows, output_path) with output_path
+    None for text inputs. on_progress(done_count, source_item) is called on
+    the calling thread as each job finishes. Once is_cancelled() returns
+    true, jobs that have not started are dropped; running ones still finish
+    their file. Returns (saved_jobs, modified_texts, errors): the jobs that
+    were saved, the new content of each modified text input by display
+    name, and (source_item, error) for each failure.
+    """
+    saved_jobs = []
+    modified_texts = {}
+    errors = []
+
+    def save(source_index, rows, output_path):
+        source_item = store.sources[source_index]
+        replacements = iter_replacements(store, rows)
+        if output_path is None:
+            return replace_in_text(source_item['content'], replacements)
+        replace_in_file(source_item['path'], output_path, replacements)
+        return None
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="FinderSave") as executor:
+        futures = {executor.submit(save, *job): job for job in jobs}
+        for done_count, future in enumerate(as_completed(futures), 1):
+            source_index, rows, output_path = futures[future]
+            source_item = store.sources[source_index]
+            if future.cancelled():
+                continue
+            try:
+                new_text = future.result()
+                saved_jobs.append(futures[future])
+                if output_path is None:
+                    modified_texts[source_item['display_name']] = new_text
+            except Exception as e:
+                errors.append((source_item, e))
+            if is_cancelled and is_cancelled():
+                for pending in futures:
+                    pending.cancel()
+            if on_progress:
+                on_progress(done_count, source_item)
+    return saved_jobs, modified_texts, errors
+
+
+class TermAutomaton:
+    """
+    An Aho-Corasick automaton over a list of literal terms. iter_matches()
+    finds every occurrence of every term, overlapping ones included, in a
+    single case-insensitive pass over the text, so searching for dozens of
+    terms costs about the same as searching for one.
+    """
+    def __init__(self, terms):
+        self.terms = list(terms)
+        goto = [{}]
+        outputs = [()]
+        for term_index, term in enumerate(self.terms):
+            state = 0
+            for char in term.lower():
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto.append({})
+                    outputs.append(())
+                    goto[state][char] = next_state
+                state = next_state
+            outputs[state] += (term_index,)
+
+        # Failure links, breadth first: the longest proper suffix of each state that is also a state.
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                outputs[next_state] += outputs[fail[next_state]]
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = outputs
+        self._lengths = [len(term.lower()) for term in self.terms]
+
+    def iter_matches(self, text):
+        """Yields (start, end, term_index) for every occurrence, ordered by where it ends."""
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few characters lowercase to more than one; keep those as they are so offsets still match text.
+            lowered = ''.join(char.lower() if len(char.lower()) == 1 else char for char in text)
+        goto, fail, outputs, lengths = self._goto, self._fail, self._outputs, self._lengths
+        state = 0
+        for position, char in enumerate(lowered):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                end = position + 1
+                for term_index in outputs[state]:
+                    yield end - lengths[term_index], end, term_index
+
+
+class MatchStore:
+    """
+    The matches of a search, kept as parallel arrays of source index, term
+    index, line number and start and end offsets within the line rather
+    than one dict per match. terms is the term list of a term list search,
+    or None. Line text is not stored: line_text() reads it from the
+    source when a row is shown, keeping the text and newline index of the
+    last few sources used. Replacements are kept only for the rows given
+    one, plus a single text for Replace All.
+
+    Before source files are overwritten in place, freeze_source_lines()
+    keeps the lines their rows were found in, since the offsets no longer fit
+    the rewritten file. Once mark_source_rewritten() is called, those rows
+    show their original line and saved rows show their replacement as the
+    matched text.
+    """
+    def __init__(self, sources, terms=None):
+        self.sources = sources
+        self.terms = terms
+        self.source_indexes = array('l')
+        self.term_indexes = array('l')
+        self.line_numbers = array('l')
+        self.starts = array('l')
+        self.ends = array('l')
+        self.statuses = array('b')
+        self.replacements = {}
+        self.replace_all_text = None
+        self._texts = OrderedDict()
+        # source index -> {line number: line text} for sources being overwritten.
+        self._frozen_lines = {}
+        self._rewritten_sources = set()
+
+    def __len__(self):
+        return len(self.line_numbers)
+
+    def add_source_matches(self, source_index, term_indexes, line_numbers, starts, ends):
+        count = len(line_numbers)
+        self.source_indexes.extend(array('l', [source_index]) * count)
+        self.term_indexes.extend(term_indexes)
+        self.line_numbers.extend(line_numbers)
+        self.starts.extend(starts)
+        self.ends.extend(ends)
+        self.statuses.extend(array('b', [STATUS_FOUND]) * count)
+
+    def get_source(self, row):
+        return self.sources[self.source_indexes[row]]
+
+    def get_term(self, row):
+        return self.terms[self.term_indexes[row]] if self.terms else ""
+
+    def group_by_term(self):
+        """Reorders the rows by term, in term list order, keeping source and line order within each term."""
+        order = sorted(range(len(self)), key=self.term_indexes.__getitem__)
+        for name in ('source_indexes', 'term_indexes', 'line_numbers', 'starts', 'ends', 'statuses'):
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, [column[row] for row in order]))
+
+    def get_term_statistics(self):
+        """Returns (term, occurrences, sources with matches) for every term of a term list search, in term list order."""
+        occurrences = [0] * len(self.terms or ())
+        sources = [set() for _ in occurrences]
+        for term_index, source_index in zip(self.term_indexes, self.source_indexes):
+            occurrences[term_index] += 1
+            sources[term_index].add(source_index)
+        return [(term, occurrences[i], len(sources[i])) for i, term in enumerate(self.terms or ())]
+
+    def _get_lines(self, source_index):
+        """Returns the text and newline index of a source, reading it again if it is not among the cached ones."""
+        if source_index in self._texts:
+            self._texts.move_to_end(source_index)
+            return self._texts[source_index]
+        try:
+            text = read_source_text(self.sources[source_index])
+        except (OSError, KeyError) as e:
+            print(f"Could not read '{self.sources[source_index]['display_name']}': {e}")
+            text = ""
+        self._texts[source_index] = (text, build_newline_index(text))
+        while len(self._texts) > CACHED_SOURCE_TEXTS:
+            self._texts.popitem(last=False)
+        return self._texts[source_index]
+
+    def _read_line(self, source_index, line_number):
+        text, line_starts = self._get_lines(source_index)
+        line_index = line_number - 1
+        if line_index >= len(line_starts):
+            return ""
+        line_end = line_starts[line_index + 1] if line_index + 1 < len(line_starts) else len(text)
+        return text[line_starts[line_index]:line_end]
+
+    def line_text(self, row):
+        """Returns the line a match was found in, including its line break."""
+        source_index = self.source_indexes[row]
+        frozen_lines = self._frozen_lines.get(source_index)
+        if frozen_lines is not None:
+            return frozen_lines.get(self.line_numbers[row], "")
+        return self._read_line(source_index, self.line_numbers[row])
+
+    def matched_text(self, row):
+        if self.source_indexes[row] in self._rewritten_sources and self.statuses[row] == STATUS_SAVED:
+            return self.get_replacement(row) or ""
+        return self.line_text(row)[self.starts[row]:self.ends[row]]
+
+    def freeze_source_lines(self, source_indexes):
+        """Keeps the current text of every line with a match in the given sources, before those files are overwritten."""
+        source_indexes = set(source_indexes) - set(self._frozen_lines)
+        line_numbers = {source_index: set() for source_index in source_indexes}
+        for source_index, line_number in zip(self.source_indexes, self.line_numbers):
+            if source_index in line_numbers:
+                line_numbers[source_index].add(line_number)
+        for source_index, numbers in line_numbers.items():
+            self._frozen_lines[source_index] = {number: self._read_line(source_index, number) for number in numbers}
+
+    def mark_source_rewritten(self, source_index):
+        """Drops the cached text of a source that was overwritten, so it is never sliced at the old offsets."""
+        self._rewritten_sources.add(source_index)
+        self._texts.pop(source_index, None)
+
+    def status_label(self, row):
+        return STATUS_LABELS[self.statuses[row]]
+
+    def get_replacement(self, row):
+        """Returns the replacement text of a row, or None if it has none."""
+        return self.replacements.get(row, self.replace_all_text)
+
+    def set_replacement(self, row, replacement):
+        self.replacements[row] = replacement
+        self.statuses[row] = STATUS_PENDING_REPLACE
+
+    def replace_all(self, replacement):
+        self.replacements.clear()
+        self.replace_all_text = replacement
+        self.statuses = array('b', [STATUS_PENDING_REPLACE_ALL]) * len(self)
+
+    def rows_with_replacement(self):
+        if self.replace_all_text is not None:
+            return range(len(self))
+        return sorted(self.replacements)
+
+    def mark_saved(self, rows):
+        for row in rows:
+            self.statuses[row] = STATUS_SAVED
+
+    def count_status(self, *statuses):
+        return sum(self.statuses.count(status) for status in statuses)
+
+    def source_count(self):
+        """Returns the number of sources with at least one match."""
+        return len(set(self.source_indexes))
@@ -1,29 +1,9 @@
 import wx
-import re
 import os
 import platform
 import shutil
 import threading
-import html.parser
-import io
-
-
-class HTMLStripper(html.parser.HTMLParser):
-    def __init__(self):
-        super().__init__()
-        self.reset()
-        self.strict = False
-        self.convert_charrefs = True
-        self.text = io.StringIO()
-
-    def handle_data(self, data):
-        # Append text content, replacing consecutive whitespace with a single space
-        # This prevents smashing words together if tags were between them.
-        cleaned_data = re.sub(r'\s+', ' ', data)
-        self.text.write(cleaned_data)
-
-    def get_data(self):
-        return self.text.getvalue().strip() # Strip leading/trailing whitespace from the whole output
+from .cleaner_engine import clean_files
 
 
 class TextCleaner(wx.Frame):
@@ -211,7 +191,7 @@ class TextCleaner(wx.Frame):
             f"Starting processing... 0/{total_files} files done.",
             maximum=total_files,
             parent=self,
-            style=wx.PD_APP_MODAL | wx.PD_AUTO_HIDE | wx.PD_ELAPSED_TIME | wx.PD_REMAINING_TIME
+            style=wx.PD_APP_MODAL | wx.PD_AUTO_HIDE | wx.PD_ELAPSED_TIME | wx.PD_REMAINING_TIME | wx.PD_CAN_ABORT
         )
         progress_dialog.Show()
         wx.Yield()
@@ -224,7 +204,7 @@ class TextCleaner(wx.Frame):
         self.cleaning_thread.start()
 
     def _perform_cleaning_process(self, files_to_process, destination_dir, settings, progress_dialog):
-        """Worker thread function to process files."""
+        """Worker thread function that cleans the files on a process pool and sums up the results."""
         total_files = len(files_to_process)
         processed_count = 0
         total_original_lines_processed = 0
@@ -237,76 +217,22 @@ class TextCleaner(wx.Frame):
             'lines_removed': 0,
         }
 
-        try:
-            for file_index, source_path in enumerate(files_to_process):
-                if progress_dialog.WasCancelled():
-                    break
-
-                wx.CallAfter(progress_dialog.Update, file_index + 1, f"Processing: {os.path.basename(source_path)} ({file_index + 1}/{total_files})")
-
-                try:
-                    with open(source_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        original_text = f.read()
-                    original_file_line_count = len(original_text.splitlines())
-                    total_original_lines_processed += original_file_line_count
-
-                except Exception as e:
-                    wx.CallAfter(wx.MessageBox, f"Error reading file: {os.path.basename(source_path)}\n\n{e}", "Reading Error", wx.OK | wx.ICON_ERROR, parent=self)
-                    continue
-
-                text_to_process = original_text
-                current_changes = {k: 0 for k in total_changes}
-
-                if settings['remove_comments']:
-                     text_to_process, comments_count = self._remove_comments(text_to_process)
-                     current_changes['comments_removed'] += comments_count
-
-                if settings['remove_html']:
-                     text_to_process, html_count = self._remove_html_tags(text_to_process)
-                     current_changes['html_tags_removed'] += html_count
-
-                lines = text_to_process.splitlines(keepends=True)
-                lines_count_after_text_clean = len(lines) # Lines after text-based ops
-
-                if settings['strip_spaces']:
-                    lines, spaces_removed = self._clean_spaces(lines)
-                    current_changes['spaces_removed'] += spaces_removed
-
-                if settings['remove_empty_lines']:
-                    lines, empty_removed = self._remove_empty_lines(lines)
-                    current_changes['empty_lines_removed'] += empty_removed
-
-                if settings['remove_duplicates']:
-                    lines, duplicates_removed = self._remove_duplicate_lines(lines)
-                    current_changes['duplicate_lines_removed'] += duplicates_removed
-
-                # Calculate lines removed purely by line-based operations
-                lines_removed_by_line_ops = lines_count_after_text_clean - len(lines)
-                if lines_removed_by_line_ops < 0: lines_removed_by_line_ops = 0
-                current_changes['lines_removed'] += lines_removed_by_line_ops
-
-                for key in total_changes:
-                    if key in current_changes:
-                        total_changes[key] += current_changes[key]
-
-                if settings['normalize_lines']:
-                     cleaned_lines_for_write, _ = self._normalize_line_endings(lines, settings['line_ending'])
-                else:
-                     cleaned_lines_for_write = lines
-
-                # Determine output path and write
-                try:
-                     output_path = os.path.join(destination_dir, os.path.basename(source_path))
-                     output_dir = os.path.dirname(output_path)
-                     if not os.path.exists(output_dir):
-                         os.makedirs(output_dir)
-                     with open(output_path, 'w', encoding='utf-8') as f:
-                         f.writelines(cleaned_lines_for_write)
-                except Exception as e:
-                    wx.CallAfter(wx.MessageBox, f"Error writing file: {os.path.basename(source_path)}\n\n{e}", "Writing Error", wx.OK | wx.ICON_ERROR, parent=self)
-                    continue # Skip writing this file, but it was processed
-
+        def on_result(done_count, result):
+            nonlocal processed_count, total_original_lines_processed
+            wx.CallAfter(progress_dialog.Update, done_count, f"Processed: {os.path.basename(result['source_path'])} ({done_count}/{total_files})")
+            total_original_lines_processed += result['original_lines']
+            for key in total_changes:
+                total_changes[key] += result['changes'].get(key, 0)
+            if result['warning']:
+                wx.CallAfter(wx.MessageBox, result['warning'], "HTML Parsing Error", wx.OK | wx.ICON_WARNING, parent=self)
+            if result['error']:
+                title, message = result['error']
+                wx.CallAfter(wx.MessageBox, message, title, wx.OK | wx.ICON_ERROR, parent=self)
+            else:
                 processed_count += 1
+
+        try:
+            clean_files(files_to_process, destination_dir, settings, on_result=on_result, is_cancelled=progress_dialog.WasCancelled)
         except Exception as e:
             wx.CallAfter(wx.MessageBox, f"An unexpected error occurred during processing:\n{e}", "Processing Error", wx.OK | wx.ICON_ERROR, parent=self)
         finally:
@@ -339,195 +265,6 @@ class TextCleaner(wx.Frame):
 
             wx.CallAfter(wx.MessageBox, summary_message, "Cleaning Complete", wx.OK | wx.ICON_INFORMATION, parent=self)
 
-
-    def _clean_spaces(self, lines):
-        """Removes leading and trailing spaces from each line."""
-        count = 0
-        cleaned = []
-        for line in lines:
-            stripped_line = line.strip()
-            if stripped_line != line.strip():
-                 count += 1
-            cleaned.append(stripped_line + self._get_newline_char_from_line(line))
-        return cleaned, count
-
-    def _normalize_line_endings(self, lines, target_ending_name):
-        """Ensures all lines have the specified line ending."""
-        target_ending = self._get_newline_char(target_ending_name)
-        cleaned = []
-        # count is not relevant here as it changes all lines
-        for line in lines:
-            line = line.rstrip('\r\n') # Remove \r\n or just \n or just \r
-            cleaned.append(line + target_ending)
-        return cleaned, 0
-
-    def _get_newline_char(self, ending_name):
-        """Maps line ending name to character(s)."""
-        if "Unix" in ending_name:
-            return '\n'
-        elif "Mac" in ending_name:
-            return '\r'
-        elif "Windows" in ending_name:
-            return '\r\n'
-        return os.linesep # Default to system's native if unknown
-
-    def _get_newline_char_from_line(self, line):
-        """Detects and returns the newline character(s) from a single line."""
-        if line.endswith('\r\n'):
-            return '\r\n'
-        elif line.endswith('\n'):
-            return '\n'
-        elif line.endswith('\r'):
-            return '\r'
-        return '' # No newline found
-
-
-    def _remove_comments(self, text):
-        """
-        Removes various types of comments (#, //, --, /* */) from text
-        with improved heuristics for quoted strings and URLs.
-        Still not a full language parser and may have edge cases.
-        """
-        count = 0
-        cleaned_text_buffer = []
-        
-        i = 0
-        n = len(text)
-        
-        in_block_comment = False
-        in_single_quote_string = False
-        in_double_quote_string = False
-        
-        while i < n:
-            # Handle escape characters within strings primarily
-            if (in_single_quote_string or in_double_quote_string) and text[i] == '\\':
-                if i + 1 < n:
-                    cleaned_text_buffer.append(text[i:i+2]) # Keep escape and char after
-                    i += 2
-                    continue
-                else: # Dangling escape at end of text
-                    cleaned_text_buffer.append(text[i])
-                    i += 1
-                    continue
-
-            # Toggle string states
-            if text[i] == "'":
-                if not in_double_quote_string: # Not allowed to toggle single inside double
-                    in_single_quote_string = not in_single_quote_string
-                cleaned_text_buffer.append(text[i])
-                i += 1
-                continue
-            
-            if text[i] == '"':
-                if not in_single_quote_string:
-                    in_double_quote_string = not in_double_quote_string
-                cleaned_text_buffer.append(text[i])
-                i += 1
-                continue
-
-            # If inside a string, just append characters (unless it's an escape, handled above)
-            if in_single_quote_string or in_double_quote_string:
-                cleaned_text_buffer.append(text[i])
-                i += 1
-                continue
-
-            # Handle block comments (/* ... */)
-            if not in_block_comment and i + 1 < n and text[i:i+2] == '/*':
-                in_block_comment = True
-                count += 1 # Count block comment start
-                i += 2
-                continue
-            
-            if in_block_comment and i + 1 < n and text[i:i+2] == '*/':
-                in_block_comment = False
-                i += 2
-                continue
-            
-            if in_block_comment:
-                i += 1 # Skip characters inside block comment
-                continue
-
-            # Check for '//'
-            if i + 1 < n and text[i:i+2] == '//':
-                # Check if it's part of a URL like http://, file://
-                is_url_protocol = False
-                if i > 0 and text[i-1] == ':':
-                    if i > 1 and not text[i-2].isspace():
-                        is_url_protocol = True
-                
-                if not is_url_protocol:
-                    count += 1
-                    # Skip to the end of the line
-                    while i < n and text[i] != '\n':
-                        i += 1
-                    # If loop ended due to '\n', we'll append it in the next step.
-                    # If loop ended due to end of text, i will be n.
-                    continue
-                else: # It's likely part of a URL, treat as normal text
-                    cleaned_text_buffer.append(text[i:i+2])
-                    i += 2
-                    continue
-
-            if text[i] == '#':
-                count += 1
-                while i < n and text[i] != '\n':
-                    i += 1
-                continue
-
-            # Check for '--' (common in SQL, Ada, Haskell, Lua)
-            if i + 1 < n and text[i:i+2] == '--':
-                count += 1
-                while i < n and text[i] != '\n':
-                    i += 1
-                continue
-
-            # If none of the above, it's normal text
-            cleaned_text_buffer.append(text[i])
-            i += 1
-            
-        final_cleaned_text = "".join(cleaned_text_buffer)
-        return final_cleaned_text, count
-
-
-    def _remove_html_tags(self, text):
-        """Removes HTML/XML tags using html.parser."""
-        stripper = HTMLStripper()
-        try:
-            stripper.feed(text)
-            cleaned_text = stripper.get_data()
-            approx_tag_count = len(re.findall(r'<[^>]*>', text))
-
-            return cleaned_text, approx_tag_count
-        except Exception as e:
-             wx.CallAfter(wx.MessageBox, f"Error parsing HTML for cleaning:\n{e}\n\nProceeding without HTML removal for this file.", "HTML Parsing Error", wx.OK | wx.ICON_WARNING, parent=self)
-             return text, 0
-
-
-    def _remove_duplicate_lines(self, lines):
-        """Removes identical consecutive or non-consecutive duplicate lines."""
-        seen_lines = set()
-        cleaned = []
-        removed_count = 0
-        for line in lines:
-             if line not in seen_lines:
-                  cleaned.append(line)
-                  seen_lines.add(line)
-             else:
-                  removed_count += 1
-        return cleaned, removed_count
-
-    def _remove_empty_lines(self, lines):
-        """Removes lines that are empty or contain only whitespace."""
-        cleaned = []
-        removed_count = 0
-        for line in lines:
-            if line.strip():
-                cleaned.append(line)
-            else:
-                removed_count += 1
-        return cleaned, removed_count
-
-
     def _get_relative_path(self, base_path, full_path):
          """Calculates path of full_path relative to base_path."""
          try:
@@ -0,0 +1,79 @@
+import threading
+import vlc
+
+# Options of the shared libvlc instance. Anything specific to one sound, such as
+# looping or disabling video, is set as a media option instead.
+INSTANCE_ARGS = ["--no-xlib", "--quiet"]
+
+
+class VlcEngine:
+    """
+    The one libvlc instance used by every player in Access Hub.
+
+    Creating a libvlc instance loads the plugin cache and initialises its
+    modules, which is a noticeable delay when done for every track. Players,
+    media and media lists are cheap in comparison, so tools ask this engine
+    for them and release only those when they are done. The instance itself
+    lives until the process exits.
+    """
+    def __init__(self, args=INSTANCE_ARGS):
+        self.instance = vlc.Instance(args)
+        if self.instance is None:
+            raise RuntimeError("VLC could not be initialized.")
+
+    def new_player(self):
+        return self.instance.media_player_new()
+
+    def new_media(self, mrl, *options):
+        """Returns a Media for a URL or path. options are per-media VLC options such as 'input-repeat=-1'."""
+        return self.instance.media_new(mrl, *options)
+
+    def new_media_path(self, path, *options):
+        media = self.instance.media_new_path(path)
+        for option in options:
+            media.add_option(option)
+        return media
+
+    def new_list_player(self, mrls=(), loop=False, options=()):
+        """
+        Returns a MediaListPlayer and its MediaList for queued playback.
+        More media can be queued later with media_list.add_media().
+        """
+        media_list = self.instance.media_list_new()
+        for mrl in mrls:
+            media = self.new_media(mrl, *options)
+            media_list.add_media(media)
+            media.release()
+        list_player = self.instance.media_list_player_new()
+        list_player.set_media_list(media_list)
+        if loop:
+            list_player.set_playback_mode(vlc.PlaybackMode.loop)
+        return list_player, media_list
+
+    @staticmethod
+    def release_player(player):
+        """Stops and releases a player created by this engine, ignoring errors from one that is already gone."""
+        if player is None:
+            return
+        try:
+            player.stop()
+            player.release()
+        except Exception as e:
+            print(f"Error releasing VLC player: {e}")
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_vlc_engine():
+    """
+    Returns the process-wide VlcEngine, creating it on first use.
+
+    Raises:
+        RuntimeError: If libvlc cannot be initialized.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = VlcEngine()
+        return _engine